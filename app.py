@@ -106,6 +106,11 @@ def create_app(config_name=None):
     else:
         print("⚠️ Production mode: Skipping database initialization")
     
+    # Keep lecture statuses in step with their schedule
+    if app.config.get('LECTURE_SCHEDULER_ENABLED', False):
+        from utils.lecture_scheduler import lecture_scheduler
+        lecture_scheduler.start(app)
+    
     return app
 
 if __name__ == '__main__':
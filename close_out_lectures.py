@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Close out lectures whose scheduled end has passed
+Marks every actively enrolled student without an attendance row absent.
+Intended to run periodically, e.g. from cron every few minutes.
+"""
+
+from app import create_app
+from app import db
+from utils.attendance_closeout import close_out_due_lectures
+
+def close_out_lectures():
+    app = create_app()
+    with app.app_context():
+        total_lectures = total_rows = 0
+        
+        while True:
+            result = close_out_due_lectures()
+            db.session.commit()
+            if not result['lectures']:
+                break
+            total_lectures += result['lectures']
+            total_rows += result['inserted']
+        
+        print(f"Closed out {total_lectures} lectures ({total_rows} absent rows)")
+
+if __name__ == "__main__":
+    close_out_lectures()
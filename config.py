@@ -36,9 +36,35 @@ class Config:
     DEFAULT_GEOFENCE_RADIUS = int(os.environ.get('DEFAULT_GEOFENCE_RADIUS') or 50)  # meters
     LOCATION_CONFIRMATIONS_REQUIRED = int(os.environ.get('LOCATION_CONFIRMATIONS_REQUIRED') or 3)
     
+    # Teacher location confirmation sessions, shared by all workers:
+    # memory://, sqlite:///path/to/file.db or redis://host:port/db
+    # (defaults to a SQLite file in the instance folder, or a per-process memory
+    # store when that folder is read-only; set this on serverless deployments)
+    LOCATION_SESSION_STORE = os.environ.get('LOCATION_SESSION_STORE')
+    
+    # Rotating QR check-in tokens: a new token every N seconds (signed with SECRET_KEY)
+    QR_TOKEN_ROTATION_SECONDS = int(os.environ.get('QR_TOKEN_ROTATION_SECONDS') or 15)
+    
     # Google Maps API Key (for WiFi positioning)
     GOOGLE_MAPS_API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY') or ''
     
+    # Student dashboard cache lifetime (seconds, 0 disables caching)
+    STUDENT_DASHBOARD_CACHE_TTL = int(os.environ.get('STUDENT_DASHBOARD_CACHE_TTL') or 30)
+    
+    # Admin dashboard statistics cache lifetime (seconds, 0 disables caching)
+    ADMIN_STATS_CACHE_TTL = int(os.environ.get('ADMIN_STATS_CACHE_TTL') or 60)
+    
+    # Background report jobs (artifacts default to <instance>/reports)
+    REPORT_JOB_WORKERS = int(os.environ.get('REPORT_JOB_WORKERS') or 2)
+    REPORT_RESULTS_DIR = os.environ.get('REPORT_RESULTS_DIR')
+    
+    # Lecture lifecycle scheduler (scheduled -> active -> completed); opt-in,
+    # enable it on the long-running web process only. One leader per host is
+    # elected through the lock file (defaults to <instance>)
+    LECTURE_SCHEDULER_ENABLED = os.environ.get('LECTURE_SCHEDULER_ENABLED', 'false').lower() in ['true', 'on', '1']
+    LECTURE_SCHEDULER_INTERVAL = int(os.environ.get('LECTURE_SCHEDULER_INTERVAL') or 60)  # seconds
+    LECTURE_SCHEDULER_LOCK = os.environ.get('LECTURE_SCHEDULER_LOCK')
+    
     @staticmethod
     def init_app(app):
         pass
@@ -60,6 +86,8 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
     LOGIN_DISABLED = True
+    LECTURE_SCHEDULER_ENABLED = False
+    LOCATION_SESSION_STORE = 'memory://'
 
 class ProductionConfig(Config):
     """Production configuration"""
@@ -0,0 +1,79 @@
+"""
+Database migration script for probabilistic boundary checks
+Adds lectures.acceptance_probability, the per-lecture minimum probability of
+being inside a rectangular boundary for a check-in to be accepted
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+from sqlalchemy import text, inspect
+
+
+def _existing_columns(table_name):
+    """Return the set of column names currently on a table"""
+    return {column['name'] for column in inspect(db.engine).get_columns(table_name)}
+
+
+def upgrade():
+    """
+    Add the acceptance_probability column to lectures
+    """
+    print("Starting migration: add_acceptance_probability")
+
+    try:
+        if 'acceptance_probability' not in _existing_columns('lectures'):
+            db.session.execute(text("ALTER TABLE lectures ADD COLUMN acceptance_probability FLOAT"))
+            print("  ✅ Added acceptance_probability")
+        else:
+            print("  ✓ Column acceptance_probability already exists")
+
+        db.session.commit()
+        print("✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.session.rollback()
+        raise
+
+
+def downgrade():
+    """
+    Remove the acceptance_probability column (rollback migration)
+    """
+    print("Starting rollback: remove_acceptance_probability")
+
+    try:
+        try:
+            db.session.execute(text("ALTER TABLE lectures DROP COLUMN acceptance_probability"))
+        except Exception as e:
+            print(f"⚠️ Could not drop column acceptance_probability: {e}")
+
+        db.session.commit()
+        print("✅ Rollback completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Rollback failed: {e}")
+        db.session.rollback()
+        raise
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "="*60)
+        print("ACCEPTANCE PROBABILITY MIGRATION")
+        print("="*60 + "\n")
+
+        if len(sys.argv) > 1 and sys.argv[1] == '--rollback':
+            downgrade()
+        else:
+            upgrade()
@@ -0,0 +1,123 @@
+"""
+Database migration script for attendance counter-cache columns
+Adds per-lecture status counters and per-course enrollment counters, and
+provides a repair command that rebuilds them from the source tables
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+from sqlalchemy import text, inspect
+
+
+LECTURE_COUNTER_COLUMNS = ['present_count', 'absent_count', 'late_count', 'excused_count']
+
+
+def _existing_columns(table_name):
+    """Return the set of column names currently on a table"""
+    return {column['name'] for column in inspect(db.engine).get_columns(table_name)}
+
+
+def upgrade():
+    """
+    Add counter columns and populate them
+    """
+    print("Starting migration: add_attendance_counters")
+
+    try:
+        print("Adding counter columns to lectures table...")
+        existing = _existing_columns('lectures')
+        for column in LECTURE_COUNTER_COLUMNS:
+            if column not in existing:
+                db.session.execute(text(
+                    f"ALTER TABLE lectures ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+                ))
+                print(f"  ✅ Added {column}")
+            else:
+                print(f"  ✓ Column {column} already exists")
+
+        print("Adding counter column to courses table...")
+        if 'active_enrollment_count' not in _existing_columns('courses'):
+            db.session.execute(text(
+                "ALTER TABLE courses ADD COLUMN active_enrollment_count INTEGER NOT NULL DEFAULT 0"
+            ))
+            print("  ✅ Added active_enrollment_count")
+        else:
+            print("  ✓ Column active_enrollment_count already exists")
+
+        db.session.commit()
+
+        # Populate the new columns from existing data
+        repair()
+
+        print("✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.session.rollback()
+        raise
+
+
+def repair():
+    """
+    Rebuild every counter from the attendances and enrollments tables
+    """
+    from models.lecture import Lecture
+    from models.course import Course
+
+    print("Rebuilding attendance counters...")
+    Lecture.repair_attendance_counters()
+    Course.repair_enrollment_counters()
+    db.session.commit()
+    print("✅ Counters rebuilt")
+
+
+def downgrade():
+    """
+    Remove counter columns (rollback migration)
+    """
+    print("Starting rollback: remove_attendance_counters")
+
+    try:
+        for column in LECTURE_COUNTER_COLUMNS:
+            try:
+                db.session.execute(text(f"ALTER TABLE lectures DROP COLUMN {column}"))
+            except Exception as e:
+                print(f"⚠️ Could not drop column {column}: {e}")
+
+        try:
+            db.session.execute(text("ALTER TABLE courses DROP COLUMN active_enrollment_count"))
+        except Exception as e:
+            print(f"⚠️ Could not drop column active_enrollment_count: {e}")
+
+        db.session.commit()
+        print("✅ Rollback completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Rollback failed: {e}")
+        db.session.rollback()
+        raise
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "="*60)
+        print("ATTENDANCE COUNTERS MIGRATION")
+        print("="*60 + "\n")
+
+        if len(sys.argv) > 1 and sys.argv[1] == '--rollback':
+            downgrade()
+        elif len(sys.argv) > 1 and sys.argv[1] == '--repair':
+            # Safe to run at any time, e.g. after bulk imports or raw SQL edits
+            repair()
+        else:
+            upgrade()
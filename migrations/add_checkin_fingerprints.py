@@ -0,0 +1,145 @@
+"""
+Database migration script for proxy check-in detection
+Adds attendances.location_fingerprint and attendances.proximity_key with
+per-lecture indexes, and backfills both for check-ins that stored a position
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+from sqlalchemy import text, inspect
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _existing_columns(table_name):
+    """Return the set of column names currently on a table"""
+    return {column['name'] for column in inspect(db.engine).get_columns(table_name)}
+
+
+def upgrade():
+    """
+    Add the key columns and their indexes, then backfill them
+    """
+    from models.attendance import Attendance
+
+    print("Starting migration: add_checkin_fingerprints")
+
+    try:
+        existing = _existing_columns('attendances')
+        for column in ('location_fingerprint', 'proximity_key'):
+            if column not in existing:
+                db.session.execute(text(f"ALTER TABLE attendances ADD COLUMN {column} VARCHAR(64)"))
+                print(f"  ✅ Added {column}")
+            else:
+                print(f"  ✓ Column {column} already exists")
+        db.session.commit()
+
+        for index in Attendance.__table__.indexes:
+            if index.name in ('ix_attendances_lecture_fingerprint', 'ix_attendances_lecture_proximity'):
+                index.create(db.engine, checkfirst=True)
+                print(f"  ✅ Index {index.name} ready")
+
+        backfill()
+
+        print("✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.session.rollback()
+        raise
+
+
+def backfill():
+    """
+    Compute the keys for stored check-ins (hashing happens in Python, the
+    writes go out as one executemany per batch)
+    """
+    import json
+    from sqlalchemy import select, update
+    from models.attendance import Attendance
+    from utils.checkin_collisions import proximity_cell, proximity_key
+    from utils.geolocation import create_location_fingerprint
+
+    print("Backfilling check-in keys...")
+    total = 0
+    while True:
+        rows = db.session.execute(
+            select(Attendance.id, Attendance.student_latitude, Attendance.student_longitude,
+                   Attendance.location_metadata, Attendance.user_agent)
+            .where(Attendance.proximity_key == None,
+                   Attendance.student_latitude != None,
+                   Attendance.student_longitude != None)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        updates = []
+        for attendance_id, lat, lon, metadata_json, user_agent in rows:
+            try:
+                metadata = json.loads(metadata_json) if metadata_json else {}
+            except ValueError:
+                metadata = {}
+            metadata.setdefault('userAgent', user_agent or '')
+
+            updates.append({
+                'id': attendance_id,
+                'location_fingerprint': create_location_fingerprint(metadata, (lat, lon)),
+                'proximity_key': proximity_key(proximity_cell(lat, lon), metadata['userAgent'])
+            })
+
+        db.session.execute(update(Attendance), updates)
+        db.session.commit()
+        total += len(updates)
+
+    print(f"  ✅ Backfilled {total} attendance records")
+
+
+def downgrade():
+    """
+    Remove the key columns and indexes (rollback migration)
+    """
+    from models.attendance import Attendance
+
+    print("Starting rollback: remove_checkin_fingerprints")
+
+    try:
+        for index in Attendance.__table__.indexes:
+            if index.name in ('ix_attendances_lecture_fingerprint', 'ix_attendances_lecture_proximity'):
+                index.drop(db.engine, checkfirst=True)
+
+        for column in ('location_fingerprint', 'proximity_key'):
+            try:
+                db.session.execute(text(f"ALTER TABLE attendances DROP COLUMN {column}"))
+            except Exception as e:
+                print(f"⚠️ Could not drop column {column}: {e}")
+
+        db.session.commit()
+        print("✅ Rollback completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Rollback failed: {e}")
+        db.session.rollback()
+        raise
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "="*60)
+        print("CHECK-IN FINGERPRINTS MIGRATION")
+        print("="*60 + "\n")
+
+        if len(sys.argv) > 1 and sys.argv[1] == '--rollback':
+            downgrade()
+        else:
+            upgrade()
@@ -0,0 +1,101 @@
+"""
+Database migration script for attendance close-out
+Adds lectures.closed_out_at, which records when absences were materialized
+for a lecture, and optionally backfills absences for lectures already over
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+from sqlalchemy import text, inspect
+
+
+def _existing_columns(table_name):
+    """Return the set of column names currently on a table"""
+    return {column['name'] for column in inspect(db.engine).get_columns(table_name)}
+
+
+def upgrade():
+    """
+    Add the closed_out_at column to lectures
+    """
+    print("Starting migration: add_lecture_closeout")
+
+    try:
+        if 'closed_out_at' not in _existing_columns('lectures'):
+            db.session.execute(text("ALTER TABLE lectures ADD COLUMN closed_out_at TIMESTAMP"))
+            print("  ✅ Added closed_out_at")
+        else:
+            print("  ✓ Column closed_out_at already exists")
+
+        db.session.commit()
+        print("✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.session.rollback()
+        raise
+
+
+def backfill():
+    """
+    Close out every lecture that is already over, in batches
+    """
+    from utils.attendance_closeout import close_out_due_lectures
+
+    print("Materializing absences for past lectures...")
+    total_lectures = total_rows = 0
+    while True:
+        result = close_out_due_lectures()
+        db.session.commit()
+        if not result['lectures']:
+            break
+        total_lectures += result['lectures']
+        total_rows += result['inserted']
+
+    print(f"✅ Closed out {total_lectures} lectures ({total_rows} absent rows)")
+
+
+def downgrade():
+    """
+    Remove the closed_out_at column (rollback migration)
+    """
+    print("Starting rollback: remove_lecture_closeout")
+
+    try:
+        try:
+            db.session.execute(text("ALTER TABLE lectures DROP COLUMN closed_out_at"))
+        except Exception as e:
+            print(f"⚠️ Could not drop column closed_out_at: {e}")
+
+        db.session.commit()
+        print("✅ Rollback completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Rollback failed: {e}")
+        db.session.rollback()
+        raise
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "="*60)
+        print("LECTURE CLOSE-OUT MIGRATION")
+        print("="*60 + "\n")
+
+        if len(sys.argv) > 1 and sys.argv[1] == '--rollback':
+            downgrade()
+        elif len(sys.argv) > 1 and sys.argv[1] == '--backfill':
+            # Absent rows are written for every past lecture; run it deliberately
+            backfill()
+        else:
+            upgrade()
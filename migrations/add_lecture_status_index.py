@@ -0,0 +1,79 @@
+"""
+Database migration script for the lecture lifecycle scheduler
+Creates the (status, scheduled_start) and (status, scheduled_end) indexes on
+lectures and brings every existing lecture's status up to date with its
+schedule
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+
+
+def _status_indexes():
+    from models.lecture import Lecture
+    return [index for index in Lecture.__table__.indexes if index.name.startswith('ix_lectures_status')]
+
+
+def upgrade():
+    """
+    Create the status indexes and advance stale lecture statuses
+    """
+    from utils.lecture_scheduler import advance_lecture_statuses
+
+    print("Starting migration: add_lecture_status_index")
+
+    try:
+        for index in _status_indexes():
+            index.create(db.engine, checkfirst=True)
+            print(f"  ✅ Index {index.name} ready")
+
+        changes = advance_lecture_statuses()
+        db.session.commit()
+        print(f"  ✅ Activated {len(changes['activated'])} and completed "
+              f"{len(changes['completed'])} lectures")
+
+        print("✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.session.rollback()
+        raise
+
+
+def downgrade():
+    """
+    Drop the status indexes (rollback migration)
+    """
+    print("Starting rollback: remove_lecture_status_index")
+
+    try:
+        for index in _status_indexes():
+            index.drop(db.engine, checkfirst=True)
+
+        print("✅ Rollback completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Rollback failed: {e}")
+        raise
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "="*60)
+        print("LECTURE STATUS INDEX MIGRATION")
+        print("="*60 + "\n")
+
+        if len(sys.argv) > 1 and sys.argv[1] == '--rollback':
+            downgrade()
+        else:
+            upgrade()
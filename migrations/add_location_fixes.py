@@ -0,0 +1,91 @@
+"""
+Database migration script for impossible-travel detection
+Creates the location_fixes table and seeds it from the positions already
+stored on present and late attendance records
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+
+
+def upgrade():
+    """
+    Create the location_fixes table and backfill it from attendances
+    """
+    from sqlalchemy import select, insert, func
+    from models.location_fix import LocationFix
+    from models.attendance import Attendance
+
+    print("Starting migration: add_location_fixes")
+
+    try:
+        LocationFix.__table__.create(db.engine, checkfirst=True)
+        print("  ✅ Table location_fixes ready")
+
+        if db.session.execute(select(func.count(LocationFix.id))).scalar():
+            print("  ✓ location_fixes already populated, skipping backfill")
+        else:
+            result = db.session.execute(
+                insert(LocationFix.__table__).from_select(
+                    ['student_id', 'lecture_id', 'attendance_id', 'latitude', 'longitude',
+                     'accuracy', 'recorded_at'],
+                    select(
+                        Attendance.student_id, Attendance.lecture_id, Attendance.id,
+                        Attendance.student_latitude, Attendance.student_longitude,
+                        Attendance.gps_accuracy_at_checkin, Attendance.marked_at
+                    ).where(
+                        Attendance.status.in_(['present', 'late']),
+                        Attendance.student_latitude != None,
+                        Attendance.student_longitude != None,
+                        Attendance.marked_at != None
+                    )
+                )
+            )
+            db.session.commit()
+            print(f"  ✅ Backfilled {result.rowcount} fixes from attendance records")
+
+        print("✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.session.rollback()
+        raise
+
+
+def downgrade():
+    """
+    Drop the location_fixes table (rollback migration)
+    """
+    from models.location_fix import LocationFix
+
+    print("Starting rollback: remove_location_fixes")
+
+    try:
+        LocationFix.__table__.drop(db.engine, checkfirst=True)
+        print("✅ Rollback completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Rollback failed: {e}")
+        raise
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "="*60)
+        print("LOCATION FIXES MIGRATION")
+        print("="*60 + "\n")
+
+        if len(sys.argv) > 1 and sys.argv[1] == '--rollback':
+            downgrade()
+        else:
+            upgrade()
@@ -0,0 +1,64 @@
+"""
+Database migration script for the report job queue
+Creates the report_jobs table that backs the durable background report queue
+and its result cache
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db
+
+
+def upgrade():
+    """
+    Create the report_jobs table
+    """
+    from models.report_job import ReportJob
+
+    print("Starting migration: add_report_jobs")
+
+    try:
+        ReportJob.__table__.create(db.engine, checkfirst=True)
+        print("✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        raise
+
+
+def downgrade():
+    """
+    Drop the report_jobs table (rollback migration)
+    """
+    from models.report_job import ReportJob
+
+    print("Starting rollback: remove_report_jobs")
+
+    try:
+        ReportJob.__table__.drop(db.engine, checkfirst=True)
+        print("✅ Rollback completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"❌ Rollback failed: {e}")
+        raise
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+
+    with app.app_context():
+        print("\n" + "="*60)
+        print("REPORT JOBS MIGRATION")
+        print("="*60 + "\n")
+
+        if len(sys.argv) > 1 and sys.argv[1] == '--rollback':
+            downgrade()
+        else:
+            upgrade()
@@ -4,5 +4,7 @@ from .lecture import Lecture
 from .attendance import Attendance
 from .enrollment import Enrollment
 from .audit_log import AuditLog
+from .report_job import ReportJob
+from .location_fix import LocationFix
 
-__all__ = ['User', 'Course', 'Lecture', 'Attendance', 'Enrollment', 'AuditLog']
\ No newline at end of file
+__all__ = ['User', 'Course', 'Lecture', 'Attendance', 'Enrollment', 'AuditLog', 'ReportJob', 'LocationFix']
\ No newline at end of file
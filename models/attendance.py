@@ -1,9 +1,16 @@
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 from extensions import db
 
 # IST timezone (UTC+5:30)
 IST = timezone(timedelta(hours=5, minutes=30))
 
+# Statuses with a matching <status>_count counter column on lectures
+ATTENDANCE_COUNTER_STATUSES = ('present', 'absent', 'late', 'excused')
+
 class Attendance(db.Model):
     __tablename__ = 'attendances'
     
@@ -32,6 +39,8 @@ class Attendance(db.Model):
     
     # Security and audit fields
     client_ip = db.Column(db.String(45))  # IP address when marked
+    location_fingerprint = db.Column(db.String(64))  # utils.geolocation.create_location_fingerprint
+    proximity_key = db.Column(db.String(64))  # ~1m grid cell + user agent (utils.checkin_collisions)
     verification_status = db.Column(db.String(20), default='verified')  # verified, suspicious, flagged
     
     # Timing
@@ -46,7 +55,12 @@ class Attendance(db.Model):
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(IST), onupdate=lambda: datetime.now(IST))
     
     # Composite unique constraint
-    __table_args__ = (db.UniqueConstraint('student_id', 'lecture_id', name='unique_student_lecture'),)
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'lecture_id', name='unique_student_lecture'),
+        # Same-device check-ins of different students to one lecture
+        db.Index('ix_attendances_lecture_fingerprint', 'lecture_id', 'location_fingerprint'),
+        db.Index('ix_attendances_lecture_proximity', 'lecture_id', 'proximity_key'),
+    )
     
     def mark_present(self, latitude=None, longitude=None, distance=None, auto_marked=False):
         """Mark attendance as present"""
@@ -118,4 +132,82 @@ class Attendance(db.Model):
         }
     
     def __repr__(self):
-        return f'<Attendance {self.student_id} -> {self.lecture_id}: {self.status}>'
\ No newline at end of file
+        return f'<Attendance {self.student_id} -> {self.lecture_id}: {self.status}>'
+
+
+# ============================================================================
+# LECTURE COUNTER CACHE MAINTENANCE
+# ============================================================================
+
+def _adjust_lecture_counter(connection, session, lecture_id, status, delta):
+    """Atomically shift one lecture counter and keep a loaded Lecture in sync"""
+    if lecture_id is None or status not in ATTENDANCE_COUNTER_STATUSES:
+        return
+    
+    from models.lecture import Lecture
+    
+    column_name = f'{status}_count'
+    lectures = Lecture.__table__
+    connection.execute(
+        lectures.update()
+        .where(lectures.c.id == lecture_id)
+        .values({column_name: lectures.c[column_name] + delta})
+    )
+    
+    if session is not None:
+        lecture = session.identity_map.get(identity_key(Lecture, lecture_id))
+        if lecture is not None and column_name in lecture.__dict__:
+            current = lecture.__dict__[column_name] or 0
+            set_committed_value(lecture, column_name, current + delta)
+
+
+def _previous_value(target, attribute):
+    """Value of an attribute before the pending change (or the current one)"""
+    history = inspect(target).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(target, attribute)
+
+
+# Load the old value on assignment so status history is complete for the
+# update listener even when the instance was expired by a previous commit.
+@event.listens_for(Attendance.status, 'set', active_history=True)
+def _track_status_history(target, value, oldvalue, initiator):
+    return value
+
+
+@event.listens_for(Attendance.lecture_id, 'set', active_history=True)
+def _track_lecture_history(target, value, oldvalue, initiator):
+    return value
+
+
+@event.listens_for(Attendance, 'after_insert')
+def _count_inserted_attendance(mapper, connection, target):
+    _adjust_lecture_counter(connection, object_session(target),
+                            target.lecture_id, target.status, 1)
+
+
+@event.listens_for(Attendance, 'after_update')
+def _count_updated_attendance(mapper, connection, target):
+    state = inspect(target)
+    if not (state.attrs.status.history.has_changes() or
+            state.attrs.lecture_id.history.has_changes()):
+        return
+    
+    old_lecture_id = _previous_value(target, 'lecture_id')
+    old_status = _previous_value(target, 'status')
+    if old_lecture_id == target.lecture_id and old_status == target.status:
+        return
+    
+    session = object_session(target)
+    _adjust_lecture_counter(connection, session, old_lecture_id, old_status, -1)
+    _adjust_lecture_counter(connection, session, target.lecture_id, target.status, 1)
+
+
+@event.listens_for(Attendance, 'before_delete')
+def _count_deleted_attendance(mapper, connection, target):
+    # before_delete: the row (and any expired status) can still be loaded
+    _adjust_lecture_counter(connection, object_session(target),
+                            target.lecture_id, target.status, -1)
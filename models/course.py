@@ -16,6 +16,7 @@ class Course(db.Model):
     semester = db.Column(db.String(20))
     academic_year = db.Column(db.String(10))
     is_active = db.Column(db.Boolean, default=True)
+    active_enrollment_count = db.Column(db.Integer, default=0, nullable=False)  # Counter cache of active enrollments
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(IST))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(IST), onupdate=lambda: datetime.now(IST))
     
@@ -25,6 +26,11 @@ class Course(db.Model):
     lectures = db.relationship('Lecture', backref='course', lazy='dynamic',
                              cascade='all, delete-orphan')
     
+    # Eager-loadable (non-dynamic) views of the collections above
+    enrollment_list = db.relationship('Enrollment', viewonly=True)
+    lecture_list = db.relationship('Lecture', viewonly=True,
+                                 order_by='Lecture.scheduled_start.desc()')
+    
     def get_enrolled_students(self):
         """Get all enrolled students"""
         from models.user import User
@@ -38,8 +44,32 @@ class Course(db.Model):
         return self.lectures.filter_by(is_active=True).count()
     
     def get_enrollment_count(self):
-        """Get number of enrolled students"""
-        return self.enrollments.filter_by(is_active=True).count()
+        """Get number of enrolled students (read from the counter cache)"""
+        return self.active_enrollment_count or 0
+    
+    @staticmethod
+    def repair_enrollment_counters(course_ids=None):
+        """Recompute active_enrollment_count from the enrollments table in one UPDATE"""
+        from sqlalchemy import select, func, update
+        from models.enrollment import Enrollment
+        
+        stmt = update(Course).values(
+            active_enrollment_count=select(func.count(Enrollment.id)).where(
+                Enrollment.course_id == Course.id,
+                Enrollment.is_active == True
+            ).scalar_subquery()
+        )
+        if course_ids is not None:
+            course_ids = list(course_ids)
+            if not course_ids:
+                return
+            stmt = stmt.where(Course.id.in_(course_ids))
+        
+        db.session.execute(stmt.execution_options(synchronize_session=False))
+        
+        for obj in list(db.session.identity_map.values()):
+            if isinstance(obj, Course) and (course_ids is None or obj.id in course_ids):
+                db.session.expire(obj, ['active_enrollment_count'])
     
     def to_dict(self):
         """Convert course to dictionary"""
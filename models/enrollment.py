@@ -1,4 +1,8 @@
 from datetime import datetime, timezone, timedelta
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 from extensions import db
 
 # IST timezone (UTC+5:30)
@@ -54,4 +58,75 @@ class Enrollment(db.Model):
         }
     
     def __repr__(self):
-        return f'<Enrollment {self.student_id} -> {self.course_id}>'
\ No newline at end of file
+        return f'<Enrollment {self.student_id} -> {self.course_id}>'
+
+
+# ============================================================================
+# COURSE ENROLLMENT COUNTER MAINTENANCE
+# ============================================================================
+
+def _adjust_course_counter(connection, session, course_id, delta):
+    """Atomically shift Course.active_enrollment_count and sync a loaded Course"""
+    if course_id is None:
+        return
+    
+    from models.course import Course
+    
+    courses = Course.__table__
+    connection.execute(
+        courses.update()
+        .where(courses.c.id == course_id)
+        .values(active_enrollment_count=courses.c.active_enrollment_count + delta)
+    )
+    
+    if session is not None:
+        course = session.identity_map.get(identity_key(Course, course_id))
+        if course is not None and 'active_enrollment_count' in course.__dict__:
+            current = course.__dict__['active_enrollment_count'] or 0
+            set_committed_value(course, 'active_enrollment_count', current + delta)
+
+
+def _previous_value(target, attribute):
+    history = inspect(target).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(target, attribute)
+
+
+@event.listens_for(Enrollment.is_active, 'set', active_history=True)
+def _track_active_history(target, value, oldvalue, initiator):
+    return value
+
+
+@event.listens_for(Enrollment.course_id, 'set', active_history=True)
+def _track_course_history(target, value, oldvalue, initiator):
+    return value
+
+
+@event.listens_for(Enrollment, 'after_insert')
+def _count_inserted_enrollment(mapper, connection, target):
+    if target.is_active:
+        _adjust_course_counter(connection, object_session(target), target.course_id, 1)
+
+
+@event.listens_for(Enrollment, 'after_update')
+def _count_updated_enrollment(mapper, connection, target):
+    old_course_id = _previous_value(target, 'course_id')
+    old_active = bool(_previous_value(target, 'is_active'))
+    new_active = bool(target.is_active)
+    if old_course_id == target.course_id and old_active == new_active:
+        return
+    
+    session = object_session(target)
+    if old_active:
+        _adjust_course_counter(connection, session, old_course_id, -1)
+    if new_active:
+        _adjust_course_counter(connection, session, target.course_id, 1)
+
+
+@event.listens_for(Enrollment, 'before_delete')
+def _count_deleted_enrollment(mapper, connection, target):
+    if target.is_active:
+        _adjust_course_counter(connection, object_session(target), target.course_id, -1)
@@ -29,6 +29,7 @@ class Lecture(db.Model):
     boundary_center_lon = db.Column(db.Float(precision=10))
     gps_accuracy_threshold = db.Column(db.Integer, default=20)  # meters (10, 15, or 20)
     boundary_tolerance_m = db.Column(db.Float, default=2.0)  # Edge tolerance in meters
+    acceptance_probability = db.Column(db.Float)  # Min probability of being inside to accept a check-in (None: 0.5)
     boundary_validation_method = db.Column(db.String(50))  # 'point_in_polygon', 'circular', etc.
     boundary_created_at = db.Column(db.DateTime)
     boundary_last_modified = db.Column(db.DateTime)
@@ -56,6 +57,7 @@ class Lecture(db.Model):
     scheduled_end = db.Column(db.DateTime, nullable=False)
     actual_start = db.Column(db.DateTime)
     actual_end = db.Column(db.DateTime)
+    closed_out_at = db.Column(db.DateTime)  # When absences were materialized for non-attendees
     
     # Status
     status = db.Column(db.Enum('scheduled', 'active', 'completed', 'cancelled', 
@@ -67,13 +69,29 @@ class Lecture(db.Model):
     attendance_window_end = db.Column(db.Integer, default=15)    # minutes after start
     auto_mark_attendance = db.Column(db.Boolean, default=True)
     
+    # Attendance counter cache (maintained by the Attendance mapper listeners,
+    # rebuilt with repair_attendance_counters)
+    present_count = db.Column(db.Integer, default=0, nullable=False)
+    absent_count = db.Column(db.Integer, default=0, nullable=False)
+    late_count = db.Column(db.Integer, default=0, nullable=False)
+    excused_count = db.Column(db.Integer, default=0, nullable=False)
+    
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(IST))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(IST), onupdate=lambda: datetime.now(IST))
     
+    # Status is kept current by the lifecycle scheduler, so lookups filter on it first
+    __table_args__ = (
+        db.Index('ix_lectures_status_start', 'status', 'scheduled_start'),
+        db.Index('ix_lectures_status_end', 'status', 'scheduled_end'),
+    )
+    
     # Relationships
     attendances = db.relationship('Attendance', backref='lecture', lazy='dynamic',
                                 cascade='all, delete-orphan')
     
+    # Eager-loadable (non-dynamic) view of attendances
+    attendance_list = db.relationship('Attendance', viewonly=True)
+    
     def is_attendance_window_open(self):
         """Check if attendance window is currently open"""
         now = datetime.now(IST)
@@ -97,11 +115,11 @@ class Lecture(db.Model):
         return start_window <= now <= end_window
     
     def get_attendance_stats(self):
-        """Get attendance statistics for this lecture"""
-        total_enrolled = self.course.get_enrollment_count()
-        present_count = self.attendances.filter_by(status='present').count()
-        absent_count = self.attendances.filter_by(status='absent').count()
-        late_count = self.attendances.filter_by(status='late').count()
+        """Get attendance statistics for this lecture (read from the counter cache)"""
+        total_enrolled = self.course.get_enrollment_count() if self.course else 0
+        present_count = self.present_count or 0
+        absent_count = self.absent_count or 0
+        late_count = self.late_count or 0
         
         return {
             'total_enrolled': total_enrolled,
@@ -111,6 +129,42 @@ class Lecture(db.Model):
             'attendance_rate': round((present_count / total_enrolled * 100), 2) if total_enrolled > 0 else 0
         }
     
+    @staticmethod
+    def repair_attendance_counters(lecture_ids=None):
+        """
+        Recompute the attendance counter columns from the attendances table
+        
+        Runs a single UPDATE with one correlated COUNT per status. Use it after
+        bulk statements that bypass the ORM listeners, or to fix drifted rows.
+        
+        Args:
+            lecture_ids: Optional iterable of lecture IDs to limit the repair to
+        """
+        from sqlalchemy import select, func, update
+        from models.attendance import Attendance, ATTENDANCE_COUNTER_STATUSES
+        
+        values = {}
+        for status in ATTENDANCE_COUNTER_STATUSES:
+            values[f'{status}_count'] = select(func.count(Attendance.id)).where(
+                Attendance.lecture_id == Lecture.id,
+                Attendance.status == status
+            ).scalar_subquery()
+        
+        stmt = update(Lecture).values(**values)
+        if lecture_ids is not None:
+            lecture_ids = list(lecture_ids)
+            if not lecture_ids:
+                return
+            stmt = stmt.where(Lecture.id.in_(lecture_ids))
+        
+        db.session.execute(stmt.execution_options(synchronize_session=False))
+        
+        # Counters changed underneath any loaded instances
+        counter_columns = [f'{status}_count' for status in ATTENDANCE_COUNTER_STATUSES]
+        for obj in list(db.session.identity_map.values()):
+            if isinstance(obj, Lecture) and (lecture_ids is None or obj.id in lecture_ids):
+                db.session.expire(obj, counter_columns)
+    
     def start_lecture(self):
         """Start the lecture"""
         self.status = 'active'
@@ -118,9 +172,12 @@ class Lecture(db.Model):
         db.session.commit()
     
     def end_lecture(self):
-        """End the lecture"""
+        """End the lecture and mark enrolled students without attendance absent"""
+        from utils.attendance_closeout import close_out_lecture
+        
         self.status = 'completed'
         self.actual_end = datetime.now(IST)
+        close_out_lecture(self, closed_at=self.actual_end)
         db.session.commit()
     
     def is_within_geofence(self, student_lat, student_lon):
@@ -310,18 +367,20 @@ class Lecture(db.Model):
         Args:
             student_lat: Student latitude
             student_lon: Student longitude
-            gps_accuracy: GPS accuracy in meters (optional)
+            gps_accuracy: GPS accuracy in meters (optional; for rectangular
+                boundaries a missing accuracy counts as very poor)
         
         Returns:
             Dictionary with validation results
         """
         try:
             if self.geofence_type == 'rectangular':
-                # Use rectangular boundary validation
-                from utils.rectangular_geofence import (
-                    point_in_rectangular_boundary,
-                    apply_tolerance_buffer,
-                    validate_gps_accuracy
+                # Probability that the student is inside, given the GPS accuracy
+                from utils.boundary_probability import (
+                    BoundaryFrame,
+                    inside_probability,
+                    is_accepted,
+                    DEFAULT_ACCEPTANCE_PROBABILITY
                 )
                 
                 boundary = self.get_boundary()
@@ -329,42 +388,31 @@ class Lecture(db.Model):
                     # Fallback to circular
                     return self._validate_circular(student_lat, student_lon)
                 
-                # Validate GPS accuracy if provided
-                if gps_accuracy:
-                    gps_result = validate_gps_accuracy(
-                        gps_accuracy,
-                        self.gps_accuracy_threshold or 20,
-                        student_lat,
-                        student_lon,
-                        boundary
-                    )
-                    
-                    if not gps_result['acceptable'] and gps_result['reason'].startswith('gps_accuracy_exceeds'):
-                        return {
-                            'within_geofence': False,
-                            'method': 'rectangular',
-                            'reason': 'gps_accuracy_too_low',
-                            'gps_accuracy': gps_accuracy,
-                            'threshold': self.gps_accuracy_threshold,
-                            'details': gps_result
-                        }
-                
-                # Apply tolerance buffer
-                tolerance_result = apply_tolerance_buffer(
+                threshold = self.acceptance_probability or DEFAULT_ACCEPTANCE_PROBABILITY
+                result = inside_probability(
+                    BoundaryFrame(boundary, self.boundary_tolerance_m or 2.0),
                     student_lat,
                     student_lon,
-                    boundary,
-                    self.boundary_tolerance_m or 2.0,
-                    gps_accuracy or 999
+                    gps_accuracy
                 )
+                accepted = is_accepted(result, threshold)
+                if result['probability'] >= threshold:
+                    reason = 'inside_probability_met'
+                elif accepted:
+                    reason = 'near_centre'
+                else:
+                    reason = 'inside_probability_too_low'
                 
                 return {
-                    'within_geofence': tolerance_result['accepted'],
+                    'within_geofence': accepted,
                     'method': 'rectangular',
-                    'reason': tolerance_result['reason'],
-                    'distance_to_edge': tolerance_result.get('distance_to_edge', 0),
-                    'tolerance_applied': tolerance_result.get('applied_tolerance', False),
-                    'details': tolerance_result
+                    'reason': reason,
+                    'distance_to_edge': result['distance_to_edge'],
+                    'tolerance_applied': accepted and not result['inside'],
+                    'inside_probability': result['probability'],
+                    'required_probability': threshold,
+                    'gps_accuracy': gps_accuracy,
+                    'details': result
                 }
                 
             else:
@@ -430,6 +478,7 @@ class Lecture(db.Model):
                 base_dict['boundary_perimeter_m'] = self.boundary_perimeter_m
                 base_dict['gps_accuracy_threshold'] = self.gps_accuracy_threshold
                 base_dict['boundary_tolerance_m'] = self.boundary_tolerance_m
+                base_dict['acceptance_probability'] = self.acceptance_probability
             except:
                 pass
         
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone, timedelta
+from extensions import db
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+class LocationFix(db.Model):
+    """Validated student position, kept for impossible-travel checks"""
+    __tablename__ = 'location_fixes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    lecture_id = db.Column(db.Integer, db.ForeignKey('lectures.id'))
+    attendance_id = db.Column(db.Integer, db.ForeignKey('attendances.id'))
+
+    latitude = db.Column(db.Float(precision=10), nullable=False)
+    longitude = db.Column(db.Float(precision=10), nullable=False)
+    accuracy = db.Column(db.Float)  # GPS accuracy in meters
+    recorded_at = db.Column(db.DateTime, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(IST))
+
+    # Recent fixes per student are read newest first
+    __table_args__ = (db.Index('ix_location_fixes_student_recorded', 'student_id', 'recorded_at'),)
+
+    def __repr__(self):
+        return f'<LocationFix {self.student_id} @ {self.recorded_at}: {self.latitude}, {self.longitude}>'
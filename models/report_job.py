@@ -0,0 +1,59 @@
+from datetime import datetime, timezone, timedelta
+from extensions import db
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+class ReportJob(db.Model):
+    """Durable report job queue entry and result cache record"""
+    __tablename__ = 'report_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    report_type = db.Column(db.String(50), nullable=False)  # key in utils.report_jobs.REPORT_TYPES
+    params = db.Column(db.JSON)  # Normalized report filters
+
+    # Result cache key: hash of (report_type, params, data_version)
+    cache_key = db.Column(db.String(64), nullable=False, index=True)
+    data_version = db.Column(db.String(128))  # Stamp of the underlying data when queued
+
+    status = db.Column(db.Enum('queued', 'running', 'completed', 'failed',
+                              name='report_job_status'), default='queued', nullable=False, index=True)
+    filename = db.Column(db.String(255))  # Download filename
+    result_path = db.Column(db.String(500))  # Artifact on local disk
+    row_count = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    cache_hit = db.Column(db.Boolean, default=False)  # Served from an earlier identical job
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    worker = db.Column(db.String(100))  # Worker that claimed the job
+
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(IST), index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    # Relationship
+    owner = db.relationship('User', backref=db.backref('report_jobs', lazy='dynamic'))
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+    def to_dict(self):
+        """Convert report job to dictionary"""
+        return {
+            'job_id': self.id,
+            'report_type': self.report_type,
+            'params': self.params,
+            'status': self.status,
+            'filename': self.filename,
+            'row_count': self.row_count,
+            'error': self.error,
+            'cache_hit': self.cache_hit,
+            'data_version': self.data_version,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<ReportJob {self.id} {self.report_type} {self.status}>'
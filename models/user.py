@@ -37,6 +37,17 @@ class User(UserMixin, db.Model):
     attendances = db.relationship('Attendance', backref='student', lazy='dynamic',
                                 foreign_keys='Attendance.student_id')
     
+    # Non-dynamic views of the collections above; unlike the dynamic
+    # relationships these can be eager-loaded (see utils/loader_profiles.py)
+    enrollment_list = db.relationship('Enrollment', viewonly=True,
+                                    foreign_keys='Enrollment.student_id')
+    taught_course_list = db.relationship('Course', viewonly=True,
+                                       foreign_keys='Course.teacher_id')
+    lecture_list = db.relationship('Lecture', viewonly=True,
+                                 foreign_keys='Lecture.teacher_id')
+    attendance_list = db.relationship('Attendance', viewonly=True,
+                                    foreign_keys='Attendance.student_id')
+    
     def set_password(self, password):
         """Hash and set password"""
         self.password_hash = generate_password_hash(password)
@@ -1,9 +1,13 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
 from flask_login import login_required, current_user
 from models.user import User
 from models.course import Course
 from models.lecture import Lecture
 from app import db
+from utils.loader_profiles import with_profile
+from utils.admin_stats import (get_admin_stats, paginate_users, paginate_courses,
+                               teacher_choices, DEFAULT_PER_PAGE)
+from utils.report_jobs import report_jobs, send_report_result, REPORT_TYPES
 from datetime import datetime, timedelta, timezone
 
 # IST timezone (UTC+5:30)
@@ -21,32 +25,97 @@ def require_admin():
 @admin_bp.route('/dashboard')
 def dashboard():
     """Admin dashboard with system overview"""
-    stats = {
-        'total_users': User.query.count(),
-        'total_courses': Course.query.count(),
-        'total_lectures': Lecture.query.count(),
-        'active_lectures': Lecture.query.filter_by(is_active=True).count()
-    }
+    stats = get_admin_stats()
     return render_template('admin/dashboard.html', stats=stats)
 
 @admin_bp.route('/users')
 def manage_users():
     """Manage system users"""
-    users = User.query.all()
-    return render_template('admin/users.html', users=users)
+    filters = {
+        'search': request.args.get('q', '').strip() or None,
+        'role': request.args.get('role') or None,
+        'status': request.args.get('status') or None,
+    }
+    users, course_counts = paginate_users(
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', DEFAULT_PER_PAGE, type=int),
+        **filters
+    )
+    return render_template('admin/users.html', users=users,
+                         course_counts=course_counts, filters=filters)
 
 @admin_bp.route('/courses')
 def manage_courses():
     """Manage courses"""
-    courses = Course.query.all()
-    users = User.query.all()  # For teacher selection
-    return render_template('admin/courses.html', courses=courses, users=users)
+    filters = {
+        'search': request.args.get('q', '').strip() or None,
+        'teacher_id': request.args.get('teacher_id', type=int),
+        'status': request.args.get('status') or None,
+    }
+    courses, lecture_counts = paginate_courses(
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', DEFAULT_PER_PAGE, type=int),
+        **filters
+    )
+    teachers = teacher_choices()  # For teacher selection
+    return render_template('admin/courses.html', courses=courses, teachers=teachers,
+                         lecture_counts=lecture_counts, filters=filters)
 
 @admin_bp.route('/reports')
 def reports():
     """System reports"""
     return render_template('admin/reports.html')
 
+@admin_bp.route('/reports/jobs', methods=['POST'])
+def start_report_job():
+    """Queue an institution-wide attendance export (pdf, csv or parquet)"""
+    data = request.get_json(silent=True) or request.form
+    export_format = data.get('format', 'csv')
+    
+    report_type = f'attendance_{export_format}'
+    if report_type not in REPORT_TYPES:
+        return jsonify({'error': f'Unsupported report format: {export_format}'}), 400
+    
+    missing = REPORT_TYPES[report_type].missing_dependency()
+    if missing:
+        return jsonify({'error': f'{export_format} exports need the {missing} package, which is not installed'}), 400
+    
+    try:
+        filters = {
+            'course_id': data.get('course_id') or None,
+            'student_id': data.get('student_id') or None,
+            'teacher_id': data.get('teacher_id') or None,
+            'start_date': datetime.fromisoformat(data['start_date']) if data.get('start_date') else None,
+            'end_date': datetime.fromisoformat(data['end_date']) if data.get('end_date') else None
+        }
+        job = report_jobs.submit(current_app._get_current_object(), owner_id=current_user.id,
+                                 report_type=report_type, filters=filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = job.to_dict()
+    response['status_url'] = url_for('admin.report_job_status', job_id=job.id)
+    response['download_url'] = url_for('admin.download_report_job', job_id=job.id)
+    return jsonify(response), 200 if job.status == 'completed' else 202
+
+@admin_bp.route('/reports/jobs/<job_id>')
+def report_job_status(job_id):
+    """Poll the status of a background report job"""
+    job = report_jobs.get(job_id, owner_id=current_user.id)
+    if not job:
+        return jsonify({'error': 'Report job not found'}), 404
+    
+    return jsonify(job.to_dict())
+
+@admin_bp.route('/reports/jobs/<job_id>/download')
+def download_report_job(job_id):
+    """Download the file produced by a completed report job"""
+    job = report_jobs.get(job_id, owner_id=current_user.id)
+    if not job:
+        return jsonify({'error': 'Report job not found'}), 404
+    
+    return send_report_result(job)
+
 @admin_bp.route('/settings')
 def settings():
     """System settings"""
@@ -250,7 +319,7 @@ def delete_course(course_id):
 @admin_bp.route('/course/<int:course_id>/detail')
 def course_detail(course_id):
     """Course detail page"""
-    course = Course.query.get_or_404(course_id)
+    course = with_profile(Course.query, 'admin.course_detail').filter_by(id=course_id).first_or_404()
     return render_template('admin/course_detail.html', course=course)
 
 @admin_bp.route('/course/<int:course_id>/toggle-status', methods=['POST'])
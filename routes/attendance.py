@@ -10,6 +10,8 @@ from models.enrollment import Enrollment
 from utils.geolocation import calculate_distance, is_within_geofence, validate_coordinates
 from utils.auth import student_required, jwt_student_required, log_user_activity
 from utils.notifications import send_attendance_notification, send_geofence_alert
+from utils.serializers import AttendanceSerializer
+from utils.bulk_attendance import bulk_update_attendance as bulk_update_attendance_rows
 
 attendance_bp = Blueprint('attendance', __name__)
 
@@ -208,7 +210,7 @@ def student_attendance(student_id):
     
     return jsonify({
         'student': student.to_dict(),
-        'attendances': [attendance.to_dict() for attendance in attendances]
+        'attendances': AttendanceSerializer().serialize(attendances)
     }), 200
 
 @attendance_bp.route('/lecture/<int:lecture_id>')
@@ -241,7 +243,7 @@ def lecture_attendance(lecture_id):
     
     return jsonify({
         'lecture': lecture.to_dict(),
-        'attendances': [attendance.to_dict() for attendance in attendances],
+        'attendances': AttendanceSerializer().serialize(attendances),
         'unmarked_students': [student.to_dict() for student in unmarked_students],
         'stats': lecture.get_attendance_stats()
     }), 200
@@ -307,37 +309,13 @@ def bulk_update_attendance():
     if not updates:
         return jsonify({'error': 'No updates provided'}), 400
     
-    updated_count = 0
-    errors = []
-    
-    for update in updates:
-        try:
-            attendance_id = update.get('attendance_id')
-            new_status = update.get('status')
-            notes = update.get('notes')
-            
-            attendance = Attendance.query.get(attendance_id)
-            if not attendance:
-                errors.append(f'Attendance {attendance_id} not found')
-                continue
-            
-            # Check permissions
-            if current_user.is_teacher() and attendance.lecture.teacher_id != current_user.id:
-                errors.append(f'Access denied for attendance {attendance_id}')
-                continue
-            
-            if new_status in ['present', 'absent', 'late', 'excused']:
-                attendance.status = new_status
-                attendance.notes = notes
-                attendance.updated_at = datetime.utcnow()
-                updated_count += 1
-        
-        except Exception as e:
-            errors.append(f'Error updating attendance {attendance_id}: {str(e)}')
-    
     try:
+        result = bulk_update_attendance_rows(updates, current_user)
         db.session.commit()
         
+        updated_count = result['updated']
+        errors = result['errors']
+        
         return jsonify({
             'message': f'Updated {updated_count} attendance records',
             'updated_count': updated_count,
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, current_app
 from flask_login import login_required, current_user
 from datetime import datetime, timedelta, timezone
 from models.enrollment import Enrollment
@@ -6,7 +6,12 @@ from models.lecture import Lecture
 from models.attendance import Attendance
 from models.course import Course
 from utils.auth import student_required
+from utils.loader_profiles import with_profile
+from utils.student_dashboard import get_student_dashboard
+from utils.location_sample import LocationSample
+from utils.location_fusion import fuse_samples
 from extensions import db
+from sqlalchemy import select
 
 # IST timezone (UTC+5:30)
 IST = timezone(timedelta(hours=5, minutes=30))
@@ -18,76 +23,27 @@ student_bp = Blueprint('student', __name__)
 @student_required
 def dashboard():
     """Student dashboard"""
-    # Get enrolled courses
-    enrollments = Enrollment.query.filter_by(
-        student_id=current_user.id,
-        is_active=True
-    ).all()
-    
-    # Get upcoming lectures
-    upcoming_lectures = Lecture.query.join(Course).join(Enrollment)\
-        .filter(
-            Enrollment.student_id == current_user.id,
-            Enrollment.is_active == True,
-            Lecture.scheduled_start > datetime.now(IST),
-            Lecture.is_active == True
-        )\
-        .order_by(Lecture.scheduled_start)\
-        .limit(5)\
-        .all()
-    
-    # Get active lectures count (for dashboard display)
-    today = datetime.now(IST).date()
-    active_lectures_count = Lecture.query.join(Course).join(Enrollment)\
-        .filter(
-            Enrollment.student_id == current_user.id,
-            Enrollment.is_active == True,
-            Lecture.is_active == True,
-            db.or_(
-                Lecture.status == 'active',
-                db.and_(
-                    Lecture.status == 'scheduled',
-                    db.func.date(Lecture.scheduled_start) == today
-                )
-            )
-        )\
-        .count()
-    
-    # Get recent attendance
-    recent_attendance = Attendance.query.filter_by(student_id=current_user.id)\
-        .join(Lecture)\
-        .order_by(Attendance.marked_at.desc())\
-        .limit(10)\
-        .all()
-    
-    # Calculate overall attendance percentage
-    total_lectures = Attendance.query.filter_by(student_id=current_user.id).count()
-    present_lectures = Attendance.query.filter_by(
-        student_id=current_user.id,
-        status='present'
-    ).count()
-    
-    attendance_percentage = (present_lectures / total_lectures * 100) if total_lectures > 0 else 0
+    data = get_student_dashboard(current_user.id)
     
     return render_template('student/dashboard.html',
-                         enrollments=enrollments,
-                         upcoming_lectures=upcoming_lectures,
-                         recent_attendance=recent_attendance,
-                         attendance_percentage=round(attendance_percentage, 2),
-                         active_lectures_count=active_lectures_count)
+                         enrollment_count=data['enrollment_count'],
+                         upcoming_lectures=data['upcoming_lectures'],
+                         recent_attendance=data['recent_attendance'],
+                         attendance_percentage=data['attendance_percentage'],
+                         active_lectures_count=data['active_lectures_count'])
 
 @student_bp.route('/courses')
 @login_required
 @student_required
 def courses():
     """Student courses page"""
-    enrollments = Enrollment.query.filter_by(
+    enrollments = with_profile(Enrollment.query, 'student.enrollments').filter_by(
         student_id=current_user.id,
         is_active=True
     ).all()
     
     # Also get available courses for enrollment
-    available_courses = Course.query.filter_by(is_active=True).all()
+    available_courses = with_profile(Course.query, 'student.courses').filter_by(is_active=True).all()
     enrolled_course_ids = [e.course_id for e in enrollments]
     available_courses = [c for c in available_courses if c.id not in enrolled_course_ids]
     
@@ -241,9 +197,22 @@ def api_checkin():
         student_lon = data.get('longitude')
         auto_checkin = data.get('auto_checkin', False)
         
-        # Extract GPS metadata
-        metadata = data.get('metadata', {})
-        gps_accuracy = metadata.get('accuracy', 999)
+        # Extract GPS metadata (parsed once, reused by every check below)
+        sample = LocationSample.parse(data.get('metadata') or {}, student_lat, student_lon)
+        gps_accuracy = sample.accuracy if sample.accuracy is not None else 999
+        
+        # A burst of samples is fused into one fix (weighted median, outliers dropped)
+        fusion = None
+        if data.get('samples'):
+            try:
+                fusion = fuse_samples(data['samples'])
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                })
+            student_lat, student_lon = fusion['latitude'], fusion['longitude']
+            gps_accuracy = fusion['accuracy']
         
         if not all([lecture_id, student_lat, student_lon]):
             return jsonify({
@@ -309,48 +278,21 @@ def api_checkin():
             float(lecture.latitude), float(lecture.longitude)
         )
         
-        # Smart GPS accuracy validation based on distance
+        # Rectangular boundaries weigh GPS accuracy themselves (probability of
+        # being inside); circular geofences keep the distance-based checks
+        uses_probability = lecture.geofence_type == 'rectangular' and bool(lecture.boundary_coordinates)
         gps_threshold = lecture.gps_accuracy_threshold or 20
         
-        # If student is very close to lecture center (< 10m), accept any GPS accuracy
-        # This handles cases where student is clearly in the classroom
-        if distance_from_center < 10:
-            # Student is obviously in the classroom, accept even with poor GPS
-            print(f"Smart validation: Student very close ({distance_from_center:.1f}m), accepting despite GPS accuracy {gps_accuracy:.1f}m")
-        # If student is reasonably close (10-30m), require moderate GPS accuracy (< 50m)
-        elif distance_from_center < 30 and gps_accuracy > 50:
-            return jsonify({
-                'success': False,
-                'message': f'GPS accuracy too low: {gps_accuracy:.1f}m (required: ≤50m for your distance)',
-                'validation': {
-                    'gps_accuracy_acceptable': False,
-                    'required_accuracy': 50,
-                    'current_accuracy': gps_accuracy,
-                    'distance_from_center': round(distance_from_center, 1)
-                },
-                'guidance': 'Move to an area with better GPS signal (outdoors or near windows)'
-            })
-        # If student is at edge of boundary (30-50m), require good GPS accuracy
-        elif distance_from_center >= 30 and gps_accuracy > gps_threshold:
-            return jsonify({
-                'success': False,
-                'message': f'GPS accuracy too low: {gps_accuracy:.1f}m (required: ≤{gps_threshold}m)',
-                'validation': {
-                    'gps_accuracy_acceptable': False,
-                    'required_accuracy': gps_threshold,
-                    'current_accuracy': gps_accuracy,
-                    'distance_from_center': round(distance_from_center, 1)
-                },
-                'guidance': 'Move to an area with better GPS signal (outdoors or near windows)'
-            })
+        if not uses_probability:
+            accuracy_error = _distance_band_accuracy_error(distance_from_center, gps_accuracy, gps_threshold)
+            if accuracy_error:
+                return jsonify(accuracy_error)
         
         # Use enhanced geofence validation (supports both circular and rectangular)
-        # If smart validation approved (student < 10m), skip GPS accuracy check in boundary validation
-        skip_gps_check = distance_from_center < 10
         validation_result = lecture.is_within_geofence_enhanced(
             float(student_lat),
             float(student_lon),
-            gps_accuracy if not skip_gps_check else None  # Pass None to skip GPS check
+            gps_accuracy
         )
         
         if not validation_result['within_geofence']:
@@ -366,12 +308,23 @@ def api_checkin():
             
             if validation_result['method'] == 'rectangular':
                 distance_to_edge = validation_result.get('distance_to_edge', 0)
-                nearest_edge = validation_result.get('details', {}).get('nearest_edge', 'boundary')
+                details = validation_result.get('details', {})
+                nearest_edge = details.get('nearest_edge', 'boundary')
                 
                 error_response['message'] = f'You are outside the classroom boundary ({distance_to_edge:.1f}m from {nearest_edge} edge)'
                 error_response['validation']['distance_to_edge'] = round(distance_to_edge, 1)
                 error_response['validation']['nearest_edge'] = nearest_edge
                 error_response['guidance'] = f'Move closer to the classroom (approximately {distance_to_edge:.1f}m toward {nearest_edge})'
+                
+                if 'inside_probability' in validation_result:
+                    error_response['validation']['inside_probability'] = round(validation_result['inside_probability'], 3)
+                    error_response['validation']['required_probability'] = validation_result['required_probability']
+                    if details.get('inside'):
+                        # Reported position is inside, but too uncertain to accept
+                        error_response['message'] = (f'GPS accuracy too low to confirm you are inside the classroom '
+                                                     f'(±{gps_accuracy:.0f}m)')
+                        error_response['validation']['gps_accuracy_acceptable'] = False
+                        error_response['guidance'] = 'Move to an area with better GPS signal (outdoors or near windows)'
             else:
                 # Circular validation
                 distance = validation_result.get('distance', 0)
@@ -386,6 +339,10 @@ def api_checkin():
         
         # distance_from_center already calculated above
         
+        # Impossible travel against the student's recent validated fixes
+        from utils.travel_check import recent_fixes
+        travel = recent_fixes.check(current_user.id, float(student_lat), float(student_lon), gps_accuracy)
+        
         # Mark attendance with enhanced metadata
         attendance = Attendance(
             student_id=current_user.id,
@@ -401,14 +358,32 @@ def api_checkin():
             gps_accuracy_at_checkin=gps_accuracy,
             boundary_intersection_status='inside' if validation_result['within_geofence'] else 'outside',
             location_uncertainty_radius=gps_accuracy,
-            notes=f"{'Auto-' if auto_checkin else ''}Check-in via {validation_result['method']} validation"
+            notes=f"{'Auto-' if auto_checkin else ''}Check-in via {validation_result['method']} validation",
+            verification_status='flagged' if travel['violation'] else 'verified'
         )
         
+        if travel['violation']:
+            attendance.notes += (f" (flagged: {travel['distance_m']:.0f}m in {travel['seconds']:.0f}s"
+                                 f" since a previous check-in)")
+        
+        # Same device already used to check in other students to this lecture
+        from utils.checkin_collisions import stamp_checkin_keys, detect_checkin_collision, flag_collisions
+        stamp_checkin_keys(attendance, float(student_lat), float(student_lon), sample,
+                           request.headers.get('User-Agent', ''))
+        collision = detect_checkin_collision(attendance, float(student_lat), float(student_lon))
+        if collision['collision']:
+            attendance.verification_status = 'flagged'
+            attendance.notes += f" (flagged: same device as {len(collision['student_ids'])} other student(s))"
+            flag_collisions(collision['attendance_ids'])
+        
         db.session.add(attendance)
+        db.session.flush()
+        recent_fixes.record(current_user.id, float(student_lat), float(student_lon), gps_accuracy,
+                            at=attendance.marked_at, lecture_id=lecture.id, attendance_id=attendance.id)
         db.session.commit()
         
         # Determine if smart validation was used
-        smart_validation_used = distance_from_center < 10 and gps_accuracy > gps_threshold
+        smart_validation_used = not uses_probability and distance_from_center < 10 and gps_accuracy > gps_threshold
         
         # Build success response
         success_message = f"{'Auto-' if auto_checkin else ''}Attendance marked successfully!"
@@ -432,9 +407,19 @@ def api_checkin():
         
         if validation_result['method'] == 'rectangular':
             success_response['validation']['distance_to_edge'] = round(validation_result.get('distance_to_edge', 0), 1)
+            if 'inside_probability' in validation_result:
+                success_response['validation']['inside_probability'] = round(validation_result['inside_probability'], 3)
         else:
             success_response['distance'] = round(distance_from_center, 1)
         
+        if fusion:
+            success_response['validation']['samples'] = {
+                'used': fusion['used'],
+                'rejected': len(fusion['rejected']),
+                'fused_accuracy': fusion['accuracy'],
+                'spread_m': fusion['spread_m']
+            }
+        
         return jsonify(success_response)
         
     except Exception as e:
@@ -444,6 +429,182 @@ def api_checkin():
             'message': f'Error: {str(e)}'
         })
 
+def _distance_band_accuracy_error(distance_from_center, gps_accuracy, gps_threshold):
+    """
+    GPS accuracy check for circular geofences, stricter further from the centre
+    
+    Returns:
+        Error response dict, or None when the accuracy is acceptable
+    """
+    # If student is very close to lecture center (< 10m), accept any GPS accuracy
+    # This handles cases where student is clearly in the classroom
+    if distance_from_center < 10:
+        # Student is obviously in the classroom, accept even with poor GPS
+        print(f"Smart validation: Student very close ({distance_from_center:.1f}m), accepting despite GPS accuracy {gps_accuracy:.1f}m")
+        return None
+    
+    # If student is reasonably close (10-30m), require moderate GPS accuracy (< 50m)
+    if distance_from_center < 30 and gps_accuracy > 50:
+        message = f'GPS accuracy too low: {gps_accuracy:.1f}m (required: ≤50m for your distance)'
+        required = 50
+    # If student is at edge of boundary (30-50m), require good GPS accuracy
+    elif distance_from_center >= 30 and gps_accuracy > gps_threshold:
+        message = f'GPS accuracy too low: {gps_accuracy:.1f}m (required: ≤{gps_threshold}m)'
+        required = gps_threshold
+    else:
+        return None
+    
+    return {
+        'success': False,
+        'message': message,
+        'validation': {
+            'gps_accuracy_acceptable': False,
+            'required_accuracy': required,
+            'current_accuracy': gps_accuracy,
+            'distance_from_center': round(distance_from_center, 1)
+        },
+        'guidance': 'Move to an area with better GPS signal (outdoors or near windows)'
+    }
+
+@student_bp.route('/qr/<token>')
+@login_required
+@student_required
+def qr_checkin(token):
+    """Check-in page opened by scanning the lecture's rotating QR code"""
+    from utils.qr_tokens import verify_token, QrTokenError
+    
+    error = None
+    try:
+        verify_token(current_app.config['SECRET_KEY'], token,
+                     rotation=current_app.config.get('QR_TOKEN_ROTATION_SECONDS', 15))
+    except QrTokenError as e:
+        error = str(e)
+    
+    return render_template('student/qr_checkin.html', token=token, error=error)
+
+@student_bp.route('/api/qr-checkin', methods=['POST'])
+@login_required
+@student_required
+def api_qr_checkin():
+    """
+    Check-in with a rotating QR token and a relaxed GPS check
+    
+    POST /student/api/qr-checkin
+    {"token": "...", "latitude": .., "longitude": .., "metadata": {"accuracy": .., ...}}
+    
+    The token is validated with the secret and the clock only; the lecture
+    row is never read.
+    """
+    from utils.qr_tokens import verify_token, check_location, QrTokenError
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            claims = verify_token(current_app.config['SECRET_KEY'], data.get('token'),
+                                  rotation=current_app.config.get('QR_TOKEN_ROTATION_SECONDS', 15))
+        except QrTokenError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            })
+        
+        sample = LocationSample.parse(data.get('metadata') or {}, data.get('latitude'), data.get('longitude'))
+        if sample.latitude is None or sample.longitude is None:
+            return jsonify({
+                'success': False,
+                'message': 'Missing required location data'
+            })
+        
+        location = check_location(claims, sample.latitude, sample.longitude, sample.accuracy)
+        if not location['acceptable']:
+            return jsonify({
+                'success': False,
+                'message': location['reason'],
+                'validation': {
+                    'method': 'qr',
+                    'distance_from_center': round(location['distance'], 1),
+                    'allowed_radius': claims['radius_m'],
+                    'current_accuracy': sample.accuracy
+                }
+            })
+        
+        lecture_id = claims['lecture_id']
+        enrolled = db.session.query(Enrollment.query.filter_by(
+            student_id=current_user.id,
+            course_id=claims['course_id'],
+            is_active=True
+        ).exists()).scalar()
+        if not enrolled:
+            return jsonify({
+                'success': False,
+                'message': 'You are not enrolled in this course'
+            })
+        
+        existing = db.session.query(Attendance.query.filter_by(
+            student_id=current_user.id,
+            lecture_id=lecture_id
+        ).exists()).scalar()
+        if existing:
+            return jsonify({
+                'success': False,
+                'message': 'Attendance already marked for this lecture'
+            })
+        
+        gps_accuracy = sample.accuracy
+        from utils.travel_check import recent_fixes
+        travel = recent_fixes.check(current_user.id, sample.latitude, sample.longitude, gps_accuracy)
+        
+        attendance = Attendance(
+            student_id=current_user.id,
+            lecture_id=lecture_id,
+            status='present',
+            marked_at=datetime.now(IST),
+            student_latitude=sample.latitude,
+            student_longitude=sample.longitude,
+            distance_from_lecture=location['distance'],
+            validation_method='qr',
+            gps_accuracy_at_checkin=gps_accuracy,
+            location_uncertainty_radius=gps_accuracy,
+            notes="Check-in via QR code",
+            verification_status='flagged' if travel['violation'] else 'verified'
+        )
+        
+        if travel['violation']:
+            attendance.notes += (f" (flagged: {travel['distance_m']:.0f}m in {travel['seconds']:.0f}s"
+                                 f" since a previous check-in)")
+        
+        from utils.checkin_collisions import stamp_checkin_keys, detect_checkin_collision, flag_collisions
+        stamp_checkin_keys(attendance, sample.latitude, sample.longitude, sample,
+                           request.headers.get('User-Agent', ''))
+        collision = detect_checkin_collision(attendance, sample.latitude, sample.longitude)
+        if collision['collision']:
+            attendance.verification_status = 'flagged'
+            attendance.notes += f" (flagged: same device as {len(collision['student_ids'])} other student(s))"
+            flag_collisions(collision['attendance_ids'])
+        
+        db.session.add(attendance)
+        db.session.flush()
+        recent_fixes.record(current_user.id, sample.latitude, sample.longitude, gps_accuracy,
+                            at=attendance.marked_at, lecture_id=lecture_id, attendance_id=attendance.id)
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Attendance marked successfully!',
+            'validation': {
+                'method': 'qr',
+                'distance_from_center': round(location['distance'], 1)
+            },
+            'timestamp': datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S IST')
+        })
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        })
+
 @student_bp.route('/enroll')
 @login_required
 @student_required
@@ -522,7 +683,7 @@ def unenroll_course(course_id):
 def browse_courses():
     """Browse available courses page"""
     # Get all available courses
-    available_courses = Course.query.filter_by(is_active=True).all()
+    available_courses = with_profile(Course.query, 'student.courses').filter_by(is_active=True).all()
     
     # Get already enrolled course IDs
     enrolled_course_ids = [e.course_id for e in Enrollment.query.filter_by(
@@ -541,7 +702,7 @@ def browse_courses():
 def attendance_history():
     """Student attendance history"""
     # Get all attendance records for the student
-    attendances = Attendance.query.filter_by(student_id=current_user.id)\
+    attendances = with_profile(Attendance.query, 'student.attendance').filter_by(student_id=current_user.id)\
         .join(Lecture)\
         .join(Course)\
         .order_by(Lecture.scheduled_start.desc())\
@@ -747,14 +908,15 @@ def api_active_lectures():
             })
         
         # Get lectures for today and active lectures
-        lectures = Lecture.query.filter(
+        lectures = with_profile(Lecture.query, 'student.lectures').filter(
             Lecture.course_id.in_(enrolled_course_ids),
             Lecture.is_active == True,
             db.or_(
                 Lecture.status == 'active',
                 db.and_(
                     Lecture.status == 'scheduled',
-                    db.func.date(Lecture.scheduled_start) == today
+                    Lecture.scheduled_start >= datetime.combine(today, datetime.min.time()),
+                    Lecture.scheduled_start < datetime.combine(today + timedelta(days=1), datetime.min.time())
                 )
             )
         ).order_by(Lecture.scheduled_start).all()
@@ -846,6 +1008,122 @@ def api_active_lectures():
             'count': 0
         })
 
+@student_bp.route('/api/boundaries', methods=['GET'])
+@login_required
+@student_required
+def api_boundaries():
+    """
+    Boundary descriptors for every lecture the student can check into now,
+    so the inside/outside indicator can be computed on the device
+    
+    GET /student/api/boundaries[?lecture_id=5]
+    Answers 304 when the If-None-Match ETag still matches.
+    """
+    from utils.boundary_probability import boundary_descriptor, DESCRIPTOR_VERSION
+    
+    course_ids = select(Enrollment.course_id).where(
+        Enrollment.student_id == current_user.id,
+        Enrollment.is_active == True
+    )
+    attended = select(Attendance.lecture_id).where(Attendance.student_id == current_user.id)
+    
+    query = Lecture.query.filter(
+        Lecture.course_id.in_(course_ids),
+        Lecture.is_active == True,
+        Lecture.status.in_(['scheduled', 'active']),
+        Lecture.id.notin_(attended)
+    )
+    lecture_id = request.args.get('lecture_id', type=int)
+    if lecture_id is not None:
+        query = query.filter(Lecture.id == lecture_id)
+    else:
+        # Attendance windows are anchored on scheduled_start and span minutes
+        now = datetime.now(IST).replace(tzinfo=None)
+        query = query.filter(Lecture.scheduled_start.between(now - timedelta(days=1), now + timedelta(days=1)))
+    
+    boundaries = []
+    for lecture in query.order_by(Lecture.scheduled_start):
+        if not lecture.is_attendance_window_open():
+            continue
+        descriptor = boundary_descriptor(lecture)
+        if descriptor:
+            boundaries.append(descriptor)
+    
+    response = jsonify({'success': True, 'version': DESCRIPTOR_VERSION, 'boundaries': boundaries})
+    response.add_etag()
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+MAX_STATUS_BATCH = 30  # fixes accepted per batch status request
+
+@student_bp.route('/api/lecture/<int:lecture_id>/boundary-status/batch', methods=['POST'])
+@login_required
+@student_required
+def check_boundary_status_batch(lecture_id):
+    """
+    Boundary status for a batch of coalesced fixes without marking attendance
+    
+    POST /student/api/lecture/<id>/boundary-status/batch
+    {"fixes": [{"latitude": .., "longitude": .., "accuracy": .., "timestamp": ..}, ...]}
+    
+    Returns one status per valid fix, plus the status of the latest fixes
+    fused into one position (what a check-in sending them as samples would
+    be judged on).
+    """
+    from utils.boundary_probability import evaluate_fixes
+    from utils.location_fusion import parse_samples, MAX_SAMPLES
+    
+    lecture = Lecture.query.get(lecture_id)
+    if not lecture:
+        return jsonify({
+            'success': False,
+            'error': 'Lecture not found'
+        }), 404
+    
+    enrolled = db.session.query(Enrollment.query.filter_by(
+        student_id=current_user.id,
+        course_id=lecture.course_id,
+        is_active=True
+    ).exists()).scalar()
+    if not enrolled:
+        return jsonify({
+            'success': False,
+            'error': 'Not enrolled in this course'
+        }), 403
+    
+    data = request.get_json(silent=True)
+    fixes = (data.get('fixes') if isinstance(data, dict) else None) or []
+    if not isinstance(fixes, list):
+        return jsonify({
+            'success': False,
+            'error': 'fixes must be a list'
+        }), 400
+    
+    try:
+        latitudes, longitudes, accuracies = parse_samples(fixes[-MAX_STATUS_BATCH:], limit=MAX_STATUS_BATCH)
+        fused = fuse_samples(fixes[-MAX_SAMPLES:])
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    statuses = evaluate_fixes(lecture, latitudes, longitudes, accuracies)
+    fused_status = evaluate_fixes(lecture, [fused['latitude']], [fused['longitude']], [fused['accuracy']])[0]
+    fused_status.update(latitude=fused['latitude'], longitude=fused['longitude'],
+                        accuracy=fused['accuracy'], used=fused['used'])
+    
+    return jsonify({
+        'success': True,
+        'lecture_id': lecture_id,
+        'geofence_type': 'rectangular' if 'inside_probability' in statuses[-1] else 'circular',
+        'gps_accuracy_threshold': lecture.gps_accuracy_threshold or 20,
+        'radius': lecture.geofence_radius or 50,
+        'statuses': statuses,
+        'latest': statuses[-1],
+        'fused': fused_status
+    }), 200
+
 @student_bp.route('/api/lecture/<int:lecture_id>/boundary-status', methods=['GET'])
 @login_required
 @student_required
@@ -910,7 +1188,9 @@ def check_boundary_status(lecture_id):
             },
             'boundary_status': {
                 'inside': validation_result['within_geofence'],
-                'can_checkin': validation_result['within_geofence'] and gps_acceptable,
+                # Rectangular boundaries already weigh GPS accuracy (inside probability)
+                'can_checkin': validation_result['within_geofence'] and (
+                    gps_acceptable or 'inside_probability' in validation_result),
                 'method': validation_result['method']
             },
             'requirements': {
@@ -923,6 +1203,8 @@ def check_boundary_status(lecture_id):
         if validation_result['method'] == 'rectangular':
             response['boundary_status']['distance_to_edge'] = round(validation_result.get('distance_to_edge', 0), 1)
             response['boundary_status']['tolerance_applied'] = validation_result.get('tolerance_applied', False)
+            if 'inside_probability' in validation_result:
+                response['boundary_status']['inside_probability'] = round(validation_result['inside_probability'], 3)
         else:
             response['boundary_status']['distance'] = round(validation_result.get('distance', 0), 1)
             response['boundary_status']['radius'] = validation_result.get('radius', 50)
@@ -1,4 +1,5 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, jsonify,
+                   Response, stream_with_context, current_app)
 from flask_login import login_required, current_user
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User
@@ -7,7 +8,14 @@ from models.lecture import Lecture
 from models.attendance import Attendance
 from models.enrollment import Enrollment
 from utils.auth import teacher_required
+from utils.loader_profiles import with_profile
+from utils.bulk_attendance import save_lecture_attendance
+from utils.boundary_probability import clamp_acceptance_probability
+from utils.report_jobs import report_jobs, cached_report, send_report_result, REPORT_TYPES
+from utils.report_queries import (lecture_attendance_aggregates, course_attendance_aggregates,
+                                  attendance_rate)
 from app import db
+from sqlalchemy.orm import joinedload
 from datetime import datetime, timedelta, timezone
 
 # IST timezone (UTC+5:30)
@@ -26,7 +34,7 @@ def require_teacher():
 def dashboard():
     """Teacher dashboard"""
     courses = Course.query.filter_by(teacher_id=current_user.id).all()
-    recent_lectures = Lecture.query.filter_by(teacher_id=current_user.id).order_by(
+    recent_lectures = with_profile(Lecture.query, 'teacher.lectures').filter_by(teacher_id=current_user.id).order_by(
         Lecture.created_at.desc()
     ).limit(5).all()
     
@@ -45,7 +53,7 @@ def course_detail(course_id):
     """Course detail page"""
     course = Course.query.filter_by(id=course_id, teacher_id=current_user.id).first_or_404()
     lectures = Lecture.query.filter_by(course_id=course_id).order_by(Lecture.scheduled_start.desc()).all()
-    enrollments = Enrollment.query.filter_by(course_id=course_id, is_active=True).all()
+    enrollments = with_profile(Enrollment.query, 'teacher.roster').filter_by(course_id=course_id, is_active=True).all()
     
     return render_template('teacher/course_detail.html', 
                          course=course, 
@@ -55,7 +63,8 @@ def course_detail(course_id):
 @teacher_bp.route('/lectures')
 def lectures():
     """Manage lectures"""
-    lectures = Lecture.query.filter_by(teacher_id=current_user.id).order_by(Lecture.scheduled_start.desc()).all()
+    lectures = with_profile(Lecture.query, 'teacher.lectures').filter_by(teacher_id=current_user.id)\
+        .order_by(Lecture.scheduled_start.desc()).all()
     return render_template('teacher/lectures.html', lectures=lectures)
 
 @teacher_bp.route('/lectures/create', methods=['GET', 'POST'])
@@ -125,6 +134,7 @@ def create_lecture():
             boundary_width = float(data.get('boundary_width', 30))  # meters (East-West)
             boundary_height = float(data.get('boundary_height', 30))  # meters (North-South)
             gps_threshold = int(data.get('gps_accuracy_threshold', 20))
+            acceptance_probability = clamp_acceptance_probability(data.get('acceptance_probability'))
             
             # Create lecture with enhanced location data
             lecture = Lecture(
@@ -140,6 +150,7 @@ def create_lecture():
                 geofence_type='rectangular',
                 gps_accuracy_threshold=gps_threshold,
                 boundary_tolerance_m=2.0,
+                acceptance_probability=acceptance_probability,
                 location_accuracy=accuracy,
                 location_metadata=location_metadata,
                 location_set_at=datetime.now(IST),
@@ -196,11 +207,64 @@ def create_lecture():
     # GET request - show form
     courses = Course.query.filter_by(teacher_id=current_user.id).all()
     return render_template('teacher/create_lecture_enhanced.html', courses=courses)
+
+@teacher_bp.route('/api/lectures/recurring', methods=['POST'])
+def api_create_recurring_lectures():
+    """Create a semester of lectures from a weekly timetable"""
+    from datetime import date
+    from utils.lecture_schedule import create_recurring_lectures, parse_date_list
+
+    try:
+        data = request.get_json() or {}
+
+        required_fields = ['title', 'course_id', 'pattern', 'start_date', 'end_date', 'latitude', 'longitude']
+        missing = [field for field in required_fields if not data.get(field)]
+        if missing:
+            return jsonify({'success': False, 'message': f'Missing required fields: {", ".join(missing)}'}), 400
+
+        course = Course.query.filter_by(id=int(data['course_id']), teacher_id=current_user.id).first()
+        if not course:
+            return jsonify({'success': False, 'message': 'Access denied'}), 403
+
+        result = create_recurring_lectures(
+            course,
+            current_user.id,
+            data['title'],
+            data['pattern'],
+            date.fromisoformat(data['start_date']),
+            date.fromisoformat(data['end_date']),
+            float(data['latitude']),
+            float(data['longitude']),
+            boundary_width=float(data.get('boundary_width', 30)),
+            boundary_height=float(data.get('boundary_height', 30)),
+            skip_dates=parse_date_list(data.get('skip_dates')),
+            description=data.get('description', ''),
+            location_name=data.get('location_name', ''),
+            gps_accuracy_threshold=int(data.get('gps_accuracy_threshold', 20)),
+            attendance_window_start=int(data.get('attendance_window_start', 15)) * -1,  # Convert to negative
+            attendance_window_end=int(data.get('attendance_window_end', 15))
+        )
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': f"Created {result['created']} lectures",
+            'created_count': result['created'],
+            'skipped_count': result['skipped']
+        })
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @teacher_bp.route('/lecture/<int:lecture_id>')
 def lecture_detail(lecture_id):
     """Lecture detail page"""
     lecture = Lecture.query.filter_by(id=lecture_id, teacher_id=current_user.id).first_or_404()
-    attendances = Attendance.query.filter_by(lecture_id=lecture_id).all()
+    attendances = with_profile(Attendance.query, 'teacher.lecture_attendance').filter_by(lecture_id=lecture_id).all()
     
     return render_template('teacher/lecture_detail.html', 
                          lecture=lecture, 
@@ -222,6 +286,32 @@ def end_lecture(lecture_id):
     flash('Lecture ended successfully!', 'success')
     return redirect(url_for('teacher.lecture_detail', lecture_id=lecture_id))
 
+@teacher_bp.route('/api/lecture/<int:lecture_id>/qr-token')
+def api_qr_token(lecture_id):
+    """Current rotating QR check-in token for the lecture screen (poll before expires_in)"""
+    from utils.qr_tokens import issue_token
+    
+    lecture = Lecture.query.filter_by(id=lecture_id, teacher_id=current_user.id).first_or_404()
+    
+    if lecture.latitude is None or lecture.longitude is None:
+        return jsonify({'success': False, 'message': 'Lecture location not configured'})
+    
+    if lecture.status != 'active' and not lecture.is_attendance_window_open():
+        return jsonify({'success': False, 'message': 'Attendance window is closed'})
+    
+    rotation = current_app.config.get('QR_TOKEN_ROTATION_SECONDS', 15)
+    issued = issue_token(current_app.config['SECRET_KEY'], lecture, rotation=rotation)
+    
+    response = jsonify({
+        'success': True,
+        'token': issued['token'],
+        'checkin_url': url_for('student.qr_checkin', token=issued['token'], _external=True),
+        'expires_in': issued['expires_in'],
+        'rotation_seconds': rotation
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @teacher_bp.route('/attendance/reports')
 def attendance_reports():
     """Attendance reports"""
@@ -236,19 +326,49 @@ def generate_attendance_report():
     report_type = request.args.get('report_type', 'summary')
     format_type = request.args.get('format', 'html')
     
-    # Build query based on filters
-    query = Lecture.query.filter_by(teacher_id=current_user.id)
+    start_date = _report_start_date(date_range)
     
-    if course_id:
-        query = query.filter_by(course_id=course_id)
+    if format_type == 'csv':
+        # Per-student rows are streamed straight from the database cursor
+        from utils.reports import stream_attendance_csv
+        
+        chunks, filename = stream_attendance_csv(
+            teacher_id=current_user.id,
+            course_id=course_id,
+            start_date=start_date
+        )
+        return Response(stream_with_context(chunks), mimetype='text/csv',
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
+    
+    # Reuse the previous result until lectures or attendance in scope change
+    filters = {'teacher_id': current_user.id, 'course_id': course_id, 'start_date': start_date}
+    report_data = cached_report(
+        f'teacher_attendance_{report_type}',
+        filters,
+        lambda: _build_attendance_report(report_type, **filters),
+        key_filters=_report_key_filters(filters)
+    )
     
-    # Date filtering
-    if date_range.isdigit():
-        days_ago = int(date_range)
-        start_date = datetime.utcnow() - timedelta(days=days_ago)
-        query = query.filter(Lecture.scheduled_start >= start_date)
+    return jsonify(report_data)
+
+def _report_start_date(date_range):
+    """Start of a 'last N days' window, or None for all time"""
+    if not str(date_range).isdigit():
+        return None
+    
+    return datetime.utcnow() - timedelta(days=int(date_range))
+
+def _report_key_filters(filters):
+    """Filters with the window start aligned to midnight, so repeat requests on one day share cached results"""
+    start_date = filters.get('start_date')
+    if start_date is None:
+        return filters
     
-    lectures = query.order_by(Lecture.scheduled_start.desc()).all()
+    return dict(filters, start_date=start_date.replace(hour=0, minute=0, second=0, microsecond=0))
+
+def _build_attendance_report(report_type, **filters):
+    """Build the JSON attendance report from one set-based aggregate query"""
+    lecture_rows = lecture_attendance_aggregates(**filters)
     
     # Generate report data
     report_data = {
@@ -256,54 +376,88 @@ def generate_attendance_report():
         'lectures': [],
         'courses': [],
         'stats': {
-            'total_lectures': len(lectures),
+            'total_lectures': len(lecture_rows),
             'avg_attendance': 0,
             'total_students': 0
         }
     }
     
     if report_type == 'summary':
-        # Group by course
-        course_stats = {}
-        for lecture in lectures:
-            course_code = lecture.course.code
-            if course_code not in course_stats:
-                course_stats[course_code] = {
-                    'code': course_code,
-                    'name': lecture.course.name,
-                    'total_lectures': 0,
-                    'total_attendance': 0,
-                    'total_students': lecture.course.get_enrollment_count()
-                }
-            
-            stats = lecture.get_attendance_stats()
-            course_stats[course_code]['total_lectures'] += 1
-            course_stats[course_code]['total_attendance'] += stats['attendance_rate']
-        
-        for course_code, stats in course_stats.items():
-            stats['avg_attendance'] = round(stats['total_attendance'] / stats['total_lectures'], 1) if stats['total_lectures'] > 0 else 0
-            report_data['courses'].append(stats)
+        report_data['courses'] = course_attendance_aggregates(lecture_rows)
     
     elif report_type == 'detailed':
-        for lecture in lectures:
-            stats = lecture.get_attendance_stats()
+        for row in lecture_rows:
             report_data['lectures'].append({
-                'date': lecture.scheduled_start.isoformat(),
-                'course_code': lecture.course.code,
-                'title': lecture.title,
-                'present': stats['present'],
-                'absent': stats['absent'],
-                'late': stats['late'],
-                'attendance_rate': stats['attendance_rate']
+                'date': row.scheduled_start.isoformat(),
+                'course_code': row.course_code,
+                'title': row.title,
+                'present': row.present,
+                'absent': row.absent,
+                'late': row.late,
+                'attendance_rate': attendance_rate(row.present, row.enrolled)
             })
     
-    return jsonify(report_data)
+    return report_data
+
+@teacher_bp.route('/attendance/report/jobs', methods=['POST'])
+def start_report_job():
+    """Queue an attendance report file (PDF by default) for background generation"""
+    data = request.get_json(silent=True) or request.form
+    course_id = data.get('course_id') or None
+    export_format = data.get('format', 'pdf')
+    
+    report_type = f'attendance_{export_format}'
+    if report_type not in REPORT_TYPES:
+        return jsonify({'error': f'Unsupported report format: {export_format}'}), 400
+    
+    missing = REPORT_TYPES[report_type].missing_dependency()
+    if missing:
+        return jsonify({'error': f'{export_format} exports need the {missing} package, which is not installed'}), 400
+    
+    if course_id:
+        Course.query.filter_by(id=course_id, teacher_id=current_user.id).first_or_404()
+    
+    filters = {
+        'teacher_id': current_user.id,
+        'course_id': course_id,
+        'start_date': _report_start_date(data.get('date_range', '30'))
+    }
+    job = report_jobs.submit(
+        current_app._get_current_object(),
+        owner_id=current_user.id,
+        report_type=report_type,
+        filters=filters,
+        key_filters=_report_key_filters(filters)
+    )
+    
+    response = job.to_dict()
+    response['status_url'] = url_for('teacher.report_job_status', job_id=job.id)
+    response['download_url'] = url_for('teacher.download_report_job', job_id=job.id)
+    return jsonify(response), 200 if job.status == 'completed' else 202
+
+@teacher_bp.route('/attendance/report/jobs/<job_id>')
+def report_job_status(job_id):
+    """Poll the status of a background report job"""
+    job = report_jobs.get(job_id, owner_id=current_user.id)
+    if not job:
+        return jsonify({'error': 'Report job not found'}), 404
+    
+    return jsonify(job.to_dict())
+
+@teacher_bp.route('/attendance/report/jobs/<job_id>/download')
+def download_report_job(job_id):
+    """Download the file produced by a completed report job"""
+    job = report_jobs.get(job_id, owner_id=current_user.id)
+    if not job:
+        return jsonify({'error': 'Report job not found'}), 404
+    
+    return send_report_result(job)
 
 @teacher_bp.route('/attendance/mark/<int:lecture_id>')
 def mark_attendance(lecture_id):
     """Manual attendance marking page"""
     lecture = Lecture.query.filter_by(id=lecture_id, teacher_id=current_user.id).first_or_404()
-    enrollments = Enrollment.query.filter_by(course_id=lecture.course_id, is_active=True).all()
+    enrollments = with_profile(Enrollment.query, 'teacher.roster').filter_by(course_id=lecture.course_id, is_active=True).all()
     attendances = Attendance.query.filter_by(lecture_id=lecture_id).all()
     attendance_dict = {a.student_id: a for a in attendances}
     
@@ -324,32 +478,15 @@ def save_attendance(lecture_id):
         return jsonify({'error': 'No updates provided'}), 400
     
     try:
-        for update in updates:
-            student_id = update.get('student_id')
-            status = update.get('status')
-            notes = update.get('notes', '')
-            
-            # Find or create attendance record
-            attendance = Attendance.query.filter_by(
-                student_id=student_id,
-                lecture_id=lecture_id
-            ).first()
-            
-            if not attendance:
-                attendance = Attendance(
-                    student_id=student_id,
-                    lecture_id=lecture_id
-                )
-                db.session.add(attendance)
-            
-            # Update attendance
-            attendance.status = status
-            attendance.notes = notes
-            attendance.marked_at = datetime.utcnow()
-            attendance.updated_at = datetime.utcnow()
-        
+        # One enrollment check, one lookup, one executemany and one bulk insert
+        result = save_lecture_attendance(lecture, updates, marked_at=datetime.utcnow())
         db.session.commit()
-        return jsonify({'message': 'Attendance saved successfully'}), 200
+        return jsonify({
+            'message': 'Attendance saved successfully',
+            'updated_count': result['updated'],
+            'inserted_count': result['inserted'],
+            'errors': result['errors']
+        }), 200
         
     except Exception as e:
         db.session.rollback()
@@ -407,7 +544,7 @@ def api_confirm_location():
             return jsonify({'success': False, 'message': 'Location is already locked and cannot be updated'})
         
         # Get or create confirmation session
-        from utils.location_security import get_or_create_confirmation_session
+        from utils.location_security import get_or_create_confirmation_session, save_confirmation_session
         session = get_or_create_confirmation_session(lecture_id, current_user.id)
         
         # Add confirmation to session
@@ -415,6 +552,10 @@ def api_confirm_location():
             float(latitude), float(longitude), float(accuracy), metadata
         )
         
+        # The next confirmation may be served by another worker
+        if success:
+            save_confirmation_session(session)
+        
         return jsonify({
             'success': success,
             'message': message,
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Scan stored check-ins for proxy attendance clusters
+Flags the attendance records of precise check-ins that share near-identical
+coordinates and accuracy with other check-ins of the same lecture, or that
+arrived from one spot in a tight burst. Lectures are analysed in parallel.
+Usage: python scan_checkin_clusters.py [days] [workers]   (default: last 30 days, all CPUs)
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from app import create_app
+from app import db
+from utils.checkin_clusters import scan_checkin_clusters, flag_cluster_findings
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+def scan(days=30, workers=None):
+    app = create_app()
+    with app.app_context():
+        # marked_at is stored as naive IST wall-clock time
+        since = datetime.now(IST).replace(tzinfo=None) - timedelta(days=days)
+        findings = scan_checkin_clusters(since=since, workers=workers)
+        
+        for f in findings:
+            print(f"  Lecture {f['lecture_id']}: {f['kind']} of {f['size']} check-ins, "
+                  f"attendances {f['attendance_ids']}")
+        
+        flagged = flag_cluster_findings(findings)
+        db.session.commit()
+        print(f"\n{len(findings)} clusters found, {flagged} attendance records flagged")
+
+if __name__ == "__main__":
+    scan(int(sys.argv[1]) if len(sys.argv) > 1 else 30,
+         int(sys.argv[2]) if len(sys.argv) > 2 else None)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Scan stored check-in locations for impossible travel
+Flags the attendance records of check-ins that could not have been reached
+from the student's previous check-in in the time available.
+Usage: python scan_travel_violations.py [days]   (default: last 30 days)
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from app import create_app
+from app import db
+from utils.travel_check import scan_travel_violations, flag_travel_violations
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+def scan(days=30):
+    app = create_app()
+    with app.app_context():
+        since = datetime.now(IST) - timedelta(days=days)
+        violations = scan_travel_violations(since=since)
+        
+        for v in violations:
+            print(f"  Student {v['student_id']}: {v['violation']} - {v['distance_m']}m in "
+                  f"{v['seconds']}s ({v['speed_kmh']} km/h), attendance {v['attendance_id']}")
+        
+        flagged = flag_travel_violations(violations)
+        db.session.commit()
+        print(f"\n{len(violations)} violations found, {flagged} attendance records flagged")
+
+if __name__ == "__main__":
+    scan(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
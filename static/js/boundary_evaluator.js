@@ -0,0 +1,169 @@
+/**
+ * Boundary Evaluator
+ * Evaluates GPS fixes against the boundary descriptors served by
+ * /student/api/boundaries, so the inside/outside indicator needs no server
+ * round trip. Mirrors utils/boundary_probability.py; the server re-validates
+ * every check-in.
+ */
+
+const BOUNDARY_DESCRIPTOR_VERSION = 2;
+
+class BoundaryEvaluator {
+    constructor(descriptor) {
+        if (!descriptor || descriptor.v !== BOUNDARY_DESCRIPTOR_VERSION) {
+            throw new Error('Unsupported boundary descriptor version');
+        }
+        this.descriptor = descriptor;
+    }
+
+    /**
+     * Error function (Abramowitz & Stegun 7.1.26, |error| < 1.5e-7)
+     */
+    static erf(z) {
+        const sign = z < 0 ? -1 : 1;
+        z = Math.abs(z);
+        const t = 1 / (1 + 0.3275911 * z);
+        const poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))));
+        return sign * (1 - poly * Math.exp(-z * z));
+    }
+
+    /**
+     * Metres east and north of the descriptor origin
+     */
+    project(lat, lon) {
+        const [lat0, lon0] = this.descriptor.origin;
+        const [mPerLat, mPerLon] = this.descriptor.scale;
+        return [(lon - lon0) * mPerLon, (lat - lat0) * mPerLat];
+    }
+
+    /**
+     * Evaluate one fix
+     *
+     * Returns an object shaped like the boundary-status API response, so
+     * existing rendering code can use either.
+     */
+    evaluate(lat, lon, accuracy) {
+        const d = this.descriptor;
+        const [x, y] = this.project(lat, lon);
+        const hasAccuracy = typeof accuracy === 'number' && isFinite(accuracy);
+        const gpsAccuracy = hasAccuracy ? accuracy : (d.unknown_accuracy_m || 999);
+        const gpsAcceptable = gpsAccuracy <= d.accuracy_threshold_m;
+
+        const status = {
+            success: true,
+            lecture_id: d.lecture_id,
+            geofence_type: d.type,
+            evaluated_on_device: true,
+            student_location: {lat: lat, lon: lon, accuracy: gpsAccuracy},
+            boundary_status: {method: d.type},
+            requirements: {
+                gps_accuracy_threshold: d.accuracy_threshold_m,
+                current_gps_accuracy: gpsAccuracy,
+                meets_requirements: gpsAcceptable
+            }
+        };
+
+        if (d.type === 'rectangular') {
+            const [west, east, south, north] = d.edges;
+            const sigma = Math.max(gpsAccuracy * d.sigma_per_accuracy, d.min_sigma_m);
+            const scale = sigma * Math.SQRT2;
+            const mass = (low, high) => 0.5 * (BoundaryEvaluator.erf(high / scale) - BoundaryEvaluator.erf(low / scale));
+            const probability = mass(west - x, east - x) * mass(south - y, north - y);
+
+            const margins = {west: x - west, east: east - x, south: y - south, north: north - y};
+            const nearestEdge = Object.keys(margins).reduce((a, b) => margins[a] <= margins[b] ? a : b);
+            const inside = margins[nearestEdge] >= 0;
+            const distance = inside ? margins[nearestEdge] : Math.hypot(
+                Math.max(-margins.west, -margins.east, 0),
+                Math.max(-margins.south, -margins.north, 0)
+            );
+            // Inside and close to the centre is accepted at any accuracy
+            const nearCentre = inside && Math.hypot(x, y) <= d.centre_fallback_m;
+            const accepted = probability >= d.min_probability || nearCentre;
+
+            Object.assign(status.boundary_status, {
+                inside: inside || accepted,
+                can_checkin: accepted,
+                inside_probability: Math.round(probability * 1000) / 1000,
+                distance_to_edge: Math.round(distance * 10) / 10,
+                nearest_edge: nearestEdge,
+                tolerance_applied: accepted && !inside
+            });
+            // Inside but too uncertain reads as a GPS problem, not as outside
+            status.requirements.meets_requirements = accepted;
+        } else {
+            const distance = Math.hypot(x, y);
+            const inside = distance <= d.radius_m;
+
+            Object.assign(status.boundary_status, {
+                inside: inside,
+                can_checkin: inside && gpsAcceptable,
+                distance: Math.round(distance * 10) / 10,
+                radius: d.radius_m
+            });
+        }
+
+        return status;
+    }
+
+    /**
+     * Rectangle corners [[south, west], [north, east]] without the tolerance, for drawing
+     */
+    bounds() {
+        const d = this.descriptor;
+        if (d.type !== 'rectangular') {
+            return null;
+        }
+        const [lat0, lon0] = d.origin;
+        const [mPerLat, mPerLon] = d.scale;
+        const t = d.tolerance_m || 0;
+        const [west, east, south, north] = d.edges;
+        return [
+            [lat0 + (south + t) / mPerLat, lon0 + (west + t) / mPerLon],
+            [lat0 + (north - t) / mPerLat, lon0 + (east - t) / mPerLon]
+        ];
+    }
+}
+
+/**
+ * Fetches and caches descriptors, revalidating with the ETag
+ */
+class BoundaryDescriptorCache {
+    constructor(url = '/student/api/boundaries') {
+        this.url = url;
+        this.etag = null;
+        this.evaluators = new Map();
+    }
+
+    refresh() {
+        const headers = this.etag ? {'If-None-Match': this.etag} : {};
+        return fetch(this.url, {headers: headers, credentials: 'same-origin'})
+            .then(response => {
+                if (response.status === 304) {
+                    return this.evaluators;
+                }
+                if (!response.ok) {
+                    throw new Error(`Boundary request failed (${response.status})`);
+                }
+                this.etag = response.headers.get('ETag');
+                return response.json().then(data => {
+                    this.evaluators = new Map();
+                    (data.boundaries || []).forEach(descriptor => {
+                        if (descriptor.v === BOUNDARY_DESCRIPTOR_VERSION) {
+                            this.evaluators.set(descriptor.lecture_id, new BoundaryEvaluator(descriptor));
+                        }
+                    });
+                    return this.evaluators;
+                });
+            });
+    }
+
+    get(lectureId) {
+        return this.evaluators.get(Number(lectureId)) || null;
+    }
+}
+
+if (typeof window !== 'undefined') {
+    window.BoundaryEvaluator = BoundaryEvaluator;
+    window.BoundaryDescriptorCache = BoundaryDescriptorCache;
+}
@@ -1,18 +1,62 @@
 /**
  * Student Location Tracker
  * Real-time location tracking and boundary status checking for students
+ *
+ * Fixes come from watchPosition; they are processed at a cadence that
+ * adapts to movement and accuracy, and tracking pauses while the tab is
+ * hidden or the student is clearly inside. Boundary status is evaluated on
+ * the device (boundary_evaluator.js must be loaded first); without a
+ * descriptor, fixes are coalesced and sent in batches to the batch status
+ * endpoint. Recent fixes are sent as samples with the check-in.
  */
 
+const DESCRIPTOR_REFRESH_MS = 60000;  // re-check the descriptor (ETag) this often
+const MIN_PROCESS_INTERVAL_MS = 2000;  // never process fixes faster than this
+const STATIONARY_INTERVAL_MS = 15000;  // re-evaluate a stationary student this often
+const MIN_MOVE_M = 3;  // smaller moves (or moves within the accuracy) are GPS noise
+const CLEARLY_INSIDE_PROBABILITY = 0.95;  // pause tracking above this
+const INSIDE_PAUSE_MS = 60000;  // pause length once clearly inside
+const UPLOAD_INTERVAL_MS = 10000;  // batch upload cadence without a descriptor
+const MAX_BATCH_FIXES = 20;  // upload early once this many fixes are pending
+const CHECKIN_SAMPLES = 5;  // recent fixes sent with a check-in
+const SAMPLE_MAX_AGE_MS = 30000;  // older fixes are not sent as check-in samples
+
 class StudentLocationTracker {
     constructor(lectureId) {
         this.lectureId = lectureId;
         this.currentLocation = null;
-        this.updateInterval = null;
         this.map = null;
         this.studentMarker = null;
         this.boundaryOverlay = null;
         this.isTracking = false;
         this.gpsAccuracy = 999;
+        this.boundaries = (typeof BoundaryDescriptorCache !== 'undefined')
+            ? new BoundaryDescriptorCache(`/student/api/boundaries?lecture_id=${lectureId}`)
+            : null;
+        this.descriptorInterval = null;
+        this.uploadInterval = null;
+        this.watchId = null;
+        this.pauseTimer = null;
+        this.lastProcessed = null;  // {lat, lon, accuracy, time} of the last evaluated fix
+        this.pendingFixes = [];  // fixes waiting for a batch upload
+        this.recentFixes = [];  // last CHECKIN_SAMPLES fixes, for check-in samples
+        this.onVisibilityChange = () => this.handleVisibilityChange();
+    }
+    
+    refreshBoundary() {
+        if (!this.boundaries) {
+            return Promise.resolve(null);
+        }
+        return this.boundaries.refresh()
+            .then(() => this.boundaries.get(this.lectureId))
+            .catch(error => {
+                console.error('Error loading boundary descriptor:', error);
+                return null;
+            });
+    }
+    
+    evaluator() {
+        return this.boundaries ? this.boundaries.get(this.lectureId) : null;
     }
     
     startTracking() {
@@ -20,81 +64,222 @@ class StudentLocationTracker {
             return;
         }
         
-        this.isTracking = true;
-        
-        // Request high-accuracy GPS
-        if (navigator.geolocation) {
-            // Get initial location
-            this.updateLocation();
-            
-            // Update every 3 seconds
-            this.updateInterval = setInterval(() => {
-                this.updateLocation();
-            }, 3000);
-            
-            this.showTrackingStatus('Tracking your location...');
-        } else {
+        if (!navigator.geolocation) {
             this.showError('Geolocation is not supported by your browser');
+            return;
         }
+        
+        this.isTracking = true;
+        
+        // Load the boundary descriptor, then start watching
+        this.refreshBoundary().then(() => this.startWatch());
+        this.descriptorInterval = setInterval(() => {
+            if (!document.hidden) {
+                this.refreshBoundary();
+            }
+        }, DESCRIPTOR_REFRESH_MS);
+        this.uploadInterval = setInterval(() => this.flushFixes(), UPLOAD_INTERVAL_MS);
+        document.addEventListener('visibilitychange', this.onVisibilityChange);
+        
+        this.showTrackingStatus('Tracking your location...');
     }
     
     stopTracking() {
         this.isTracking = false;
+        this.stopWatch();
+        
+        if (this.pauseTimer) {
+            clearTimeout(this.pauseTimer);
+            this.pauseTimer = null;
+        }
         
-        if (this.updateInterval) {
-            clearInterval(this.updateInterval);
-            this.updateInterval = null;
+        if (this.descriptorInterval) {
+            clearInterval(this.descriptorInterval);
+            this.descriptorInterval = null;
         }
         
+        if (this.uploadInterval) {
+            clearInterval(this.uploadInterval);
+            this.uploadInterval = null;
+        }
+        
+        document.removeEventListener('visibilitychange', this.onVisibilityChange);
+        this.pendingFixes = [];
+        
         this.showTrackingStatus('Location tracking stopped');
     }
     
-    updateLocation() {
-        navigator.geolocation.getCurrentPosition(
-            (position) => {
-                this.currentLocation = {
-                    lat: position.coords.latitude,
-                    lon: position.coords.longitude,
-                    accuracy: position.coords.accuracy
-                };
-                
-                this.gpsAccuracy = position.coords.accuracy;
-                
-                // Update map
-                this.updateStudentMarker();
-                
-                // Check boundary status
-                this.checkBoundaryStatus();
-                
-                // Update GPS accuracy indicator
-                this.updateGPSAccuracyIndicator(position.coords.accuracy);
-            },
+    startWatch() {
+        if (!this.isTracking || this.watchId !== null || document.hidden) {
+            return;
+        }
+        
+        this.watchId = navigator.geolocation.watchPosition(
+            (position) => this.handlePosition(position),
             (error) => {
                 this.showError('Error getting location: ' + error.message);
             },
             {
                 enableHighAccuracy: true,
-                timeout: 10000,
-                maximumAge: 0
+                timeout: 20000,
+                // Accept a fix the browser already has rather than forcing a new one
+                maximumAge: MIN_PROCESS_INTERVAL_MS
             }
         );
     }
     
+    stopWatch() {
+        if (this.watchId !== null) {
+            navigator.geolocation.clearWatch(this.watchId);
+            this.watchId = null;
+        }
+    }
+    
+    handleVisibilityChange() {
+        if (!this.isTracking) {
+            return;
+        }
+        
+        if (document.hidden) {
+            // No GPS and no uploads while nobody is looking
+            this.stopWatch();
+            this.flushFixes();
+            this.showTrackingStatus('Tracking paused while the page is hidden');
+        } else if (!this.pauseTimer) {
+            this.startWatch();
+            this.showTrackingStatus('Tracking your location...');
+        }
+    }
+    
+    /**
+     * Pause GPS for a while once the student is clearly inside
+     */
+    pauseWhileInside() {
+        if (this.pauseTimer) {
+            return;
+        }
+        this.stopWatch();
+        this.showTrackingStatus('You are inside the classroom; location checks paused');
+        
+        this.pauseTimer = setTimeout(() => {
+            this.pauseTimer = null;
+            this.lastProcessed = null;  // re-evaluate the next fix unconditionally
+            this.startWatch();
+            this.showTrackingStatus('Tracking your location...');
+        }, INSIDE_PAUSE_MS);
+    }
+    
+    /**
+     * Skip fixes that say nothing new: too soon after the last one, or a
+     * stationary student whose accuracy did not improve
+     */
+    shouldProcess(fix) {
+        const last = this.lastProcessed;
+        if (!last) {
+            return true;
+        }
+        
+        const elapsed = fix.time - last.time;
+        if (elapsed < MIN_PROCESS_INTERVAL_MS) {
+            return false;
+        }
+        
+        const moved = this.distanceMeters(last, fix);
+        const noise = Math.max(MIN_MOVE_M, Math.min(fix.accuracy, last.accuracy));
+        const improved = fix.accuracy < last.accuracy * 0.8;
+        
+        return moved > noise || improved || elapsed >= STATIONARY_INTERVAL_MS;
+    }
+    
+    distanceMeters(a, b) {
+        const mPerLat = 111320;
+        const mPerLon = mPerLat * Math.cos(a.lat * Math.PI / 180);
+        return Math.hypot((b.lat - a.lat) * mPerLat, (b.lon - a.lon) * mPerLon);
+    }
+    
+    handlePosition(position) {
+        const fix = {
+            lat: position.coords.latitude,
+            lon: position.coords.longitude,
+            accuracy: position.coords.accuracy,
+            time: position.timestamp || Date.now()
+        };
+        
+        this.currentLocation = fix;
+        this.gpsAccuracy = fix.accuracy;
+        this.recentFixes.push(fix);
+        if (this.recentFixes.length > CHECKIN_SAMPLES) {
+            this.recentFixes.shift();
+        }
+        
+        if (!this.shouldProcess(fix)) {
+            return;
+        }
+        this.lastProcessed = fix;
+        
+        // Update map and GPS accuracy indicator
+        this.updateStudentMarker();
+        this.updateGPSAccuracyIndicator(fix.accuracy);
+        
+        // Check boundary status
+        this.checkBoundaryStatus();
+    }
+    
     checkBoundaryStatus() {
         if (!this.currentLocation) {
             return;
         }
         
-        const url = `/student/api/lecture/${this.lectureId}/boundary-status?` +
-                    `lat=${this.currentLocation.lat}&` +
-                    `lon=${this.currentLocation.lon}&` +
-                    `accuracy=${this.currentLocation.accuracy}`;
+        // Evaluate on the device when the descriptor is available
+        const evaluator = this.evaluator();
+        if (evaluator) {
+            const status = evaluator.evaluate(
+                this.currentLocation.lat,
+                this.currentLocation.lon,
+                this.currentLocation.accuracy
+            );
+            this.displayBoundaryStatus(status);
+            
+            if (status.boundary_status.inside_probability >= CLEARLY_INSIDE_PROBABILITY) {
+                this.pauseWhileInside();
+            }
+            return;
+        }
+        
+        // Otherwise coalesce fixes for the batch status endpoint
+        this.pendingFixes.push(this.toSample(this.currentLocation));
+        if (this.pendingFixes.length >= MAX_BATCH_FIXES) {
+            this.flushFixes();
+        }
+    }
+    
+    toSample(fix) {
+        return {
+            latitude: fix.lat,
+            longitude: fix.lon,
+            accuracy: fix.accuracy,
+            timestamp: fix.time
+        };
+    }
+    
+    flushFixes() {
+        if (!this.pendingFixes.length) {
+            return;
+        }
+        
+        const fixes = this.pendingFixes.splice(0, this.pendingFixes.length);
         
-        fetch(url)
+        fetch(`/student/api/lecture/${this.lectureId}/boundary-status/batch`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({fixes: fixes})
+        })
             .then(response => response.json())
             .then(data => {
                 if (data.success) {
-                    this.displayBoundaryStatus(data);
+                    this.displayBoundaryStatus(this.statusFromBatch(data));
                 }
             })
             .catch(error => {
@@ -102,6 +287,35 @@ class StudentLocationTracker {
             });
     }
     
+    /**
+     * Shape the fused status of a batch like a boundary-status response
+     */
+    statusFromBatch(data) {
+        const fused = data.fused;
+        const rectangular = data.geofence_type === 'rectangular';
+        
+        return {
+            success: true,
+            lecture_id: data.lecture_id,
+            geofence_type: data.geofence_type,
+            student_location: {lat: fused.latitude, lon: fused.longitude, accuracy: fused.accuracy},
+            boundary_status: {
+                method: data.geofence_type,
+                inside: fused.inside || fused.can_checkin,
+                can_checkin: fused.can_checkin,
+                inside_probability: fused.inside_probability,
+                distance_to_edge: fused.distance_to_edge,
+                distance: fused.distance,
+                radius: data.radius
+            },
+            requirements: {
+                gps_accuracy_threshold: data.gps_accuracy_threshold,
+                current_gps_accuracy: fused.accuracy,
+                meets_requirements: rectangular ? fused.can_checkin : fused.accuracy <= data.gps_accuracy_threshold
+            }
+        };
+    }
+    
     displayBoundaryStatus(status) {
         const statusDiv = document.getElementById('boundary-status');
         if (!statusDiv) return;
@@ -185,13 +399,23 @@ class StudentLocationTracker {
         const inside = status.boundary_status.inside;
         const color = inside ? '#28a745' : '#dc3545';
         
+        const evaluator = this.boundaries ? this.boundaries.get(this.lectureId) : null;
+        
         if (status.geofence_type === 'rectangular') {
-            // Draw rectangular boundary
-            // Note: We'd need the actual corners from the API
-            // For now, just show a marker
+            // Draw rectangular boundary from the descriptor
+            if (evaluator && evaluator.bounds()) {
+                this.boundaryOverlay = L.rectangle(evaluator.bounds(), {
+                    color: color,
+                    fillColor: color,
+                    fillOpacity: 0.1,
+                    weight: 2
+                }).addTo(this.map);
+            }
         } else {
             // Draw circular boundary
-            const center = status.student_location; // This should be lecture location
+            const center = evaluator
+                ? {lat: evaluator.descriptor.origin[0], lon: evaluator.descriptor.origin[1]}
+                : status.student_location;
             const radius = status.boundary_status.radius;
             
             this.boundaryOverlay = L.circle([center.lat, center.lon], {
@@ -270,6 +494,13 @@ class StudentLocationTracker {
             }
         };
         
+        // Let the server fuse the last few fixes instead of trusting one
+        const now = Date.now();
+        const samples = this.recentFixes.filter(fix => now - fix.time <= SAMPLE_MAX_AGE_MS);
+        if (samples.length > 1) {
+            data.samples = samples.map(fix => this.toSample(fix));
+        }
+        
         // Show loading
         const checkinBtn = document.getElementById('checkin-button');
         if (checkinBtn) {
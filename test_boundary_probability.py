@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test script for probabilistic rectangular boundary checks
+Compares the scalar, vectorized and on-device (static/js/boundary_evaluator.js)
+evaluations; the JavaScript comparison is skipped when node is not installed.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import math
+import shutil
+import subprocess
+from utils.rectangular_geofence import RectangularBoundary
+from utils.boundary_probability import (
+    BoundaryFrame,
+    inside_probability,
+    inside_probabilities,
+    is_accepted,
+    boundary_descriptor,
+    evaluate_fixes,
+    DEFAULT_ACCEPTANCE_PROBABILITY,
+    CENTRE_FALLBACK_M,
+    METERS_PER_DEGREE_LAT
+)
+
+LAT, LON = 40.712800, -74.006000
+M_PER_LON = METERS_PER_DEGREE_LAT * math.cos(math.radians(LAT))
+HALF_WIDTH, HALF_HEIGHT = 15.0, 10.0  # a 30m x 20m room
+TOLERANCE = 2.0
+EVALUATOR_JS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'js', 'boundary_evaluator.js')
+
+
+def _point(east, north):
+    """(lat, lon) of a point offset from the room centre in metres"""
+    return LAT + north / METERS_PER_DEGREE_LAT, LON + east / M_PER_LON
+
+
+def _boundary():
+    north, south = _point(0, HALF_HEIGHT)[0], _point(0, -HALF_HEIGHT)[0]
+    east, west = _point(HALF_WIDTH, 0)[1], _point(-HALF_WIDTH, 0)[1]
+    return RectangularBoundary((north, east), (north, west), (south, east), (south, west))
+
+
+class _Lecture:
+    """Just the attributes boundary_descriptor and evaluate_fixes read"""
+    id = 5
+    latitude = LAT
+    longitude = LON
+    geofence_type = 'rectangular'
+    geofence_radius = 50
+    gps_accuracy_threshold = 20
+    boundary_tolerance_m = TOLERANCE
+    acceptance_probability = None
+
+    def get_boundary(self):
+        return _boundary()
+
+
+def _fixes():
+    """Grid of fixes inside, on and outside the room at a range of accuracies"""
+    fixes = []
+    for east in (-25, -16.5, -14, -8, 0, 3, 9, 16, 22):
+        for north in (-14, -11, -6, 0, 4, 10.5, 13):
+            for accuracy in (2, 8, 15, 40, None):
+                fixes.append((*_point(east, north), accuracy))
+    return fixes
+
+
+def test_scalar_matches_vectorized():
+    """inside_probabilities agrees with inside_probability fix by fix"""
+    print("\n" + "="*60)
+    print("TEST 1: Scalar vs Vectorized")
+    print("="*60)
+
+    frame = BoundaryFrame(_boundary(), TOLERANCE)
+    fixes = _fixes()
+    vectorized = inside_probabilities(frame, *zip(*[(lat, lon, float('nan') if a is None else a)
+                                                    for lat, lon, a in fixes]))
+
+    worst = max(abs(inside_probability(frame, lat, lon, accuracy)['probability'] - p)
+                for (lat, lon, accuracy), p in zip(fixes, vectorized))
+    print(f"   {len(fixes)} fixes, largest difference {worst:.2e}")
+    assert worst < 1e-6
+    print("✅ Probabilities agree")
+
+
+def test_acceptance_rule():
+    """Probability threshold, near-centre fallback, and evaluate_fixes agreement"""
+    print("\n" + "="*60)
+    print("TEST 2: Acceptance Rule")
+    print("="*60)
+
+    frame = BoundaryFrame(_boundary(), TOLERANCE)
+    cases = [
+        (0, 0, 8, True, "centre, good accuracy"),
+        (0, 0, 40, True, "centre, poor accuracy (fallback)"),
+        (CENTRE_FALLBACK_M - 1, 0, 40, True, "inside near centre, poor accuracy"),
+        (13, 0, 40, False, "inside near the wall, poor accuracy"),
+        (13, 0, 2, True, "inside near the wall, precise"),
+        (30, 0, 2, False, "outside"),
+    ]
+    for east, north, accuracy, expected, label in cases:
+        result = inside_probability(frame, *_point(east, north), accuracy)
+        accepted = is_accepted(result, DEFAULT_ACCEPTANCE_PROBABILITY)
+        status = "✅" if accepted == expected else "❌"
+        print(f"{status} {label}: p={result['probability']:.3f} near_centre={result['near_centre']}")
+        assert accepted == expected, label
+
+    fixes = _fixes()
+    statuses = evaluate_fixes(_Lecture(), *zip(*[(lat, lon, float('nan') if a is None else a)
+                                                 for lat, lon, a in fixes]))
+    for (lat, lon, accuracy), status in zip(fixes, statuses):
+        result = inside_probability(frame, lat, lon, accuracy)
+        assert status['inside'] == result['inside']
+        assert status['can_checkin'] == is_accepted(result, DEFAULT_ACCEPTANCE_PROBABILITY)
+    print(f"   evaluate_fixes matches inside_probability for {len(fixes)} fixes")
+
+
+def test_device_evaluator():
+    """The JavaScript evaluator reaches the same decisions as the server"""
+    print("\n" + "="*60)
+    print("TEST 3: On-Device Evaluator")
+    print("="*60)
+
+    node = shutil.which('node')
+    if not node:
+        print("⚠️  node not installed, skipping")
+        return
+
+    descriptor = boundary_descriptor(_Lecture())
+    fixes = _fixes()
+    script = (
+        "const fs = require('fs'), vm = require('vm');"
+        f"vm.runInThisContext(fs.readFileSync({json.dumps(EVALUATOR_JS)}, 'utf8') +"
+        " '\\nglobalThis.BoundaryEvaluator = BoundaryEvaluator;');"
+        "const input = JSON.parse(fs.readFileSync(0, 'utf8'));"
+        "const evaluator = new BoundaryEvaluator(input.descriptor);"
+        "console.log(JSON.stringify(input.fixes.map(([lat, lon, a]) =>"
+        " evaluator.evaluate(lat, lon, a === null ? undefined : a).boundary_status)));"
+    )
+    output = subprocess.run([node, '-e', script], input=json.dumps({'descriptor': descriptor, 'fixes': fixes}),
+                            capture_output=True, text=True, check=True).stdout
+    device = json.loads(output)
+
+    frame = BoundaryFrame(_boundary(), TOLERANCE)
+    mismatches = 0
+    for (lat, lon, accuracy), status in zip(fixes, device):
+        result = inside_probability(frame, lat, lon, accuracy)
+        assert abs(status['inside_probability'] - result['probability']) < 2e-3
+        # The descriptor is rounded, so only fixes right at a threshold may differ
+        if status['can_checkin'] != is_accepted(result, DEFAULT_ACCEPTANCE_PROBABILITY):
+            mismatches += 1
+            assert (abs(result['probability'] - DEFAULT_ACCEPTANCE_PROBABILITY) < 0.01 or
+                    abs(math.hypot(*frame.project(lat, lon)) - CENTRE_FALLBACK_M) < 0.01)
+    print(f"   {len(fixes)} fixes, {mismatches} near-threshold differences")
+    print("✅ Device and server agree")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print("BOUNDARY PROBABILITY TESTS")
+    print("="*70)
+
+    test_scalar_matches_vectorized()
+    test_acceptance_rule()
+    test_device_evaluator()
+
+    print("\n" + "="*70)
+    print("✅ ALL TESTS PASSED")
+    print("="*70)
+
+
+if __name__ == '__main__':
+    run_all_tests()
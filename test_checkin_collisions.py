@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test script for proxy check-in detection
+Runs against an in-memory SQLite database (testing config).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from app import create_app
+from extensions import db
+from models.user import User
+from models.course import Course
+from models.lecture import Lecture
+from models.attendance import Attendance
+from utils.checkin_collisions import (
+    stamp_checkin_keys,
+    detect_checkin_collision,
+    scan_checkin_collisions
+)
+from utils.checkin_clusters import analyze_lecture_checkins, scan_checkin_clusters
+
+USER_AGENT = 'Mozilla/5.0 (Linux; Android 14) Chrome/126.0 Mobile Safari/537.36'
+LAT, LON = 40.712800, -74.006000
+
+
+def _setup():
+    """Fresh database with one lecture and three students"""
+    app = create_app('testing')
+    ctx = app.app_context()
+    ctx.push()
+    db.drop_all()
+    db.create_all()
+
+    teacher = User(username='teacher', email='t@example.com', first_name='T', last_name='T', role='teacher')
+    teacher.set_password('x')
+    db.session.add(teacher)
+    db.session.flush()
+
+    course = Course(code='CS101', name='Course', teacher_id=teacher.id)
+    db.session.add(course)
+    db.session.flush()
+
+    now = datetime.now()
+    lecture = Lecture(course_id=course.id, teacher_id=teacher.id, title='Lecture',
+                      latitude=LAT, longitude=LON,
+                      scheduled_start=now, scheduled_end=now + timedelta(hours=1))
+    students = [User(username=f's{i}', email=f's{i}@example.com', first_name='S', last_name=str(i),
+                     role='student', student_id=f'S{i}') for i in range(3)]
+    for student in students:
+        student.set_password('x')
+    db.session.add(lecture)
+    db.session.add_all(students)
+    db.session.commit()
+    return ctx, lecture, students
+
+
+def _check_in(lecture, student, latitude, longitude, accuracy, timestamp):
+    """Stamp, detect and store one check-in the way api_checkin does"""
+    attendance = Attendance(student_id=student.id, lecture_id=lecture.id, status='present',
+                            marked_at=datetime.now(), student_latitude=latitude,
+                            student_longitude=longitude, gps_accuracy_at_checkin=accuracy)
+    metadata = {'accuracy': accuracy, 'timestamp': timestamp}
+    stamp_checkin_keys(attendance, latitude, longitude, metadata, USER_AGENT)
+    collision = detect_checkin_collision(attendance, latitude, longitude)
+    db.session.add(attendance)
+    db.session.commit()
+    return collision
+
+
+def test_honest_neighbours_not_flagged():
+    """Two students next to each other with ordinary indoor accuracy"""
+    print("\n" + "="*60)
+    print("TEST 1: Honest Neighbours")
+    print("="*60)
+
+    ctx, lecture, students = _setup()
+    try:
+        # Same browser build, Wi-Fi positioning: identical cell, 12-15 m accuracy
+        _check_in(lecture, students[0], LAT, LON, 12.0, '2024-01-15T10:00:05Z')
+        collision = _check_in(lecture, students[1], LAT + 3e-6, LON, 15.0, '2024-01-15T10:01:40Z')
+
+        print(f"   collision={collision['collision']} students={collision['student_ids']}")
+        assert not collision['collision']
+        assert scan_checkin_collisions() == []
+        print("✅ Neighbours with normal accuracy are not flagged")
+    finally:
+        ctx.pop()
+
+
+def test_same_device_flagged():
+    """One phone checking in two students with a precise fix"""
+    print("\n" + "="*60)
+    print("TEST 2: Same Device, Precise Fix")
+    print("="*60)
+
+    ctx, lecture, students = _setup()
+    try:
+        _check_in(lecture, students[0], LAT, LON, 3.0, '2024-01-15T10:00:05Z')
+        collision = _check_in(lecture, students[1], LAT + 3e-6, LON, 3.5, '2024-01-15T10:01:40Z')
+
+        print(f"   collision={collision['collision']} students={collision['student_ids']}")
+        assert collision['collision'] and collision['student_ids'] == [students[0].id]
+
+        found = scan_checkin_collisions()
+        assert any(c['key_type'] == 'proximity' and c['student_count'] == 2 for c in found)
+        print("✅ Precise fixes from one device are flagged")
+    finally:
+        ctx.pop()
+
+
+def test_replayed_fix_flagged():
+    """An identical fix replayed for another student matches the fingerprint at any accuracy"""
+    print("\n" + "="*60)
+    print("TEST 3: Replayed Fix")
+    print("="*60)
+
+    ctx, lecture, students = _setup()
+    try:
+        _check_in(lecture, students[0], LAT, LON, 25.0, '2024-01-15T10:00:05Z')
+        collision = _check_in(lecture, students[2], LAT, LON, 25.0, '2024-01-15T10:00:30Z')
+
+        print(f"   collision={collision['collision']} students={collision['student_ids']}")
+        assert collision['collision']
+        print("✅ Replayed fix is flagged through the fingerprint")
+    finally:
+        ctx.pop()
+
+
+def test_cluster_scan_ignores_honest_checkins():
+    """Shared Wi-Fi fixes and a busy lecture start are not clusters or bursts"""
+    print("\n" + "="*60)
+    print("TEST 4: Cluster Scan, Honest Check-ins")
+    print("="*60)
+
+    meters = 1 / 111320
+
+    # Wi-Fi positioning: identical coordinates and accuracy, a minute apart
+    shared_wifi = analyze_lecture_checkins(1, [1, 2, 3], [12.9716] * 3, [77.5946] * 3,
+                                           [30.0] * 3, [0, 60, 120])
+    # Four precise fixes 1-3 m apart within two seconds
+    lecture_start = analyze_lecture_checkins(1, [1, 2, 3, 4],
+                                             [12.9716 + d * meters for d in (0, 1, 2, 3)], [77.5946] * 4,
+                                             [5.0, 6.0, 7.0, 8.0], [0, 0.5, 1.2, 2.0])
+    # No accuracy reported at all
+    no_accuracy = analyze_lecture_checkins(1, [1, 2, 3], [12.9716] * 3, [77.5946] * 3,
+                                           [None] * 3, [0, 1, 2])
+
+    print(f"   shared Wi-Fi={shared_wifi} lecture start={lecture_start} no accuracy={no_accuracy}")
+    assert shared_wifi == [] and lecture_start == [] and no_accuracy == []
+    print("✅ Honest check-ins are not flagged")
+
+
+def test_cluster_scan_flags_one_device():
+    """One phone checking in several students within seconds is a cluster and a burst"""
+    print("\n" + "="*60)
+    print("TEST 5: Cluster Scan, One Device")
+    print("="*60)
+
+    findings = analyze_lecture_checkins(1, [1, 2, 3, 4], [12.9716] * 4, [77.5946] * 4,
+                                        [3.0] * 4, [0, 0.5, 1.0, 1.5])
+    kinds = sorted(f['kind'] for f in findings)
+    print(f"   findings: {kinds}")
+    assert kinds == ['burst', 'cluster']
+    assert all(f['attendance_ids'] == [1, 2, 3, 4] for f in findings)
+
+    ctx, lecture, students = _setup()
+    try:
+        # A row without marked_at is skipped, not a crash
+        for student in students:
+            db.session.add(Attendance(student_id=student.id, lecture_id=lecture.id, status='present',
+                                      marked_at=None, student_latitude=LAT, student_longitude=LON,
+                                      gps_accuracy_at_checkin=3.0))
+        db.session.commit()
+        assert scan_checkin_clusters(workers=1) == []
+    finally:
+        ctx.pop()
+    print("✅ One device is flagged, rows without marked_at are skipped")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print("PROXY CHECK-IN DETECTION TESTS")
+    print("="*70)
+
+    test_honest_neighbours_not_flagged()
+    test_same_device_flagged()
+    test_replayed_fix_flagged()
+    test_cluster_scan_ignores_honest_checkins()
+    test_cluster_scan_flags_one_device()
+
+    print("\n" + "="*70)
+    print("✅ ALL TESTS PASSED")
+    print("="*70)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-sample GPS fusion
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import math
+from utils.location_fusion import (
+    parse_samples,
+    fuse_samples,
+    MAX_SAMPLES,
+    METERS_PER_DEGREE_LAT
+)
+
+LAT, LON = 40.712800, -74.006000
+M_PER_LON = METERS_PER_DEGREE_LAT * math.cos(math.radians(LAT))
+
+
+def _sample(north=0.0, east=0.0, accuracy=10.0):
+    """A fix offset from the reference point by metres north and east"""
+    return {'latitude': LAT + north / METERS_PER_DEGREE_LAT,
+            'longitude': LON + east / M_PER_LON,
+            'accuracy': accuracy}
+
+
+def _offset(result):
+    """(north, east) metres of a fused position from the reference point"""
+    return ((result['latitude'] - LAT) * METERS_PER_DEGREE_LAT,
+            (result['longitude'] - LON) * M_PER_LON)
+
+
+def test_parse_samples():
+    """Invalid entries are skipped, the sample limit is applied"""
+    print("\n" + "="*60)
+    print("TEST 1: Sample Parsing")
+    print("="*60)
+
+    lats, lons, accuracies = parse_samples([
+        _sample(accuracy=5),
+        {'latitude': 'abc', 'longitude': LON},
+        {'latitude': 95, 'longitude': LON},
+        {'latitude': float('nan'), 'longitude': LON},
+        'not a dict',
+        {'latitude': LAT, 'longitude': LON},  # no accuracy
+    ])
+    print(f"   kept {len(lats)} of 6")
+    assert len(lats) == 2 and accuracies[0] == 5 and math.isnan(accuracies[1])
+
+    lats, _, _ = parse_samples([_sample()] * (MAX_SAMPLES + 5))
+    assert len(lats) == MAX_SAMPLES
+
+    for bad in ([], [{'latitude': None}], 'samples'):
+        try:
+            parse_samples(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"parse_samples({bad!r}) should raise")
+    print("✅ Only valid samples kept")
+
+
+def test_single_sample():
+    """One sample comes back unchanged"""
+    print("\n" + "="*60)
+    print("TEST 2: Single Sample")
+    print("="*60)
+
+    result = fuse_samples([_sample(north=4, east=-3, accuracy=12)])
+    north, east = _offset(result)
+    print(f"   {result}")
+    assert abs(north - 4) < 1e-6 and abs(east + 3) < 1e-6
+    assert result['accuracy'] == 12 and result['used'] == 1 and result['rejected'] == []
+    print("✅ Single sample passes through")
+
+
+def test_outlier_rejected():
+    """A multipath jump far outside the burst's spread and accuracy is dropped"""
+    print("\n" + "="*60)
+    print("TEST 3: Outlier Rejection")
+    print("="*60)
+
+    burst = [_sample(north=n, east=e, accuracy=8) for n, e in [(0, 0), (1, -1), (-1, 1), (0.5, 0.5)]]
+    burst.insert(2, _sample(north=120, east=40, accuracy=8))
+
+    result = fuse_samples(burst)
+    north, east = _offset(result)
+    print(f"   fused at ({north:.1f}m N, {east:.1f}m E), rejected {result['rejected']}")
+    assert result['rejected'] == [2] and result['used'] == 4
+    assert math.hypot(north, east) < 1.5
+    print("✅ Outlier rejected, fix stays with the burst")
+
+
+def test_accuracy_weighting():
+    """A precise sample outweighs coarse ones; missing accuracy counts as poor"""
+    print("\n" + "="*60)
+    print("TEST 4: Accuracy Weighting")
+    print("="*60)
+
+    result = fuse_samples([_sample(accuracy=3), _sample(north=6, accuracy=30), _sample(north=6, accuracy=30)])
+    north, _ = _offset(result)
+    print(f"   precise vs coarse: {north:.1f}m N, accuracy {result['accuracy']}m")
+    assert abs(north) < 0.5 and result['rejected'] == []
+    assert result['accuracy'] >= 3 / math.sqrt(2)
+
+    unknown = dict(_sample(north=6))
+    del unknown['accuracy']
+    result = fuse_samples([_sample(accuracy=10), unknown, unknown])
+    north, _ = _offset(result)
+    print(f"   unknown accuracy: {north:.1f}m N")
+    assert abs(north) < 0.5
+    print("✅ Weighted by reported accuracy")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print("LOCATION FUSION TESTS")
+    print("="*70)
+
+    test_parse_samples()
+    test_single_sample()
+    test_outlier_rejected()
+    test_accuracy_weighting()
+
+    print("\n" + "="*70)
+    print("✅ ALL TESTS PASSED")
+    print("="*70)
+
+
+if __name__ == '__main__':
+    run_all_tests()
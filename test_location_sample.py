@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for LocationSample parsing and the metadata rule pipelines
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime
+from utils.location_sample import (
+    LocationSample,
+    RulePipeline,
+    SPOOFING_PIPELINE,
+    VALIDATION_PIPELINE,
+    pipeline_timings
+)
+from utils.geolocation import analyze_location_accuracy, get_location_security_score
+
+EPOCH = 1700000000  # 2023-11-14T22:13:20Z
+
+
+def test_parse_metadata():
+    """JSON strings and dicts parse into the same immutable sample"""
+    print("\n" + "="*60)
+    print("TEST 1: Metadata Parsing")
+    print("="*60)
+
+    metadata = {'latitude': '40.7128', 'longitude': -74.006, 'accuracy': '12.5',
+                'altitude': 10, 'userAgent': 'Mozilla/5.0', 'timestamp': EPOCH * 1000}
+    from_dict = LocationSample.parse(metadata)
+    from_json = LocationSample.parse('{"latitude": "40.7128", "longitude": -74.006, "accuracy": "12.5"}')
+
+    print(f"   {from_dict!r}")
+    assert from_dict.coordinates == (40.7128, -74.006)
+    assert from_dict.accuracy == 12.5 and from_json.accuracy == 12.5
+    assert from_dict.user_agent == 'Mozilla/5.0'
+    assert from_dict.fields == frozenset(metadata)
+    assert LocationSample.parse(from_dict) is from_dict
+
+    # Explicit coordinates win over the metadata's
+    assert LocationSample.parse(metadata, latitude=1.5, longitude=2.5).coordinates == (1.5, 2.5)
+
+    try:
+        from_dict.accuracy = 1
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("LocationSample should be immutable")
+    print("✅ Dict and JSON metadata parsed, sample is immutable")
+
+
+def test_bad_input():
+    """Unparseable and non-finite values become None instead of raising"""
+    print("\n" + "="*60)
+    print("TEST 2: Bad Input")
+    print("="*60)
+
+    broken = LocationSample.parse('{not json')
+    assert broken.parse_error and not broken.has_metadata
+    assert broken.coordinates == (None, None)
+    print(f"   invalid JSON: parse_error={broken.parse_error!r}")
+
+    for label, value in [('NaN', float('nan')), ('inf', float('inf')), ("'nan' string", 'nan'),
+                         ('bool', True), ('text', 'twelve'), ('list', [12])]:
+        sample = LocationSample.parse({'accuracy': value, 'speed': value})
+        assert sample.accuracy is None and sample.speed is None, label
+        print(f"   {label}: accuracy=None")
+
+    assert LocationSample.parse(['not', 'a', 'dict']).fields == frozenset()
+    print("✅ Bad values dropped")
+
+
+def test_timestamps():
+    """ISO 8601, epoch seconds and epoch milliseconds all parse to the same instant"""
+    print("\n" + "="*60)
+    print("TEST 3: Timestamps")
+    print("="*60)
+
+    now = datetime.fromtimestamp(EPOCH + 60)
+    for label, value in [('ISO Z', '2023-11-14T22:13:20Z'), ('ISO offset', '2023-11-15T03:43:20+05:30'),
+                         ('epoch s', EPOCH), ('epoch ms', EPOCH * 1000)]:
+        sample = LocationSample.parse({'timestamp': value}, now=now)
+        print(f"   {label}: age={sample.age_seconds}s")
+        assert sample.timestamp_valid and sample.timestamp.timestamp() == EPOCH, label
+        assert abs(sample.age_seconds - 60) < 1e-6, label
+
+    invalid = LocationSample.parse({'timestamp': 'yesterday'})
+    assert not invalid.timestamp_valid and invalid.timestamp is None
+    assert LocationSample.parse({}).timestamp_valid  # missing is not invalid
+    print("✅ Timestamp formats agree")
+
+
+def test_pipelines():
+    """Rules add up penalties, issues and errors, and are timed"""
+    print("\n" + "="*60)
+    print("TEST 4: Rule Pipelines")
+    print("="*60)
+
+    pipeline = RulePipeline(SPOOFING_PIPELINE.name, SPOOFING_PIPELINE.rules)
+    spoofed = pipeline.run(LocationSample.parse({'latitude': 40, 'longitude': -74, 'accuracy': 0.5}))
+    print(f"   spoofed: {spoofed}")
+    assert 'perfect_integer_coordinates' in spoofed['issues']
+    assert 'impossible_accuracy' in spoofed['issues']
+    assert spoofed['score'] == 100 - spoofed['penalty']
+
+    clean = pipeline.run(LocationSample.parse({'latitude': 40.7128, 'longitude': -74.006, 'accuracy': 8,
+                                               'timestamp': EPOCH, 'userAgent': 'Mozilla/5.0'}))
+    assert clean['penalty'] == 0 and clean['issues'] == []
+
+    timings = pipeline.timings()
+    assert all(stats['calls'] == 2 for stats in timings.values())
+    pipeline.reset_timings()
+    assert all(stats['calls'] == 0 for stats in pipeline.timings().values())
+
+    invalid = VALIDATION_PIPELINE.run(LocationSample.parse({'latitude': 95, 'longitude': 0, 'accuracy': -1}))
+    print(f"   invalid: {invalid['errors']}")
+    assert 'negative_accuracy' in invalid['errors']
+    assert 'invalid_latitude_range' in invalid['errors']
+    assert 'missing_required_field: timestamp' in invalid['errors']
+    print("✅ Pipelines report findings and timings")
+
+
+def test_security_score():
+    """Accuracy analysis and the security score run through the pipelines"""
+    print("\n" + "="*60)
+    print("TEST 5: Security Score")
+    print("="*60)
+
+    now = datetime.fromtimestamp(EPOCH + 600)
+    stale_and_fast = LocationSample.parse({'accuracy': 60, 'speed': 6, 'timestamp': EPOCH}, now=now)
+    analysis = analyze_location_accuracy(stale_and_fast)
+    print(f"   analysis: {analysis}")
+    assert analysis['reliability'] == 'poor' and analysis['warning'] == 'stale_location_data'
+    assert analyze_location_accuracy({'accuracy': 8, 'speed': 6})['warning'] == 'high_speed_detected'
+    assert analyze_location_accuracy({})['status'] == 'no_metadata'
+
+    result = get_location_security_score(stale_and_fast, {'accuracy': 30})
+    print(f"   score: {result['score']} {result['issues']}")
+    assert result['issues'] == ['poor_student_accuracy', 'student_moving_fast', 'stale_location',
+                                'poor_lecture_accuracy']
+    assert result['score'] == 10 and result['level'] == 'low'
+
+    clean = get_location_security_score({'accuracy': 8, 'speed': 0}, {'accuracy': 5})
+    assert clean['score'] == 100 and clean['level'] == 'high' and clean['issues'] == []
+
+    assert {'accuracy', 'student_security', 'lecture_security'} <= set(pipeline_timings())
+    print("✅ Security score matches the rules")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print("LOCATION SAMPLE TESTS")
+    print("="*70)
+
+    test_parse_metadata()
+    test_bad_input()
+    test_timestamps()
+    test_pipelines()
+    test_security_score()
+
+    print("\n" + "="*70)
+    print("✅ ALL TESTS PASSED")
+    print("="*70)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for rotating QR check-in tokens
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.qr_tokens import (
+    issue_token,
+    verify_token,
+    check_location,
+    QrTokenError,
+    DEFAULT_ROTATION_SECONDS
+)
+
+SECRET = 'test-secret'
+METERS_PER_DEGREE_LAT = 111320
+
+
+class _Lecture:
+    """Just the attributes issue_token reads"""
+    id = 7
+    course_id = 3
+    latitude = 40.7128
+    longitude = -74.0060
+    geofence_type = 'circular'
+    geofence_radius = 40
+    boundary_tolerance_m = 2.0
+
+    def get_boundary(self):
+        return None
+
+
+def _rejects(token, now, secret=SECRET):
+    try:
+        verify_token(secret, token, now=now)
+    except QrTokenError as e:
+        return str(e)
+    return None
+
+
+def test_token_round_trip():
+    """A token verifies within its slot and carries the signed claims"""
+    print("\n" + "="*60)
+    print("TEST 1: Token Round Trip")
+    print("="*60)
+
+    issued = issue_token(SECRET, _Lecture(), now=1000.0)
+    claims = verify_token(SECRET, issued['token'], now=1000.0)
+    print(f"   Token: {issued['token']}")
+
+    assert claims['lecture_id'] == 7 and claims['course_id'] == 3
+    assert abs(claims['latitude'] - 40.7128) < 1e-5 and abs(claims['longitude'] + 74.0060) < 1e-5
+    assert claims['radius_m'] == 90  # geofence radius + slack
+    assert 0 < issued['expires_in'] <= DEFAULT_ROTATION_SECONDS
+    print("✅ Claims match the lecture")
+
+
+def test_token_expiry():
+    """Current and previous slot are accepted, older and future ones are not"""
+    print("\n" + "="*60)
+    print("TEST 2: Token Expiry")
+    print("="*60)
+
+    token = issue_token(SECRET, _Lecture(), now=1000.0)['token']
+    slot_start = 1000.0 // DEFAULT_ROTATION_SECONDS * DEFAULT_ROTATION_SECONDS
+
+    assert _rejects(token, slot_start + DEFAULT_ROTATION_SECONDS) is None
+    assert 'expired' in _rejects(token, slot_start + 2 * DEFAULT_ROTATION_SECONDS)
+    assert 'not valid yet' in _rejects(token, slot_start - 1)
+    print("✅ Grace slot accepted, stale and future tokens rejected")
+
+
+def test_token_tampering():
+    """Forged signatures, edited claims and other secrets are rejected"""
+    print("\n" + "="*60)
+    print("TEST 3: Token Tampering")
+    print("="*60)
+
+    token = issue_token(SECRET, _Lecture(), now=1000.0)['token']
+    payload, _, signature = token.rpartition('.')
+    fields = payload.split('.')
+    fields[1] = '8'  # another lecture
+
+    for label, forged in [
+        ('edited lecture', '.'.join(fields) + '.' + signature),
+        ('bad signature', payload + '.' + 'A' * len(signature)),
+        ('no signature', payload),
+        ('garbage', 'not-a-token'),
+        ('empty', ''),
+    ]:
+        assert _rejects(forged, 1000.0) == 'Invalid QR code', label
+        print(f"   {label}: rejected")
+
+    assert _rejects(token, 1000.0, secret='other-secret') == 'Invalid QR code'
+    assert _rejects(None, 1000.0) == 'Invalid QR code'
+    print("✅ Tampered tokens rejected")
+
+
+def test_location_check():
+    """Accuracy is credited up to the limit; unusable accuracies are rejected"""
+    print("\n" + "="*60)
+    print("TEST 4: Relaxed Location Check")
+    print("="*60)
+
+    claims = verify_token(SECRET, issue_token(SECRET, _Lecture(), now=1000.0)['token'], now=1000.0)
+    north = lambda meters: claims['latitude'] + meters / METERS_PER_DEGREE_LAT
+
+    cases = [
+        (north(50), 10, True, "inside radius"),
+        (north(120), 40, True, "outside radius, within accuracy"),
+        (north(200), 40, False, "too far"),
+        (claims['latitude'], 200, False, "accuracy above the limit"),
+        (claims['latitude'], None, False, "no accuracy"),
+        (north(8000), float('nan'), False, "NaN accuracy"),
+        (north(8000), float('inf'), False, "infinite accuracy"),
+        (north(500), -1000, False, "negative accuracy"),
+    ]
+
+    for latitude, accuracy, expected, label in cases:
+        result = check_location(claims, latitude, claims['longitude'], accuracy)
+        status = "✅" if result['acceptable'] == expected else "❌"
+        print(f"{status} {label}: acceptable={result['acceptable']} ({result['distance']:.0f}m)")
+        assert result['acceptable'] == expected, label
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print("QR CHECK-IN TOKEN TESTS")
+    print("="*70)
+
+    test_token_round_trip()
+    test_token_expiry()
+    test_token_tampering()
+    test_location_check()
+
+    print("\n" + "="*70)
+    print("✅ ALL TESTS PASSED")
+    print("="*70)
+
+
+if __name__ == '__main__':
+    run_all_tests()
@@ -0,0 +1,241 @@
+"""
+Admin statistics and listings
+Institution-wide counters served from a TTL cache that is dropped whenever
+users, courses or lectures change, plus paginated, server-filtered user and
+course listings whose per-row aggregates come from one grouped query per page
+"""
+from flask import current_app
+from sqlalchemy import event, select, func, case, or_, distinct
+from sqlalchemy.orm import Session, object_session, load_only
+from extensions import db
+from models.user import User
+from models.course import Course
+from models.lecture import Lecture
+from models.enrollment import Enrollment
+from utils.cache import TTLCache
+from utils.loader_profiles import with_profile
+
+DEFAULT_CACHE_TTL = 60  # seconds
+DEFAULT_PER_PAGE = 25
+MAX_PER_PAGE = 100
+
+_STATS_KEY = 'admin_stats'
+_stats_cache = TTLCache(ttl_seconds=DEFAULT_CACHE_TTL, max_entries=1)
+
+# session.info flag set when a flush touched a model the stats depend on
+_PENDING_KEY = 'admin_stats_dirty'
+
+
+def get_admin_stats():
+    """
+    Get the admin dashboard counters, served from cache when fresh
+
+    Returns:
+        Dictionary with total_users, total_courses, total_lectures and
+        active_lectures
+    """
+    ttl = current_app.config.get('ADMIN_STATS_CACHE_TTL', DEFAULT_CACHE_TTL)
+    if not ttl:
+        return build_admin_stats()
+
+    return _stats_cache.get_or_set(_STATS_KEY, build_admin_stats, ttl_seconds=ttl)
+
+
+def invalidate_admin_stats():
+    """Drop the cached counters, e.g. after bulk updates that bypass ORM events"""
+    _stats_cache.clear()
+
+
+def invalidate_admin_stats_on_commit(session):
+    """Drop the cached counters once the session commits"""
+    session.info[_PENDING_KEY] = True
+
+
+def build_admin_stats():
+    """Compute the admin counters in a single round trip"""
+    row = db.session.execute(select(
+        select(func.count(User.id)).scalar_subquery().label('total_users'),
+        select(func.count(Course.id)).scalar_subquery().label('total_courses'),
+        select(func.count(Lecture.id)).scalar_subquery().label('total_lectures'),
+        select(func.count(Lecture.id)).where(Lecture.is_active == True)
+            .scalar_subquery().label('active_lectures'),
+    )).one()
+
+    return {
+        'total_users': row.total_users,
+        'total_courses': row.total_courses,
+        'total_lectures': row.total_lectures,
+        'active_lectures': row.active_lectures,
+    }
+
+
+def _page_args(page, per_page):
+    page = max(page or 1, 1)
+    per_page = min(max(per_page or DEFAULT_PER_PAGE, 1), MAX_PER_PAGE)
+    return page, per_page
+
+
+def _status_filter(column, status):
+    if status == 'active':
+        return column == True
+    if status == 'inactive':
+        return column == False
+    return None
+
+
+def paginate_users(page=1, per_page=DEFAULT_PER_PAGE, search=None, role=None, status=None):
+    """
+    Get one page of users with per-row course counts
+
+    Args:
+        page: 1-based page number
+        per_page: Page size (capped at MAX_PER_PAGE)
+        search: Substring matched against username, email and names
+        role: Optional role filter
+        status: 'active', 'inactive' or None
+
+    Returns:
+        Tuple of (Flask-SQLAlchemy Pagination, {user_id: course_count})
+    """
+    page, per_page = _page_args(page, per_page)
+    query = User.query
+
+    if search:
+        pattern = f"%{search.strip()}%"
+        query = query.filter(or_(
+            User.username.ilike(pattern),
+            User.email.ilike(pattern),
+            User.first_name.ilike(pattern),
+            User.last_name.ilike(pattern)
+        ))
+
+    if role:
+        query = query.filter(User.role == role)
+
+    status_clause = _status_filter(User.is_active, status)
+    if status_clause is not None:
+        query = query.filter(status_clause)
+
+    pagination = query.order_by(User.id).paginate(page=page, per_page=per_page, error_out=False)
+    return pagination, user_course_counts([user.id for user in pagination.items])
+
+
+def user_course_counts(user_ids):
+    """
+    Count active enrollments (students) and taught courses (teachers) for a
+    set of users in one grouped query
+
+    Returns:
+        Dictionary mapping user_id -> number of courses
+    """
+    if not user_ids:
+        return {}
+
+    rows = db.session.execute(
+        select(
+            User.id,
+            func.count(distinct(Enrollment.id)),
+            func.count(distinct(Course.id))
+        )
+        .select_from(User)
+        .outerjoin(Enrollment, (Enrollment.student_id == User.id) & (Enrollment.is_active == True))
+        .outerjoin(Course, Course.teacher_id == User.id)
+        .where(User.id.in_(user_ids))
+        .group_by(User.id)
+    ).all()
+
+    return {user_id: enrolled + taught for user_id, enrolled, taught in rows}
+
+
+def paginate_courses(page=1, per_page=DEFAULT_PER_PAGE, search=None, teacher_id=None, status=None):
+    """
+    Get one page of courses with per-row lecture counts
+
+    Args:
+        page: 1-based page number
+        per_page: Page size (capped at MAX_PER_PAGE)
+        search: Substring matched against course code and name
+        teacher_id: Optional teacher filter
+        status: 'active', 'inactive' or None
+
+    Returns:
+        Tuple of (Flask-SQLAlchemy Pagination, {course_id: lecture stats})
+    """
+    page, per_page = _page_args(page, per_page)
+    query = with_profile(Course.query, 'admin.courses')
+
+    if search:
+        pattern = f"%{search.strip()}%"
+        query = query.filter(or_(Course.code.ilike(pattern), Course.name.ilike(pattern)))
+
+    if teacher_id:
+        query = query.filter(Course.teacher_id == teacher_id)
+
+    status_clause = _status_filter(Course.is_active, status)
+    if status_clause is not None:
+        query = query.filter(status_clause)
+
+    pagination = query.order_by(Course.code).paginate(page=page, per_page=per_page, error_out=False)
+    return pagination, course_lecture_counts([course.id for course in pagination.items])
+
+
+def course_lecture_counts(course_ids):
+    """
+    Count total and active lectures for a set of courses in one grouped query
+
+    Returns:
+        Dictionary mapping course_id -> {'total': int, 'active': int}
+    """
+    if not course_ids:
+        return {}
+
+    rows = db.session.execute(
+        select(
+            Lecture.course_id,
+            func.count(Lecture.id),
+            func.sum(case((Lecture.is_active == True, 1), else_=0))
+        )
+        .where(Lecture.course_id.in_(course_ids))
+        .group_by(Lecture.course_id)
+    ).all()
+
+    return {course_id: {'total': total, 'active': active or 0} for course_id, total, active in rows}
+
+
+def teacher_choices():
+    """Active teachers for course assignment dropdowns (only the columns shown)"""
+    return User.query.options(
+        load_only(User.id, User.username, User.first_name, User.last_name)
+    ).filter_by(role='teacher', is_active=True)\
+        .order_by(User.first_name, User.last_name)\
+        .all()
+
+
+# ---------------------------------------------------------------------------
+# Cache invalidation: mark the session dirty during the flush and drop the
+# cached counters only once the transaction commits
+# ---------------------------------------------------------------------------
+
+def _on_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info[_PENDING_KEY] = True
+
+
+for _model in (User, Course, Lecture):
+    event.listen(_model, 'after_insert', _on_change)
+    event.listen(_model, 'after_delete', _on_change)
+
+# Lecture.is_active feeds the active-lecture count
+event.listen(Lecture, 'after_update', _on_change)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    if session.info.pop(_PENDING_KEY, False):
+        _stats_cache.clear()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
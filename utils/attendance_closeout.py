@@ -0,0 +1,141 @@
+"""
+Attendance close-out
+Materializes 'absent' rows when a lecture closes: every active enrollment
+without an attendance row gets one, written by a single INSERT ... SELECT
+... WHERE NOT EXISTS. The lecture counters and cached student dashboards are
+refreshed in the same transaction, so reports and attendance history count
+absences from real rows instead of inferring them from enrollment totals.
+"""
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import select, insert, update, exists, literal, or_, func
+from extensions import db
+from models.attendance import Attendance
+from models.enrollment import Enrollment
+from models.lecture import Lecture
+from utils.student_dashboard import invalidate_student_dashboard_on_commit
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+CLOSE_OUT_BATCH_SIZE = 200  # lectures per close_out_due_lectures call
+CLOSE_OUT_NOTE = 'Automatically marked absent at lecture close'
+
+
+def close_out_lecture(lecture, closed_at=None):
+    """
+    Materialize absences for one lecture (e.g. from end_lecture)
+
+    Args:
+        lecture: Lecture being closed
+        closed_at: Close-out timestamp (defaults to now); aware values are
+                   converted to naive IST like the rest of the columns
+
+    Returns:
+        Number of absent rows inserted
+
+    The caller commits the session.
+    """
+    if lecture.closed_out_at is not None:
+        return 0
+
+    closed_at = closed_at or datetime.now(IST)
+    if closed_at.tzinfo is not None:
+        closed_at = closed_at.astimezone(IST).replace(tzinfo=None)
+    inserted = _materialize_absences([lecture.id], closed_at)
+    lecture.closed_out_at = closed_at
+    return inserted
+
+
+def close_out_due_lectures(now=None, limit=CLOSE_OUT_BATCH_SIZE):
+    """
+    Close out lectures whose scheduled end has passed (or that were ended
+    before close-out existed), for a periodic scheduler
+
+    Args:
+        now: Reference time (defaults to now)
+        limit: Maximum number of lectures handled in this call
+
+    Returns:
+        Dictionary with lectures (closed) and inserted (absent rows)
+
+    The caller commits the session.
+    """
+    # Lecture timestamps are stored as naive IST wall-clock times
+    now = now or datetime.now(IST).replace(tzinfo=None)
+
+    lecture_ids = db.session.execute(
+        select(Lecture.id).where(
+            Lecture.closed_out_at == None,
+            Lecture.is_active == True,
+            Lecture.status != 'cancelled',
+            or_(Lecture.scheduled_end <= now, Lecture.status == 'completed')
+        ).order_by(Lecture.scheduled_end).limit(limit)
+    ).scalars().all()
+
+    if not lecture_ids:
+        return {'lectures': 0, 'inserted': 0}
+
+    inserted = _materialize_absences(lecture_ids, now)
+
+    db.session.execute(
+        update(Lecture).where(Lecture.id.in_(lecture_ids))
+        .values(closed_out_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    for obj in list(db.session.identity_map.values()):
+        if isinstance(obj, Lecture) and obj.id in lecture_ids:
+            db.session.expire(obj, ['closed_out_at'])
+
+    return {'lectures': len(lecture_ids), 'inserted': inserted}
+
+
+def _materialize_absences(lecture_ids, closed_at):
+    """INSERT ... SELECT absent rows for the lectures, then refresh the rollups"""
+    attendances = Attendance.__table__
+
+    # Students enrolled after the lecture ended were never expected to attend
+    lecture_end = func.coalesce(Lecture.actual_end, Lecture.scheduled_end)
+
+    # (student, lecture) pairs without an attendance row
+    missing = select(Enrollment.student_id, Lecture.id).select_from(Lecture)\
+        .join(Enrollment, Enrollment.course_id == Lecture.course_id)\
+        .where(
+            Lecture.id.in_(lecture_ids),
+            Enrollment.is_active == True,
+            or_(Enrollment.enrollment_date == None, Enrollment.enrollment_date <= lecture_end),
+            ~exists().where(
+                attendances.c.lecture_id == Lecture.id,
+                attendances.c.student_id == Enrollment.student_id
+            )
+        )
+
+    # The students whose dashboards change, from the same selection
+    student_ids = db.session.execute(
+        missing.with_only_columns(Enrollment.student_id).distinct()
+    ).scalars().all()
+    if not student_ids:
+        return 0
+
+    result = db.session.execute(
+        insert(attendances).from_select(
+            ['student_id', 'lecture_id', 'status', 'marked_at', 'auto_marked',
+             'notes', 'created_at', 'updated_at'],
+            missing.add_columns(
+                literal('absent'),
+                literal(closed_at),
+                literal(True),
+                literal(CLOSE_OUT_NOTE),
+                literal(closed_at),
+                literal(closed_at),
+            )
+        )
+    )
+
+    if not result.rowcount:
+        return 0
+
+    # Core inserts skip the ORM listeners that maintain these
+    Lecture.repair_attendance_counters(lecture_ids)
+    invalidate_student_dashboard_on_commit(db.session, student_ids)
+
+    return result.rowcount
@@ -0,0 +1,169 @@
+"""
+Attendance matrix engine
+Loads a course's attendance as a dense student x lecture matrix of status
+codes with a single query, and derives per-student and per-lecture rates,
+streaks and trends from it with vectorized NumPy operations
+"""
+import numpy as np
+
+# Status codes stored in the matrix; NO_RECORD means no attendance row exists
+NO_RECORD = 0
+PRESENT = 1
+LATE = 2
+ABSENT = 3
+EXCUSED = 4
+
+STATUS_CODES = {
+    'present': PRESENT,
+    'late': LATE,
+    'absent': ABSENT,
+    'excused': EXCUSED,
+}
+
+
+class AttendanceMatrix:
+    """
+    Dense student x lecture attendance status matrix
+
+    Rows follow student_ids and columns follow lecture_ids, both in the order
+    given (lectures are expected in chronological order for streaks/trends).
+    """
+
+    def __init__(self, student_ids, lecture_ids, statuses):
+        self.student_ids = np.asarray(student_ids, dtype=np.int64)
+        self.lecture_ids = np.asarray(lecture_ids, dtype=np.int64)
+        self.statuses = statuses
+
+    @classmethod
+    def load(cls, student_ids, lecture_ids):
+        """
+        Build the matrix for the given students and lectures in one query
+
+        Args:
+            student_ids: Row order (e.g. active enrollments of the course)
+            lecture_ids: Column order, chronological
+
+        Returns:
+            AttendanceMatrix
+        """
+        from sqlalchemy import select
+        from extensions import db
+        from models.attendance import Attendance
+
+        student_ids = np.asarray(student_ids, dtype=np.int64)
+        lecture_ids = np.asarray(lecture_ids, dtype=np.int64)
+        statuses = np.full((len(student_ids), len(lecture_ids)), NO_RECORD, dtype=np.int8)
+
+        if len(student_ids) == 0 or len(lecture_ids) == 0:
+            return cls(student_ids, lecture_ids, statuses)
+
+        rows = db.session.execute(
+            select(Attendance.student_id, Attendance.lecture_id, Attendance.status)
+            .where(Attendance.lecture_id.in_(lecture_ids.tolist()))
+        ).all()
+
+        if rows:
+            row_students, row_lectures, row_statuses = zip(*rows)
+            row_students = np.fromiter(row_students, dtype=np.int64, count=len(rows))
+            row_lectures = np.fromiter(row_lectures, dtype=np.int64, count=len(rows))
+            row_codes = np.fromiter((STATUS_CODES.get(s, NO_RECORD) for s in row_statuses),
+                                    dtype=np.int8, count=len(rows))
+
+            student_index = _index_of(student_ids, row_students)
+            lecture_index = _index_of(lecture_ids, row_lectures)
+
+            # Drop records of students who are no longer enrolled
+            keep = student_index >= 0
+            statuses[student_index[keep], lecture_index[keep]] = row_codes[keep]
+
+        return cls(student_ids, lecture_ids, statuses)
+
+    @property
+    def shape(self):
+        return self.statuses.shape
+
+    @property
+    def attended(self):
+        """Boolean matrix of present-or-late cells"""
+        return (self.statuses == PRESENT) | (self.statuses == LATE)
+
+    def count(self, status, axis):
+        """Count cells with a status code along an axis (1 = per student, 0 = per lecture)"""
+        return np.count_nonzero(self.statuses == status, axis=axis)
+
+    def student_rates(self):
+        """Percentage of lectures each student attended (present or late)"""
+        n_lectures = self.statuses.shape[1]
+        if n_lectures == 0:
+            return np.zeros(self.statuses.shape[0])
+        return np.count_nonzero(self.attended, axis=1) / n_lectures * 100
+
+    def lecture_rates(self):
+        """Percentage of students marked present at each lecture"""
+        n_students = self.statuses.shape[0]
+        if n_students == 0:
+            return np.zeros(self.statuses.shape[1])
+        return self.count(PRESENT, axis=0) / n_students * 100
+
+    def current_streaks(self):
+        """Number of most recent consecutive lectures each student attended"""
+        attended = self.attended
+        n_lectures = attended.shape[1]
+        if n_lectures == 0:
+            return np.zeros(attended.shape[0], dtype=np.int64)
+
+        # Position (from the end) of the latest missed lecture, or n if none
+        missed_from_end = ~attended[:, ::-1]
+        first_miss = np.argmax(missed_from_end, axis=1)
+        return np.where(missed_from_end.any(axis=1), first_miss, n_lectures)
+
+    def longest_absence_streaks(self):
+        """Longest run of consecutive missed lectures for each student"""
+        return _longest_runs(~self.attended)
+
+    def student_trends(self):
+        """
+        Least-squares slope of each student's attendance over the lecture
+        sequence, in percentage points per lecture (positive = improving)
+        """
+        return _slopes(self.attended.astype(np.float64)) * 100
+
+    def lecture_trend(self):
+        """Slope of the per-lecture present rate, in percentage points per lecture"""
+        rates = self.lecture_rates()
+        return float(_slopes(rates[np.newaxis, :])[0])
+
+
+def _index_of(ids, values):
+    """Positions of values in an id array (-1 where missing), via searchsorted"""
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    positions = np.searchsorted(sorted_ids, values)
+    positions = np.clip(positions, 0, max(len(sorted_ids) - 1, 0))
+    found = sorted_ids[positions] == values
+    return np.where(found, order[positions], -1)
+
+
+def _longest_runs(mask):
+    """Length of the longest run of True in each row of a boolean matrix"""
+    n_rows, n_cols = mask.shape
+    if n_cols == 0:
+        return np.zeros(n_rows, dtype=np.int64)
+
+    # Running count of consecutive True cells, reset to zero at each False
+    counts = np.cumsum(mask, axis=1)
+    resets = np.where(~mask, counts, 0)
+    run_lengths = counts - np.maximum.accumulate(resets, axis=1)
+    return run_lengths.max(axis=1)
+
+
+def _slopes(values):
+    """Row-wise least-squares slope of values against their column index"""
+    n_cols = values.shape[1]
+    if n_cols < 2:
+        return np.zeros(values.shape[0])
+
+    x = np.arange(n_cols, dtype=np.float64)
+    x_centered = x - x.mean()
+    y_centered = values - values.mean(axis=1, keepdims=True)
+    return (y_centered @ x_centered) / (x_centered @ x_centered)
@@ -0,0 +1,267 @@
+"""
+Probabilistic rectangular boundary checks
+A GPS fix is treated as an isotropic Gaussian around the reported position,
+with sigma derived from the reported accuracy. The probability that the
+student is inside a rectangular boundary is the product of two 1-D normal
+interval masses in a local metric frame (east/north metres around the
+boundary centre), so it has a closed form in erf. A check-in is accepted
+when that probability reaches the lecture's acceptance threshold, or when
+the reported position is inside and within CENTRE_FALLBACK_M of the centre
+(where the probability alone would reject a student in a small room with
+ordinary indoor accuracy, which the old distance bands accepted).
+"""
+import hashlib
+import json
+import math
+from typing import Dict, Optional
+
+METERS_PER_DEGREE_LAT = 111320  # same approximation RectangularBoundary uses
+
+# Browsers report accuracy as a ~68% confidence radius. For a 2-D isotropic
+# Gaussian P(r <= a) = 1 - exp(-a^2 / 2 sigma^2), so sigma = a / 1.5096.
+ACCURACY_TO_SIGMA = 1 / math.sqrt(-2 * math.log(1 - 0.68))
+MIN_SIGMA_M = 1.0  # no receiver is better than this, whatever it claims
+UNKNOWN_ACCURACY_M = 999  # accuracy assumed when none is reported
+
+DEFAULT_ACCEPTANCE_PROBABILITY = 0.5
+CENTRE_FALLBACK_M = 10.0  # inside and this close to the centre: accepted at any accuracy
+MIN_ACCEPTANCE_PROBABILITY = 0.05
+MAX_ACCEPTANCE_PROBABILITY = 0.99
+
+
+def accuracy_to_sigma(accuracy):
+    """Standard deviation (metres, per axis) for a reported accuracy radius"""
+    if accuracy is None or accuracy != accuracy:  # None or NaN
+        accuracy = UNKNOWN_ACCURACY_M
+    return max(float(accuracy) * ACCURACY_TO_SIGMA, MIN_SIGMA_M)
+
+
+def clamp_acceptance_probability(value) -> Optional[float]:
+    """Parse a teacher-supplied threshold; None keeps the default"""
+    if value in (None, ''):
+        return None
+    return min(max(float(value), MIN_ACCEPTANCE_PROBABILITY), MAX_ACCEPTANCE_PROBABILITY)
+
+
+class BoundaryFrame:
+    """
+    A rectangular boundary projected into a local east/north metric frame
+
+    The rectangle's edges are taken as the mean of their two corners, which
+    RectangularBoundary already requires to be close to axis-aligned.
+    """
+
+    __slots__ = ('lat0', 'lon0', 'm_per_lat', 'm_per_lon', 'west', 'east', 'south', 'north')
+
+    def __init__(self, boundary, tolerance_m: float = 0.0):
+        self.lat0, self.lon0 = boundary.get_center()
+        self.m_per_lat = METERS_PER_DEGREE_LAT
+        self.m_per_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(self.lat0))
+
+        # Edges in metres from the centre, widened by the edge tolerance
+        tolerance_m = tolerance_m or 0.0
+        west, south = self.project((boundary.sw[0] + boundary.se[0]) / 2, (boundary.nw[1] + boundary.sw[1]) / 2)
+        east, north = self.project((boundary.nw[0] + boundary.ne[0]) / 2, (boundary.ne[1] + boundary.se[1]) / 2)
+        self.west = west - tolerance_m
+        self.east = east + tolerance_m
+        self.south = south - tolerance_m
+        self.north = north + tolerance_m
+
+    def project(self, latitude, longitude):
+        """(x, y) metres east and north of the centre; works on NumPy arrays too"""
+        return (longitude - self.lon0) * self.m_per_lon, (latitude - self.lat0) * self.m_per_lat
+
+
+def _interval_mass(low, high, sigma):
+    """P(low <= X <= high) for X ~ N(0, sigma)"""
+    scale = sigma * math.sqrt(2)
+    return 0.5 * (math.erf(high / scale) - math.erf(low / scale))
+
+
+def _edge_distance(frame, x, y):
+    """(unsigned distance to the boundary edge, nearest edge name, inside)"""
+    margins = {'west': x - frame.west, 'east': frame.east - x,
+               'south': y - frame.south, 'north': frame.north - y}
+    nearest_edge = min(margins, key=margins.get)
+
+    if margins[nearest_edge] >= 0:
+        return margins[nearest_edge], nearest_edge, True
+
+    dx = max(-margins['west'], -margins['east'], 0.0)
+    dy = max(-margins['south'], -margins['north'], 0.0)
+    return math.hypot(dx, dy), nearest_edge, False
+
+
+def inside_probability(frame: BoundaryFrame, latitude: float, longitude: float,
+                       accuracy: Optional[float]) -> Dict:
+    """
+    Probability that a fix lies inside the boundary
+
+    Returns:
+        dict: {
+            'probability': float,
+            'inside': bool (reported position inside the boundary),
+            'near_centre': bool (inside and within CENTRE_FALLBACK_M of the centre),
+            'distance_to_edge': float (meters),
+            'nearest_edge': str,
+            'sigma_m': float
+        }
+    """
+    sigma = accuracy_to_sigma(accuracy)
+    x, y = frame.project(latitude, longitude)
+
+    probability = (_interval_mass(frame.west - x, frame.east - x, sigma) *
+                   _interval_mass(frame.south - y, frame.north - y, sigma))
+    distance, nearest_edge, inside = _edge_distance(frame, x, y)
+
+    return {
+        'probability': probability,
+        'inside': inside,
+        'near_centre': inside and math.hypot(x, y) <= CENTRE_FALLBACK_M,
+        'distance_to_edge': distance,
+        'nearest_edge': nearest_edge,
+        'sigma_m': sigma
+    }
+
+
+def is_accepted(result: Dict, threshold: float) -> bool:
+    """Acceptance rule for an inside_probability result"""
+    return result['probability'] >= threshold or result['near_centre']
+
+
+def _erf(np, z):
+    """Vectorized erf (Abramowitz & Stegun 7.1.26, |error| < 1.5e-7)"""
+    sign = np.sign(z)
+    z = np.abs(z)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return sign * (1.0 - poly * np.exp(-z * z))
+
+
+def inside_probabilities(frame: BoundaryFrame, latitudes, longitudes, accuracies):
+    """
+    Vectorized inside_probability for many fixes against one boundary
+
+    Missing accuracies are treated as UNKNOWN_ACCURACY_M. Requires numpy.
+
+    Returns:
+        NumPy array of probabilities
+    """
+    import numpy as np
+
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    accuracies = np.asarray(accuracies, dtype=np.float64)
+    accuracies = np.where(np.isnan(accuracies), UNKNOWN_ACCURACY_M, accuracies)
+
+    scale = np.maximum(accuracies * ACCURACY_TO_SIGMA, MIN_SIGMA_M) * math.sqrt(2)
+    x, y = frame.project(latitudes, longitudes)
+
+    mass_x = 0.5 * (_erf(np, (frame.east - x) / scale) - _erf(np, (frame.west - x) / scale))
+    mass_y = 0.5 * (_erf(np, (frame.north - y) / scale) - _erf(np, (frame.south - y) / scale))
+    return mass_x * mass_y
+
+
+DESCRIPTOR_VERSION = 2  # bump when the descriptor layout or evaluation rules change
+
+
+def boundary_descriptor(lecture) -> Optional[Dict]:
+    """
+    Compact boundary description for evaluating fixes on the device
+    (static/js/boundary_evaluator.js mirrors inside_probability)
+
+    Rectangular boundaries are sent as local-frame edges in metres, already
+    widened by the tolerance; circular geofences as centre and radius.
+    'rev' changes whenever anything that affects evaluation changes.
+
+    Returns:
+        dict, or None when the lecture has no usable location
+    """
+    threshold = lecture.gps_accuracy_threshold or 20
+    boundary = lecture.get_boundary() if lecture.geofence_type == 'rectangular' else None
+
+    if boundary is not None:
+        tolerance = lecture.boundary_tolerance_m or 2.0
+        frame = BoundaryFrame(boundary, tolerance)
+        descriptor = {
+            'type': 'rectangular',
+            'origin': [round(frame.lat0, 8), round(frame.lon0, 8)],
+            'scale': [frame.m_per_lat, round(frame.m_per_lon, 4)],
+            'edges': [round(edge, 2) for edge in (frame.west, frame.east, frame.south, frame.north)],
+            'tolerance_m': tolerance,
+            'min_probability': lecture.acceptance_probability or DEFAULT_ACCEPTANCE_PROBABILITY,
+            'centre_fallback_m': CENTRE_FALLBACK_M,
+            'sigma_per_accuracy': round(ACCURACY_TO_SIGMA, 6),
+            'min_sigma_m': MIN_SIGMA_M,
+            'unknown_accuracy_m': UNKNOWN_ACCURACY_M,
+        }
+    elif lecture.latitude is not None and lecture.longitude is not None:
+        descriptor = {
+            'type': 'circular',
+            'origin': [round(lecture.latitude, 8), round(lecture.longitude, 8)],
+            'scale': [METERS_PER_DEGREE_LAT,
+                      round(METERS_PER_DEGREE_LAT * math.cos(math.radians(lecture.latitude)), 4)],
+            'radius_m': lecture.geofence_radius or 50,
+        }
+    else:
+        return None
+
+    descriptor['accuracy_threshold_m'] = threshold
+    payload = json.dumps(descriptor, sort_keys=True).encode()
+    descriptor.update(v=DESCRIPTOR_VERSION, lecture_id=lecture.id,
+                      rev=hashlib.sha1(payload).hexdigest()[:12])
+    return descriptor
+
+
+def evaluate_fixes(lecture, latitudes, longitudes, accuracies):
+    """
+    Boundary status of many fixes for one lecture in one pass
+
+    Rectangular boundaries use inside_probabilities; circular geofences
+    compare the distance from the centre with the radius and require the
+    lecture's GPS accuracy threshold. Requires numpy.
+
+    Returns:
+        List of dicts, one per fix, with inside (reported position inside),
+        can_checkin, and inside_probability plus distance_to_edge
+        (rectangular) or distance (circular)
+    """
+    import numpy as np
+
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    accuracies = np.asarray(accuracies, dtype=np.float64)
+    if not len(latitudes):
+        return []
+
+    boundary = lecture.get_boundary() if lecture.geofence_type == 'rectangular' else None
+    if boundary is not None:
+        frame = BoundaryFrame(boundary, lecture.boundary_tolerance_m or 2.0)
+        threshold = lecture.acceptance_probability or DEFAULT_ACCEPTANCE_PROBABILITY
+        probabilities = inside_probabilities(frame, latitudes, longitudes, accuracies)
+
+        # Unsigned distance to the nearest edge, as in inside_probability
+        x, y = frame.project(latitudes, longitudes)
+        margins = np.stack([x - frame.west, frame.east - x, y - frame.south, frame.north - y])
+        nearest = margins.min(axis=0)
+        outside = np.hypot(np.maximum(np.maximum(-margins[0], -margins[1]), 0),
+                           np.maximum(np.maximum(-margins[2], -margins[3]), 0))
+        distances = np.where(nearest >= 0, nearest, outside)
+        accepted = (probabilities >= threshold) | ((nearest >= 0) & (np.hypot(x, y) <= CENTRE_FALLBACK_M))
+
+        return [{'inside': bool(m >= 0), 'can_checkin': bool(a),
+                 'inside_probability': round(float(p), 3), 'distance_to_edge': round(float(d), 1)}
+                for p, m, d, a in zip(probabilities, nearest, distances, accepted)]
+
+    from utils.geolocation import calculate_distance
+
+    radius = lecture.geofence_radius or 50
+    gps_threshold = lecture.gps_accuracy_threshold or 20
+    statuses = []
+    for lat, lon, accuracy in zip(latitudes, longitudes, accuracies):
+        distance = calculate_distance(lat, lon, lecture.latitude, lecture.longitude)
+        inside = distance <= radius
+        statuses.append({'inside': inside,
+                         'can_checkin': inside and bool(accuracy <= gps_threshold),  # NaN fails
+                         'distance': round(distance, 1)})
+    return statuses
@@ -0,0 +1,194 @@
+"""
+Bulk attendance mutations
+Set-based saves for teacher roster marking and the bulk-update API: the
+target rows are loaded with one IN query, ownership is checked once per
+lecture, existing rows are updated with a single executemany and missing
+rows are inserted in bulk. The lecture counter cache is then rebuilt for the
+touched lectures in one statement, since bulk statements skip ORM events.
+"""
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import select, update, insert
+from extensions import db
+from models.attendance import Attendance
+from models.lecture import Lecture
+from models.enrollment import Enrollment
+from utils.student_dashboard import invalidate_student_dashboard_on_commit
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+VALID_STATUSES = ('present', 'absent', 'late', 'excused')
+
+
+def _as_id(value):
+    """Integer primary key from JSON input (int or digit string), None when malformed"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def save_lecture_attendance(lecture, updates, marked_at=None):
+    """
+    Upsert attendance for one lecture's roster
+
+    Args:
+        lecture: Lecture the updates belong to (ownership already checked)
+        updates: Iterable of dicts with student_id, status and optional notes
+        marked_at: Timestamp stored on every saved row (defaults to now)
+
+    Returns:
+        Dictionary with updated, inserted and errors
+
+    The caller commits the session.
+    """
+    marked_at = marked_at or datetime.now(IST)
+    errors = []
+
+    # Last update per student wins, as with sequential saves
+    changes = {}
+    for item in updates:
+        if not isinstance(item, dict):
+            errors.append(f'Invalid update: {item!r}')
+            continue
+
+        student_id = item.get('student_id')
+        status = item.get('status')
+
+        if _as_id(student_id) is None or status not in VALID_STATUSES:
+            errors.append(f'Invalid update for student {student_id}')
+            continue
+
+        changes[_as_id(student_id)] = (status, item.get('notes', ''))
+
+    if not changes:
+        return {'updated': 0, 'inserted': 0, 'errors': errors}
+
+    # Only students actively enrolled in the course can be marked
+    enrolled = set(db.session.execute(
+        select(Enrollment.student_id).where(
+            Enrollment.course_id == lecture.course_id,
+            Enrollment.is_active == True,
+            Enrollment.student_id.in_(changes.keys())
+        )
+    ).scalars())
+
+    for student_id in list(changes):
+        if student_id not in enrolled:
+            errors.append(f'Student {student_id} is not enrolled in this course')
+            del changes[student_id]
+
+    existing = dict(db.session.execute(
+        select(Attendance.student_id, Attendance.id).where(
+            Attendance.lecture_id == lecture.id,
+            Attendance.student_id.in_(changes.keys())
+        )
+    ).all())
+
+    update_rows = []
+    insert_rows = []
+    for student_id, (status, notes) in changes.items():
+        values = {'status': status, 'notes': notes, 'marked_at': marked_at, 'updated_at': marked_at}
+        if student_id in existing:
+            update_rows.append({'id': existing[student_id], **values})
+        else:
+            insert_rows.append({'student_id': student_id, 'lecture_id': lecture.id,
+                                'created_at': marked_at, **values})
+
+    _apply(update_rows, insert_rows, {lecture.id}, set(changes))
+
+    return {'updated': len(update_rows), 'inserted': len(insert_rows), 'errors': errors}
+
+
+def bulk_update_attendance(updates, user):
+    """
+    Update existing attendance rows by ID, across any number of lectures
+
+    Args:
+        updates: Iterable of dicts with attendance_id, status and optional notes
+        user: Acting user; teachers may only change their own lectures
+
+    Returns:
+        Dictionary with updated and errors
+
+    The caller commits the session.
+    """
+    errors = []
+    requested = {}
+    for item in updates:
+        if not isinstance(item, dict):
+            errors.append(f'Invalid update: {item!r}')
+            continue
+
+        attendance_id = item.get('attendance_id')
+        if attendance_id is None:
+            errors.append('Missing attendance_id')
+            continue
+        if _as_id(attendance_id) is None:
+            errors.append(f'Invalid attendance_id {attendance_id!r}')
+            continue
+        requested[_as_id(attendance_id)] = item
+
+    if not requested:
+        return {'updated': 0, 'errors': errors}
+
+    rows = db.session.execute(
+        select(Attendance.id, Attendance.lecture_id, Attendance.student_id, Lecture.teacher_id)
+        .join(Lecture, Attendance.lecture_id == Lecture.id)
+        .where(Attendance.id.in_(requested.keys()))
+    ).all()
+    found = {row.id: row for row in rows}
+
+    # Ownership is a property of the lecture, so decide it once per lecture
+    allowed_lectures = {
+        row.lecture_id for row in rows
+        if not user.is_teacher() or row.teacher_id == user.id
+    }
+
+    now = datetime.now(IST)
+    update_rows = []
+    lecture_ids = set()
+    student_ids = set()
+
+    for attendance_id, item in requested.items():
+        row = found.get(attendance_id)
+        if row is None:
+            errors.append(f'Attendance {attendance_id} not found')
+            continue
+
+        if row.lecture_id not in allowed_lectures:
+            errors.append(f'Access denied for attendance {attendance_id}')
+            continue
+
+        if item.get('status') not in VALID_STATUSES:
+            continue
+
+        update_rows.append({
+            'id': attendance_id,
+            'status': item['status'],
+            'notes': item.get('notes'),
+            'updated_at': now
+        })
+        lecture_ids.add(row.lecture_id)
+        student_ids.add(row.student_id)
+
+    _apply(update_rows, [], lecture_ids, student_ids)
+
+    return {'updated': len(update_rows), 'errors': errors}
+
+
+def _apply(update_rows, insert_rows, lecture_ids, student_ids):
+    """Run the batched statements and refresh what the ORM events would have"""
+    if update_rows:
+        # ORM bulk UPDATE by primary key: one executemany
+        db.session.execute(update(Attendance), update_rows)
+
+    if insert_rows:
+        db.session.execute(insert(Attendance), insert_rows)
+
+    if update_rows or insert_rows:
+        Lecture.repair_attendance_counters(lecture_ids)
+        invalidate_student_dashboard_on_commit(db.session, student_ids)
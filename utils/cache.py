@@ -0,0 +1,79 @@
+"""
+In-process caching helpers
+Small thread-safe TTL cache used for per-user view data that is expensive to
+build and tolerates a few seconds of staleness
+"""
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe key/value cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, ttl_seconds=30, max_entries=10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            return value
+
+    def set(self, key, value, ttl_seconds=None):
+        """Store value under key for ttl_seconds (defaults to the cache TTL)"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                self._evict_expired()
+                if len(self._entries) >= self.max_entries:
+                    # Still full: drop the entry closest to expiry
+                    oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                    del self._entries[oldest]
+
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def get_or_set(self, key, factory, ttl_seconds=None):
+        """Return the cached value for key, building it with factory() on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value, ttl_seconds)
+        return value
+
+    def invalidate(self, key):
+        """Drop a single key"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_many(self, keys):
+        """Drop several keys at once"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
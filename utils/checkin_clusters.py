@@ -0,0 +1,213 @@
+"""
+Offline check-in clustering
+Looks for proxy attendance across the whole attendances table: groups of
+check-ins in one lecture that share almost identical coordinates and
+reported accuracy (grid-bucketed density clusters), and check-ins from one
+spot arriving in a tight burst. Only precise fixes are considered (see
+utils.checkin_collisions.is_precise_fix): Wi-Fi and cell positioning give
+every phone in a room the same coordinates and accuracy, so imprecise fixes
+would make honest neighbours look like one device. Each lecture's check-ins
+are loaded into NumPy arrays and analysed independently, so lectures are
+spread over a process pool. Requires numpy.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from datetime import timezone, timedelta
+from sqlalchemy import select
+from extensions import db
+from models.attendance import Attendance
+from utils.checkin_collisions import flag_collisions, PROXIMITY_MAX_ACCURACY_M
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+CLUSTER_CELL_DEGREES = 1e-5  # ~1.1 m grid for "same coordinates"
+CLUSTER_ACCURACY_BUCKET_M = 1.0  # accuracies within the same metre match
+MIN_CLUSTER_SIZE = 3  # check-ins sharing a cell and accuracy bucket
+
+BURST_CELL_DEGREES = 2e-6  # ~0.2 m grid: one device, not students sitting together
+BURST_WINDOW_SECONDS = 3  # arrivals this close together form a burst
+MIN_BURST_SIZE = 4  # check-ins from one spot within the window
+
+LOAD_BATCH_LECTURES = 500  # lectures loaded per query
+TASKS_PER_WORKER = 16  # lectures in flight per worker process
+
+
+def _epoch(value):
+    """Seconds since the epoch; naive datetimes are stored in IST"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=IST)
+    return value.timestamp()
+
+
+def _grid_groups(np, lat, lon, cell, *extra):
+    """
+    Yield (group index of every check-in, group sizes) for a grid and for
+    the three copies shifted by half a cell along latitude, longitude and
+    both. Points less than half a cell apart on each axis share a group in
+    at least one of the four, even across a cell edge or corner
+    """
+    for lat_shift, lon_shift in ((0.0, 0.0), (0.5, 0.0), (0.0, 0.5), (0.5, 0.5)):
+        keys = np.column_stack([np.floor(lat / cell + lat_shift), np.floor(lon / cell + lon_shift), *extra])
+        _, groups, counts = np.unique(keys.astype(np.int64), axis=0, return_inverse=True, return_counts=True)
+        yield groups.reshape(-1), counts
+
+
+def analyze_lecture_checkins(lecture_id, ids, lat, lon, accuracy, epochs):
+    """
+    Find density clusters and arrival bursts among one lecture's check-ins
+
+    Pure NumPy over the given arrays, so it can run in a worker process.
+    Check-ins without a precise fix (missing accuracy included) are ignored.
+
+    Returns:
+        List of dicts with lecture_id, kind ('cluster' or 'burst'),
+        size and attendance_ids
+    """
+    import numpy as np
+
+    accuracy = np.asarray(accuracy, dtype=np.float64)
+    precise = np.isfinite(accuracy) & (accuracy >= 0) & (accuracy <= PROXIMITY_MAX_ACCURACY_M)
+
+    ids = np.asarray(ids, dtype=np.int64)[precise]
+    lat = np.asarray(lat, dtype=np.float64)[precise]
+    lon = np.asarray(lon, dtype=np.float64)[precise]
+    epochs = np.asarray(epochs, dtype=np.float64)[precise]
+    accuracy = accuracy[precise]
+
+    findings = []
+    seen = set()
+
+    def add(kind, members):
+        key = (kind, tuple(sorted(members)))
+        if key not in seen:
+            seen.add(key)
+            findings.append({'lecture_id': lecture_id, 'kind': kind,
+                             'size': len(members), 'attendance_ids': sorted(members)})
+
+    # Density: same ~1 m cell and same reported accuracy
+    if len(ids) >= MIN_CLUSTER_SIZE:
+        accuracy_bucket = np.floor(accuracy / CLUSTER_ACCURACY_BUCKET_M)
+        for groups, counts in _grid_groups(np, lat, lon, CLUSTER_CELL_DEGREES, accuracy_bucket):
+            for group in np.flatnonzero(counts >= MIN_CLUSTER_SIZE):
+                add('cluster', ids[groups == group].tolist())
+
+    # Bursts: MIN_BURST_SIZE arrivals from one ~0.2 m cell within the window
+    if len(ids) >= MIN_BURST_SIZE:
+        for groups, counts in _grid_groups(np, lat, lon, BURST_CELL_DEGREES):
+            for group in np.flatnonzero(counts >= MIN_BURST_SIZE):
+                members = np.flatnonzero(groups == group)
+                members = members[np.argsort(epochs[members], kind='stable')]
+                times = epochs[members]
+
+                # Windows starting at each arrival that hold at least MIN_BURST_SIZE arrivals
+                ends = np.searchsorted(times, times + BURST_WINDOW_SECONDS, side='right')
+                starts = np.flatnonzero(ends - np.arange(len(times)) >= MIN_BURST_SIZE)
+                if not len(starts):
+                    continue
+
+                in_burst = np.zeros(len(times), dtype=bool)
+                for start in starts:
+                    in_burst[start:ends[start]] = True
+                add('burst', ids[members[in_burst]].tolist())
+
+    return findings
+
+
+def _analyze(args):
+    return analyze_lecture_checkins(*args)
+
+
+def _lecture_arrays(lecture_ids=None, since=None):
+    """
+    Yield (lecture_id, ids, lat, lon, accuracy, epochs) per lecture, loading
+    LOAD_BATCH_LECTURES lectures per ordered query. Only check-ins with a
+    precise fix and a marked_at time are loaded
+    """
+    usable = (Attendance.student_latitude != None,
+              Attendance.student_longitude != None,
+              Attendance.marked_at != None,
+              Attendance.gps_accuracy_at_checkin >= 0,
+              Attendance.gps_accuracy_at_checkin <= PROXIMITY_MAX_ACCURACY_M)
+
+    lectures = select(Attendance.lecture_id).where(*usable).distinct()
+    if lecture_ids is not None:
+        lectures = lectures.where(Attendance.lecture_id.in_(list(lecture_ids)))
+    if since is not None:
+        lectures = lectures.where(Attendance.marked_at >= since)
+    lectures = db.session.execute(lectures.order_by(Attendance.lecture_id)).scalars().all()
+
+    for offset in range(0, len(lectures), LOAD_BATCH_LECTURES):
+        batch = lectures[offset:offset + LOAD_BATCH_LECTURES]
+        rows = db.session.execute(
+            select(Attendance.lecture_id, Attendance.id, Attendance.student_latitude,
+                   Attendance.student_longitude, Attendance.gps_accuracy_at_checkin,
+                   Attendance.marked_at)
+            .where(Attendance.lecture_id.in_(batch), *usable)
+            .order_by(Attendance.lecture_id, Attendance.id)
+        ).all()
+
+        current, columns = None, None
+        for lecture_id, attendance_id, lat, lon, accuracy, marked_at in rows:
+            if lecture_id != current:
+                if columns:
+                    yield (current, *columns)
+                current, columns = lecture_id, ([], [], [], [], [])
+            columns[0].append(attendance_id)
+            columns[1].append(lat)
+            columns[2].append(lon)
+            columns[3].append(accuracy)
+            columns[4].append(_epoch(marked_at))
+        if columns:
+            yield (current, *columns)
+
+
+def scan_checkin_clusters(lecture_ids=None, since=None, workers=None):
+    """
+    Cluster and burst scan over the attendances table
+
+    Args:
+        lecture_ids: Optional lectures to limit the scan to
+        since: Optional lower bound on marked_at for picking lectures
+        workers: Worker processes; defaults to the CPU count, and 1 or fewer
+                 runs in this process
+
+    Returns:
+        List of findings from analyze_lecture_checkins, ordered by lecture
+    """
+    tasks = (args for args in _lecture_arrays(lecture_ids, since)
+             if len(args[1]) >= min(MIN_CLUSTER_SIZE, MIN_BURST_SIZE))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    findings = []
+    if workers <= 1:
+        for args in tasks:
+            findings.extend(_analyze(args))
+        return findings
+
+    # pool.map drains its input up front, so hand it a bounded batch at a
+    # time to keep only a few lectures' arrays in memory
+    batch_size = workers * TASKS_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = list(islice(tasks, batch_size))
+            if not batch:
+                break
+            for lecture_findings in pool.map(_analyze, batch, chunksize=TASKS_PER_WORKER // 4):
+                findings.extend(lecture_findings)
+    return findings
+
+
+def flag_cluster_findings(findings):
+    """
+    Mark every attendance in the findings as flagged (one UPDATE)
+
+    Returns:
+        Number of attendance rows changed
+
+    The caller commits the session.
+    """
+    return flag_collisions(i for finding in findings for i in finding['attendance_ids'])
@@ -0,0 +1,182 @@
+"""
+Proxy check-in detection
+Each check-in is stamped with two indexed keys: the location fingerprint
+from utils.geolocation (coordinates, accuracy, device and minute) and a
+proximity key (a ~1 m grid cell plus the user agent). Different students of
+one lecture sharing either key almost certainly checked in from the same
+device. Proximity keys are only used for precise fixes: Wi-Fi and cell
+positioning report the same coordinates for every phone in a room, so
+neighbours with an imprecise fix would otherwise look like one device.
+Check-ins are tested as they arrive with one indexed lookup, and historical
+data is scanned with GROUP BY on the keys rather than comparing pairs of
+check-ins.
+"""
+import hashlib
+import math
+from sqlalchemy import select, update, func, or_
+from extensions import db
+from models.attendance import Attendance
+from utils.geolocation import create_location_fingerprint
+from utils.location_sample import LocationSample
+
+PROXIMITY_CELL_DEGREES = 1e-5  # ~1.1 m of latitude
+MIN_STUDENTS_PER_KEY = 2  # distinct students sharing a key that count as a collision
+PROXIMITY_MAX_ACCURACY_M = 5.0  # proximity keys only for fixes at least this precise
+
+
+def is_precise_fix(accuracy):
+    """True when a reported accuracy is small enough to trust a ~1 m cell"""
+    return accuracy is not None and math.isfinite(accuracy) and 0 <= accuracy <= PROXIMITY_MAX_ACCURACY_M
+
+
+def proximity_cell(latitude, longitude):
+    """Grid cell (row, column) of a coordinate"""
+    return (math.floor(latitude / PROXIMITY_CELL_DEGREES),
+            math.floor(longitude / PROXIMITY_CELL_DEGREES))
+
+
+def proximity_key(cell, user_agent):
+    """Key for a grid cell and device user agent"""
+    payload = f"{cell[0]}:{cell[1]}|{user_agent or ''}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def neighbour_proximity_keys(latitude, longitude, user_agent):
+    """Keys of the cell and its eight neighbours, so near-identical points on
+    either side of a cell edge still meet"""
+    row, column = proximity_cell(latitude, longitude)
+    return [proximity_key((row + dr, column + dc), user_agent)
+            for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+
+
+def stamp_checkin_keys(attendance, latitude, longitude, sample, user_agent):
+    """
+    Set user_agent, location_fingerprint and proximity_key on a new attendance
+
+    sample is the request's LocationSample (a metadata dict is parsed into
+    one); user_agent is the request header, used when the metadata has none.
+    proximity_key is left empty unless gps_accuracy_at_checkin (set it
+    first) is a precise fix.
+    """
+    sample = LocationSample.parse(sample)
+    attendance.user_agent = sample.metadata.get('userAgent', user_agent or '')
+
+    attendance.location_fingerprint = create_location_fingerprint(
+        dict(sample.metadata, userAgent=attendance.user_agent), (latitude, longitude))
+    if is_precise_fix(attendance.gps_accuracy_at_checkin):
+        attendance.proximity_key = proximity_key(proximity_cell(latitude, longitude),
+                                                 attendance.user_agent)
+    else:
+        attendance.proximity_key = None
+
+
+def detect_checkin_collision(attendance, latitude, longitude):
+    """
+    Find other students of the same lecture who checked in from this device
+
+    One query on the (lecture_id, location_fingerprint) and
+    (lecture_id, proximity_key) indexes. Call it after stamp_checkin_keys
+    and before the attendance is flushed.
+
+    Returns:
+        Dictionary with collision (bool), student_ids and attendance_ids of
+        the matching check-ins
+    """
+    key_match = []
+    if attendance.location_fingerprint:
+        key_match.append(Attendance.location_fingerprint == attendance.location_fingerprint)
+
+    if attendance.proximity_key:
+        # Rows stamped before the accuracy limit existed are filtered here too
+        key_match.append(Attendance.proximity_key.in_(
+            neighbour_proximity_keys(latitude, longitude, attendance.user_agent)
+        ) & (Attendance.gps_accuracy_at_checkin <= PROXIMITY_MAX_ACCURACY_M))
+
+    if not key_match:
+        return {'collision': False, 'student_ids': [], 'attendance_ids': []}
+
+    rows = db.session.execute(
+        select(Attendance.id, Attendance.student_id).where(
+            Attendance.lecture_id == attendance.lecture_id,
+            Attendance.student_id != attendance.student_id,
+            or_(*key_match)
+        )
+    ).all()
+
+    student_ids = sorted({row.student_id for row in rows})
+    return {
+        'collision': bool(student_ids) and len(student_ids) + 1 >= MIN_STUDENTS_PER_KEY,
+        'student_ids': student_ids,
+        'attendance_ids': [row.id for row in rows]
+    }
+
+
+def scan_checkin_collisions(lecture_ids=None):
+    """
+    Historical scan: groups of check-ins sharing a key within a lecture
+
+    Runs one GROUP BY per key, so the cost grows with the number of
+    check-ins rather than with the number of pairs.
+
+    Returns:
+        List of dicts with lecture_id, key_type ('fingerprint' or
+        'proximity'), key, student_count and attendance_ids
+    """
+    collisions = []
+
+    for key_type, column in (('fingerprint', Attendance.location_fingerprint),
+                             ('proximity', Attendance.proximity_key)):
+        usable = column != None
+        if key_type == 'proximity':
+            usable = usable & (Attendance.gps_accuracy_at_checkin <= PROXIMITY_MAX_ACCURACY_M)
+
+        groups = select(Attendance.lecture_id, column.label('key'))\
+            .where(usable)\
+            .group_by(Attendance.lecture_id, column)\
+            .having(func.count(func.distinct(Attendance.student_id)) >= MIN_STUDENTS_PER_KEY)
+        if lecture_ids is not None:
+            groups = groups.where(Attendance.lecture_id.in_(list(lecture_ids)))
+        groups = groups.subquery()
+
+        rows = db.session.execute(
+            select(groups.c.lecture_id, groups.c.key, Attendance.id, Attendance.student_id)
+            .join(Attendance, (Attendance.lecture_id == groups.c.lecture_id) & (column == groups.c.key))
+            .where(usable)
+            .order_by(groups.c.lecture_id, groups.c.key)
+        ).all()
+
+        current = None
+        for lecture_id, key, attendance_id, student_id in rows:
+            if current is None or (current['lecture_id'], current['key']) != (lecture_id, key):
+                current = {'lecture_id': lecture_id, 'key_type': key_type, 'key': key,
+                           'student_ids': set(), 'attendance_ids': []}
+                collisions.append(current)
+            current['student_ids'].add(student_id)
+            current['attendance_ids'].append(attendance_id)
+
+    for collision in collisions:
+        collision['student_count'] = len(collision.pop('student_ids'))
+
+    return collisions
+
+
+def flag_collisions(attendance_ids):
+    """
+    Mark attendance rows as flagged in one UPDATE
+
+    Returns:
+        Number of rows changed
+
+    The caller commits the session.
+    """
+    attendance_ids = set(attendance_ids)
+    if not attendance_ids:
+        return 0
+
+    result = db.session.execute(
+        update(Attendance)
+        .where(Attendance.id.in_(attendance_ids), Attendance.verification_status != 'flagged')
+        .values(verification_status='flagged')
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,158 @@
+"""
+Columnar attendance export
+Reads the attendance projection in chunks straight into Arrow record batches
+and writes Parquet or Feather files for the analytics team. Low-cardinality
+text columns (course, lecture, status) are dictionary-encoded, which keeps the
+files small and loads them into pandas as categoricals.
+
+Requires the optional pyarrow package.
+"""
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+except ImportError:
+    pa = pq = feather = None
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# Text columns written as Arrow dictionaries (few distinct values, many rows)
+DICTIONARY_COLUMNS = ('course_code', 'course_name', 'lecture_title', 'status')
+
+
+def _export_columns():
+    """Projected columns, labelled with their field names in schema order"""
+    from models.attendance import Attendance
+    from models.lecture import Lecture
+    from models.course import Course
+    from models.user import User
+
+    return [
+        Attendance.id.label('attendance_id'),
+        Attendance.student_id.label('student_id'),
+        User.student_id.label('student_number'),
+        (User.first_name + ' ' + User.last_name).label('student_name'),
+        Course.code.label('course_code'),
+        Course.name.label('course_name'),
+        Lecture.id.label('lecture_id'),
+        Lecture.title.label('lecture_title'),
+        Lecture.scheduled_start.label('scheduled_start'),
+        Attendance.status.label('status'),
+        Attendance.marked_at.label('marked_at'),
+        Attendance.distance_from_lecture.label('distance_m'),
+        Attendance.auto_marked.label('auto_marked'),
+    ]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError('pyarrow is required for columnar exports (pip install pyarrow)')
+
+
+def attendance_schema():
+    """Arrow schema of the exported attendance table"""
+    _require_pyarrow()
+
+    dictionary_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('attendance_id', pa.int64()),
+        ('student_id', pa.int64()),
+        ('student_number', pa.string()),
+        ('student_name', pa.string()),
+        ('course_code', dictionary_string),
+        ('course_name', dictionary_string),
+        ('lecture_id', pa.int64()),
+        ('lecture_title', dictionary_string),
+        ('scheduled_start', pa.timestamp('us')),
+        ('status', dictionary_string),
+        ('marked_at', pa.timestamp('us')),
+        ('distance_m', pa.float64()),
+        ('auto_marked', pa.bool_()),
+    ])
+
+
+def iter_attendance_record_batches(chunk_size=DEFAULT_CHUNK_SIZE, **filters):
+    """
+    Stream the attendance export as Arrow record batches
+
+    Args:
+        chunk_size: Rows fetched from the cursor per batch
+        **filters: course_id, student_id, teacher_id, start_date, end_date
+
+    Yields:
+        pyarrow.RecordBatch objects matching attendance_schema()
+    """
+    _require_pyarrow()
+
+    from extensions import db
+    from utils.report_queries import attendance_export_select
+
+    schema = attendance_schema()
+    stmt = attendance_export_select(_export_columns(), **filters)
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+
+    for partition in result.partitions():
+        columns = zip(*partition)
+        arrays = []
+
+        for field, values in zip(schema, columns):
+            if field.name in DICTIONARY_COLUMNS:
+                arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(values, type=field.type))
+
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_attendance_parquet(destination, chunk_size=DEFAULT_CHUNK_SIZE, compression='snappy', **filters):
+    """
+    Write the attendance export to a Parquet file, one row group per chunk
+
+    Args:
+        destination: File path or writable binary file object
+        chunk_size: Rows per record batch / row group
+        compression: Parquet compression codec
+        **filters: course_id, student_id, teacher_id, start_date, end_date
+
+    Returns:
+        Number of rows written
+    """
+    _require_pyarrow()
+
+    schema = attendance_schema()
+    rows = 0
+
+    with pq.ParquetWriter(destination, schema, compression=compression,
+                          use_dictionary=list(DICTIONARY_COLUMNS)) as writer:
+        for batch in iter_attendance_record_batches(chunk_size=chunk_size, **filters):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+
+    return rows
+
+
+def export_attendance_feather(destination, chunk_size=DEFAULT_CHUNK_SIZE, compression='zstd', **filters):
+    """
+    Write the attendance export to a Feather (Arrow IPC) file
+
+    The IPC file format needs one dictionary per column, so the batches are
+    assembled into a table and their dictionaries unified before writing.
+
+    Returns:
+        Number of rows written
+    """
+    _require_pyarrow()
+
+    batches = list(iter_attendance_record_batches(chunk_size=chunk_size, **filters))
+    table = pa.Table.from_batches(batches, schema=attendance_schema()).unify_dictionaries()
+    feather.write_feather(table, destination, compression=compression)
+
+    return table.num_rows
+
+
+def attendance_table(chunk_size=DEFAULT_CHUNK_SIZE, **filters):
+    """Load the attendance export into an in-memory pyarrow.Table"""
+    _require_pyarrow()
+
+    batches = iter_attendance_record_batches(chunk_size=chunk_size, **filters)
+    return pa.Table.from_batches(batches, schema=attendance_schema())
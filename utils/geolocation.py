@@ -1,6 +1,13 @@
 import math
 import json
-from datetime import datetime, timedelta
+from utils.location_sample import (
+    LocationSample,
+    SPOOFING_PIPELINE,
+    VALIDATION_PIPELINE,
+    ACCURACY_PIPELINE,
+    STUDENT_SECURITY_PIPELINE,
+    LECTURE_SECURITY_PIPELINE
+)
 
 def calculate_distance(lat1, lon1, lat2, lon2):
     """
@@ -166,9 +173,20 @@ def validate_coordinates(lat, lon):
     except (ValueError, TypeError):
         return False, "Invalid coordinate format"
 
+# (upper accuracy bound in metres, reliability, status), best first
+RELIABILITY_BANDS = (
+    (5, "excellent", "high_precision"),
+    (10, "very_good", "good_precision"),
+    (20, "good", "acceptable_precision"),
+    (50, "fair", "low_precision"),
+    (float('inf'), "poor", "very_low_precision"),
+)
+
 def analyze_location_accuracy(metadata_json):
     """
     Analyze location metadata for accuracy and reliability
+
+    Accepts a metadata dict, JSON string or an already parsed LocationSample.
     
     Returns:
         dict: Analysis results
@@ -177,49 +195,25 @@ def analyze_location_accuracy(metadata_json):
         if not metadata_json:
             return {"status": "no_metadata", "reliability": "unknown"}
             
-        metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
+        sample = LocationSample.parse(metadata_json)
         
-        accuracy = metadata.get('accuracy', 999)
-        altitude = metadata.get('altitude')
-        speed = metadata.get('speed', 0)
-        timestamp = metadata.get('timestamp')
+        accuracy = sample.accuracy if sample.accuracy is not None else 999
         
         analysis = {
             "accuracy_meters": accuracy,
-            "has_altitude": altitude is not None,
-            "speed_kmh": speed * 3.6 if speed else 0,
-            "timestamp": timestamp
+            "has_altitude": sample.altitude is not None,
+            "speed_kmh": (sample.speed or 0) * 3.6,
+            "timestamp": sample.metadata.get('timestamp')
         }
         
         # Determine reliability
-        if accuracy <= 5:
-            analysis["reliability"] = "excellent"
-            analysis["status"] = "high_precision"
-        elif accuracy <= 10:
-            analysis["reliability"] = "very_good"
-            analysis["status"] = "good_precision"
-        elif accuracy <= 20:
-            analysis["reliability"] = "good"
-            analysis["status"] = "acceptable_precision"
-        elif accuracy <= 50:
-            analysis["reliability"] = "fair"
-            analysis["status"] = "low_precision"
-        else:
-            analysis["reliability"] = "poor"
-            analysis["status"] = "very_low_precision"
+        analysis["reliability"], analysis["status"] = next(
+            (reliability, status) for bound, reliability, status in RELIABILITY_BANDS if accuracy <= bound)
             
         # Check for potential issues
-        if speed and speed > 5:  # Moving faster than 5 m/s (18 km/h)
-            analysis["warning"] = "high_speed_detected"
-            
-        if timestamp:
-            try:
-                ts = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                age_seconds = (datetime.now().timestamp() - ts.timestamp())
-                if age_seconds > 300:  # Older than 5 minutes
-                    analysis["warning"] = "stale_location_data"
-            except:
-                pass
+        warnings = ACCURACY_PIPELINE.run(sample)['issues']
+        if warnings:
+            analysis["warning"] = warnings[-1]
                 
         return analysis
         
@@ -235,44 +229,21 @@ def get_location_security_score(student_metadata, lecture_metadata):
         dict: Security analysis
     """
     try:
-        student_analysis = analyze_location_accuracy(student_metadata)
-        lecture_analysis = analyze_location_accuracy(lecture_metadata)
+        student_sample = LocationSample.parse(student_metadata or {})
+        lecture_sample = LocationSample.parse(lecture_metadata or {})
         
-        score = 100  # Start with perfect score
-        issues = []
+        student = STUDENT_SECURITY_PIPELINE.run(student_sample)
+        lecture = LECTURE_SECURITY_PIPELINE.run(lecture_sample)
         
-        # Accuracy comparison
-        student_acc = student_analysis.get('accuracy_meters', 999)
-        lecture_acc = lecture_analysis.get('accuracy_meters', 999)
-        
-        if student_acc > 50:
-            score -= 30
-            issues.append("poor_student_accuracy")
-            
-        if lecture_acc > 20:
-            score -= 20
-            issues.append("poor_lecture_accuracy")
-            
-        # Speed check
-        if student_analysis.get('speed_kmh', 0) > 10:
-            score -= 25
-            issues.append("student_moving_fast")
-            
-        # Timestamp freshness
-        if 'warning' in student_analysis:
-            if student_analysis['warning'] == 'stale_location_data':
-                score -= 15
-                issues.append("stale_location")
-            elif student_analysis['warning'] == 'high_speed_detected':
-                score -= 20
-                issues.append("high_speed")
+        score = student['score'] - lecture['penalty']
+        issues = student['issues'] + lecture['issues']
                 
         return {
             "score": max(0, score),
             "level": "high" if score >= 80 else "medium" if score >= 60 else "low",
             "issues": issues,
-            "student_analysis": student_analysis,
-            "lecture_analysis": lecture_analysis
+            "student_analysis": analyze_location_accuracy(student_sample if student_metadata else None),
+            "lecture_analysis": analyze_location_accuracy(lecture_sample if lecture_metadata else None)
         }
         
     except Exception as e:
@@ -286,6 +257,8 @@ def get_location_security_score(student_metadata, lecture_metadata):
 def detect_location_spoofing(metadata_json, coordinates):
     """
     Detect potential location spoofing attempts
+
+    The checks are the rules of utils.location_sample.SPOOFING_PIPELINE.
     
     Returns:
         dict: Spoofing analysis
@@ -294,42 +267,10 @@ def detect_location_spoofing(metadata_json, coordinates):
         if not metadata_json:
             return {"risk": "unknown", "reasons": ["no_metadata"]}
         
-        metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
         lat, lon = coordinates
-        
-        risk_factors = []
-        risk_score = 0
-        
-        # Check for perfect coordinates (suspicious)
-        if lat == int(lat) and lon == int(lon):
-            risk_factors.append("perfect_integer_coordinates")
-            risk_score += 30
-        
-        # Check for excessive precision
-        lat_str = str(lat)
-        lon_str = str(lon)
-        if '.' in lat_str and len(lat_str.split('.')[1]) > 6:
-            risk_factors.append("excessive_precision")
-            risk_score += 20
-        
-        # Check for impossible accuracy
-        accuracy = metadata.get('accuracy', 999)
-        if accuracy < 1:
-            risk_factors.append("impossible_accuracy")
-            risk_score += 40
-        
-        # Check for missing expected fields
-        expected_fields = ['accuracy', 'timestamp', 'userAgent']
-        missing_fields = [f for f in expected_fields if f not in metadata]
-        if missing_fields:
-            risk_factors.append(f"missing_fields: {', '.join(missing_fields)}")
-            risk_score += len(missing_fields) * 10
-        
-        # Check for suspicious speed
-        speed = metadata.get('speed', 0)
-        if speed and speed > 50:  # > 180 km/h
-            risk_factors.append("impossible_speed")
-            risk_score += 35
+        sample = LocationSample.parse(metadata_json, lat, lon)
+        result = SPOOFING_PIPELINE.run(sample)
+        risk_score = result['penalty']
         
         # Determine risk level
         if risk_score >= 50:
@@ -344,8 +285,8 @@ def detect_location_spoofing(metadata_json, coordinates):
         return {
             "risk": risk_level,
             "score": risk_score,
-            "reasons": risk_factors,
-            "metadata_analysis": metadata
+            "reasons": result['issues'],
+            "metadata_analysis": dict(sample.metadata)
         }
         
     except Exception as e:
@@ -391,6 +332,8 @@ def create_location_fingerprint(metadata_json, coordinates):
 def validate_location_metadata(metadata_json):
     """
     Validate location metadata for completeness and consistency
+
+    The checks are the rules of utils.location_sample.VALIDATION_PIPELINE.
     
     Returns:
         dict: Validation results
@@ -399,53 +342,18 @@ def validate_location_metadata(metadata_json):
         if not metadata_json:
             return {"valid": False, "errors": ["no_metadata"]}
         
-        metadata = json.loads(metadata_json) if isinstance(metadata_json, str) else metadata_json
-        errors = []
-        warnings = []
-        
-        # Required fields
-        required_fields = ['latitude', 'longitude', 'accuracy', 'timestamp']
-        for field in required_fields:
-            if field not in metadata:
-                errors.append(f"missing_required_field: {field}")
-        
-        # Validate accuracy
-        accuracy = metadata.get('accuracy')
-        if accuracy is not None:
-            if accuracy < 0:
-                errors.append("negative_accuracy")
-            elif accuracy > 1000:
-                warnings.append("very_poor_accuracy")
-        
-        # Validate timestamp
-        timestamp = metadata.get('timestamp')
-        if timestamp:
-            try:
-                ts = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                age_seconds = abs((datetime.now() - ts.replace(tzinfo=None)).total_seconds())
-                if age_seconds > 3600:  # Older than 1 hour
-                    warnings.append("old_timestamp")
-            except:
-                errors.append("invalid_timestamp_format")
-        
-        # Validate coordinates
-        lat = metadata.get('latitude')
-        lon = metadata.get('longitude')
-        if lat is not None and lon is not None:
-            if not (-90 <= lat <= 90):
-                errors.append("invalid_latitude_range")
-            if not (-180 <= lon <= 180):
-                errors.append("invalid_longitude_range")
+        sample = LocationSample.parse(metadata_json)
+        result = VALIDATION_PIPELINE.run(sample)
         
         return {
-            "valid": len(errors) == 0,
-            "errors": errors,
-            "warnings": warnings,
-            "metadata": metadata
+            "valid": len(result['errors']) == 0,
+            "errors": result['errors'],
+            "warnings": result['issues'],
+            "metadata": dict(sample.metadata)
         }
         
     except Exception as e:
         return {
             "valid": False,
             "errors": [f"validation_error: {str(e)}"]
-        }
\ No newline at end of file
+        }
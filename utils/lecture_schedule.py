@@ -0,0 +1,203 @@
+"""
+Recurring lecture schedules
+Expands a weekly timetable over a semester date range and creates the whole
+series in one transaction. The rectangular boundary and the location hash are
+the same for every lecture in the series, so they are computed once and the
+rows are written with a single bulk INSERT.
+"""
+import hashlib
+import json
+from datetime import datetime, date, time, timedelta, timezone
+from sqlalchemy import select, insert
+from extensions import db
+from models.lecture import Lecture
+from utils.rectangular_geofence import RectangularBoundary
+from utils.admin_stats import invalidate_admin_stats_on_commit
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+WEEKDAYS = {'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6}
+MAX_RECURRING_LECTURES = 500  # per schedule, roughly a semester of daily sessions
+
+
+def parse_weekly_pattern(pattern):
+    """
+    Validate a weekly timetable
+
+    Args:
+        pattern: List of dicts with weekday ('mon'..'sun' or 0-6),
+                 start_time ('HH:MM') and duration (minutes)
+
+    Returns:
+        Sorted list of (weekday, start_time, duration_minutes) tuples
+
+    Raises:
+        ValueError: If any slot is malformed
+    """
+    if not pattern:
+        raise ValueError("Weekly pattern must contain at least one slot")
+
+    slots = set()
+    for slot in pattern:
+        weekday = slot.get('weekday')
+        if isinstance(weekday, str):
+            weekday = WEEKDAYS.get(weekday.strip().lower()[:3])
+        if weekday not in range(7):
+            raise ValueError(f"Invalid weekday: {slot.get('weekday')}")
+
+        try:
+            start_time = time.fromisoformat(str(slot.get('start_time')))
+            duration = int(slot.get('duration'))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid start_time or duration in slot: {slot}")
+
+        if duration <= 0:
+            raise ValueError("Duration must be positive")
+
+        slots.add((weekday, start_time, duration))
+
+    return sorted(slots)
+
+
+def expand_weekly_pattern(slots, start_date, end_date, skip_dates=()):
+    """
+    Occurrences of a weekly timetable between two dates (inclusive)
+
+    Args:
+        slots: Output of parse_weekly_pattern
+        start_date: First day of the range
+        end_date: Last day of the range
+        skip_dates: Dates without lectures (holidays, exam weeks)
+
+    Returns:
+        Chronological list of (scheduled_start, scheduled_end) naive datetimes
+    """
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+
+    skip_dates = set(skip_dates)
+    occurrences = []
+
+    for weekday, start_time, duration in slots:
+        # First matching weekday on or after start_date, then every 7 days
+        day = start_date + timedelta(days=(weekday - start_date.weekday()) % 7)
+        while day <= end_date:
+            if day not in skip_dates:
+                start = datetime.combine(day, start_time)
+                occurrences.append((start, start + timedelta(minutes=duration)))
+            day += timedelta(days=7)
+
+    occurrences.sort()
+    return occurrences
+
+
+def boundary_columns(latitude, longitude, width_m, height_m, gps_threshold=20, tolerance=2.0):
+    """
+    Lecture columns for a rectangular boundary, computed once per schedule
+
+    Mirrors Lecture.set_rectangular_boundary without touching the session.
+    """
+    boundary = RectangularBoundary.from_center_and_dimensions(latitude, longitude, width_m, height_m)
+    center = boundary.get_center()
+    now = datetime.now(IST)
+
+    return {
+        'geofence_type': 'rectangular',
+        'boundary_coordinates': json.dumps(boundary.to_dict()),
+        'boundary_area_sqm': boundary.calculate_area(),
+        'boundary_perimeter_m': boundary.calculate_perimeter(),
+        'boundary_center_lat': center[0],
+        'boundary_center_lon': center[1],
+        'latitude': center[0],
+        'longitude': center[1],
+        'gps_accuracy_threshold': gps_threshold,
+        'boundary_tolerance_m': tolerance,
+        'boundary_validation_method': 'point_in_polygon',
+        'boundary_created_at': now,
+        'boundary_last_modified': now,
+    }
+
+
+def create_recurring_lectures(course, teacher_id, title, pattern, start_date, end_date,
+                              latitude, longitude, boundary_width=30, boundary_height=30,
+                              skip_dates=(), **lecture_fields):
+    """
+    Create a semester of lectures from a weekly timetable
+
+    Args:
+        course: Course the lectures belong to
+        teacher_id: Teacher running the lectures
+        title: Base title; lectures are numbered "<title> - Session <n>"
+        pattern: Weekly timetable (see parse_weekly_pattern)
+        start_date: First day of the semester
+        end_date: Last day of the semester
+        latitude: Boundary center latitude
+        longitude: Boundary center longitude
+        boundary_width: Boundary width in meters (East-West)
+        boundary_height: Boundary height in meters (North-South)
+        skip_dates: Dates without lectures
+        **lecture_fields: Extra Lecture columns shared by every lecture
+            (description, location_name, gps_accuracy_threshold, ...)
+
+    Returns:
+        Dictionary with created and skipped (occurrences that already exist)
+
+    Raises:
+        ValueError: On invalid input or when the series is too long
+
+    The caller commits the session.
+    """
+    if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
+        raise ValueError("Coordinates out of valid range")
+
+    occurrences = expand_weekly_pattern(parse_weekly_pattern(pattern), start_date, end_date, skip_dates)
+    if len(occurrences) > MAX_RECURRING_LECTURES:
+        raise ValueError(f"Schedule produces {len(occurrences)} lectures "
+                         f"(maximum {MAX_RECURRING_LECTURES})")
+
+    # Re-submitting the same timetable must not duplicate lectures
+    existing = set(db.session.execute(
+        select(Lecture.scheduled_start).where(
+            Lecture.course_id == course.id,
+            Lecture.scheduled_start >= datetime.combine(start_date, time.min),
+            Lecture.scheduled_start <= datetime.combine(end_date, time.max)
+        )
+    ).scalars())
+    if all(start in existing for start, _ in occurrences):
+        return {'created': 0, 'skipped': len(occurrences)}
+
+    gps_threshold = lecture_fields.pop('gps_accuracy_threshold', 20)
+    shared = boundary_columns(latitude, longitude, boundary_width, boundary_height,
+                              gps_threshold=gps_threshold)
+
+    location_set_at = datetime.now(IST)
+    location_string = f"{shared['latitude']}:{shared['longitude']}:{location_set_at.isoformat()}"
+    shared.update(
+        course_id=course.id,
+        teacher_id=teacher_id,
+        location_set_at=location_set_at,
+        location_locked=True,
+        location_hash=hashlib.sha256(location_string.encode()).hexdigest(),
+        **lecture_fields
+    )
+
+    # Numbered by position in the full series so re-runs keep session numbers
+    rows = [
+        dict(shared, title=f"{title} - Session {number}",
+             scheduled_start=start, scheduled_end=end)
+        for number, (start, end) in enumerate(occurrences, start=1)
+        if start not in existing
+    ]
+
+    db.session.execute(insert(Lecture), rows)
+
+    # Bulk inserts skip the mapper events that invalidate the admin counters
+    invalidate_admin_stats_on_commit(db.session)
+
+    return {'created': len(rows), 'skipped': len(occurrences) - len(rows)}
+
+
+def parse_date_list(values):
+    """Parse ISO dates ('YYYY-MM-DD'), ignoring blanks"""
+    return [date.fromisoformat(value) for value in values or [] if value]
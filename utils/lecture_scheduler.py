@@ -0,0 +1,247 @@
+"""
+Lecture lifecycle scheduler
+Background thread that moves lectures through scheduled -> active ->
+completed from their timestamps, so Lecture.status can be trusted (and
+indexed) instead of being OR-ed with date heuristics. Each tick runs a
+handful of batched UPDATEs. With several worker processes only the one
+holding the scheduler file lock does the work; the others keep retrying the
+lock and take over if the leader exits.
+"""
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, func
+from extensions import db
+from models.lecture import Lecture
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every process acts as leader
+    fcntl = None
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+DEFAULT_INTERVAL = 60  # seconds between ticks
+ACTIVATION_LEAD = timedelta(minutes=15)  # matches the default attendance window opening
+LIFECYCLE_EVENTS = ('activated', 'completed')
+
+
+def advance_lecture_statuses(now=None):
+    """
+    Move due lectures to their next status with batched UPDATEs
+
+    Scheduled lectures become active shortly before they start; scheduled or
+    active lectures become completed once their scheduled end has passed, and
+    their absences are materialized. Cancelled and deactivated lectures are
+    left alone.
+
+    Returns:
+        Dictionary mapping lifecycle event -> list of lecture IDs
+
+    The caller commits the session.
+    """
+    from utils.attendance_closeout import close_out_due_lectures
+
+    # Lecture timestamps are stored as naive IST wall-clock times
+    now = now or datetime.now(IST).replace(tzinfo=None)
+
+    completed = _transition(
+        ['scheduled', 'active'], 'completed',
+        Lecture.scheduled_end <= now,
+        actual_end=func.coalesce(Lecture.actual_end, Lecture.scheduled_end)
+    )
+
+    activated = _transition(
+        ['scheduled'], 'active',
+        Lecture.scheduled_start <= now + ACTIVATION_LEAD,
+        Lecture.scheduled_end > now,
+        actual_start=func.coalesce(Lecture.actual_start, Lecture.scheduled_start)
+    )
+
+    if completed:
+        close_out_due_lectures(now)
+
+    return {'activated': activated, 'completed': completed}
+
+
+def _transition(from_statuses, to_status, *conditions, **values):
+    """UPDATE every due lecture in one statement and return the IDs it moved"""
+    due = select(Lecture.id).where(
+        Lecture.is_active == True,
+        Lecture.status.in_(from_statuses),
+        *conditions
+    )
+    lecture_ids = db.session.execute(due).scalars().all()
+    if not lecture_ids:
+        return []
+
+    # Re-check the status so a concurrent manual start/end is not overwritten
+    db.session.execute(
+        update(Lecture)
+        .where(Lecture.id.in_(lecture_ids), Lecture.status.in_(from_statuses))
+        .values(status=to_status, **values)
+        .execution_options(synchronize_session=False)
+    )
+
+    for obj in list(db.session.identity_map.values()):
+        if isinstance(obj, Lecture) and obj.id in lecture_ids:
+            db.session.expire(obj)
+
+    return lecture_ids
+
+
+class LectureScheduler:
+    """Leader-elected background thread running advance_lecture_statuses"""
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self._hooks = {event: [] for event in LIFECYCLE_EVENTS}
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._lock_file = None
+
+    def add_hook(self, event, hook):
+        """
+        Register hook(lecture_ids) to run after a tick commits
+
+        Args:
+            event: 'activated' or 'completed'
+            hook: Callable taking the list of lecture IDs; runs in the app context
+        """
+        if event not in self._hooks:
+            raise ValueError(f"Unknown lifecycle event: {event}")
+        self._hooks[event].append(hook)
+        return hook
+
+    def on(self, event):
+        """Decorator form of add_hook"""
+        return lambda hook: self.add_hook(event, hook)
+
+    def start(self, app):
+        """Start the scheduler thread once per process"""
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self.interval = app.config.get('LECTURE_SCHEDULER_INTERVAL', self.interval)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(app,),
+                                            name='lecture-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the thread and give up leadership"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+        self._release_leadership()
+
+    def run_once(self, app, now=None):
+        """Run one tick inside the app context and fire the hooks"""
+        with app.app_context():
+            try:
+                changes = advance_lecture_statuses(now)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Lecture scheduler tick failed")
+                return None
+            finally:
+                db.session.remove()
+
+            self._fire_hooks(app, changes)
+            return changes
+
+    def _loop(self, app):
+        while not self._stop.is_set():
+            try:
+                leader = self._acquire_leadership(app)
+            except OSError:
+                # e.g. a read-only instance folder; try again next tick
+                app.logger.exception("Lecture scheduler could not open its lock file")
+                leader = False
+            if leader:
+                self.run_once(app)
+            self._stop.wait(self.interval)
+
+    def _fire_hooks(self, app, changes):
+        for event, lecture_ids in changes.items():
+            if not lecture_ids:
+                continue
+            for hook in self._hooks[event]:
+                try:
+                    hook(lecture_ids)
+                except Exception:
+                    app.logger.exception(f"Lecture {event} hook {hook.__name__} failed")
+                finally:
+                    db.session.remove()
+
+    def _acquire_leadership(self, app):
+        """Hold an exclusive, non-blocking file lock; released when the process exits"""
+        if self._lock_file is not None or fcntl is None:
+            return True
+
+        lock_path = app.config.get('LECTURE_SCHEDULER_LOCK') or \
+            os.path.join(app.instance_path, 'lecture_scheduler.lock')
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+
+        lock_file = open(lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        app.logger.info(f"Lecture scheduler leader (pid {os.getpid()})")
+        return True
+
+    def _release_leadership(self):
+        if self._lock_file is not None:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+
+lecture_scheduler = LectureScheduler()
+
+
+# ---------------------------------------------------------------------------
+# Built-in lifecycle hooks
+# ---------------------------------------------------------------------------
+
+def _enrolled_student_ids(lecture_ids):
+    from models.enrollment import Enrollment
+
+    return db.session.execute(
+        select(Enrollment.student_id).distinct()
+        .join(Lecture, Lecture.course_id == Enrollment.course_id)
+        .where(Lecture.id.in_(lecture_ids), Enrollment.is_active == True)
+    ).scalars().all()
+
+
+@lecture_scheduler.on('activated')
+@lecture_scheduler.on('completed')
+def _refresh_student_dashboards(lecture_ids):
+    """Active lecture counts and upcoming lists changed for enrolled students"""
+    from utils.student_dashboard import invalidate_student_dashboard
+
+    student_ids = _enrolled_student_ids(lecture_ids)
+    if student_ids:
+        invalidate_student_dashboard(*student_ids)
+
+
+@lecture_scheduler.on('completed')
+def _clear_location_sessions(lecture_ids):
+    """Drop unfinished teacher location confirmations for finished lectures"""
+    from utils.location_security import clear_confirmation_session
+
+    rows = db.session.execute(
+        select(Lecture.id, Lecture.teacher_id).where(Lecture.id.in_(lecture_ids))
+    ).all()
+    for lecture_id, teacher_id in rows:
+        clear_confirmation_session(lecture_id, teacher_id)
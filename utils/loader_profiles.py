@@ -0,0 +1,101 @@
+"""
+Loader option profiles
+Per-endpoint eager-loading options for the student, teacher and admin views,
+so templates that walk enrollment.course or attendance.lecture.course read
+from the identity map instead of issuing one lazy load per row.
+"""
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def _student_profiles():
+    from models.enrollment import Enrollment
+    from models.attendance import Attendance
+    from models.lecture import Lecture
+    from models.course import Course
+
+    return {
+        # Enrollment rows rendered with their course (and course teacher)
+        'student.enrollments': lambda: [
+            joinedload(Enrollment.course).joinedload(Course.teacher)
+        ],
+        # Lecture rows rendered with their course
+        'student.lectures': lambda: [
+            joinedload(Lecture.course)
+        ],
+        # Attendance rows rendered with lecture and course
+        'student.attendance': lambda: [
+            joinedload(Attendance.lecture).joinedload(Lecture.course)
+        ],
+        # Course cards in the browse/enroll pages
+        'student.courses': lambda: [
+            joinedload(Course.teacher)
+        ],
+    }
+
+
+def _teacher_profiles():
+    from models.enrollment import Enrollment
+    from models.attendance import Attendance
+    from models.lecture import Lecture
+
+    return {
+        'teacher.lectures': lambda: [
+            joinedload(Lecture.course)
+        ],
+        'teacher.roster': lambda: [
+            joinedload(Enrollment.student)
+        ],
+        'teacher.lecture_attendance': lambda: [
+            joinedload(Attendance.student)
+        ],
+    }
+
+
+def _admin_profiles():
+    from models.course import Course
+    from models.enrollment import Enrollment
+
+    return {
+        'admin.courses': lambda: [
+            joinedload(Course.teacher)
+        ],
+        'admin.course_detail': lambda: [
+            joinedload(Course.teacher),
+            selectinload(Course.enrollment_list).joinedload(Enrollment.student),
+            selectinload(Course.lecture_list),
+        ],
+    }
+
+
+_profiles = None
+
+
+def loader_options(profile):
+    """
+    Get the loader options for a named profile
+
+    Args:
+        profile: Profile name such as 'student.attendance'
+
+    Returns:
+        List of SQLAlchemy loader options
+    """
+    global _profiles
+
+    # Built lazily: backref attributes only exist once the mappers are configured
+    if _profiles is None:
+        profiles = {}
+        profiles.update(_student_profiles())
+        profiles.update(_teacher_profiles())
+        profiles.update(_admin_profiles())
+        _profiles = profiles
+
+    if profile not in _profiles:
+        raise KeyError(f"Unknown loader profile: {profile}")
+
+    return _profiles[profile]()
+
+
+def with_profile(query, profile):
+    """Apply a loader profile to a query"""
+    return query.options(*loader_options(profile))
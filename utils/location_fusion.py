@@ -0,0 +1,120 @@
+"""
+Multi-sample GPS fusion
+Fuses a short burst of position samples into one fix. Samples are projected
+into a local metre frame and combined with an accuracy-weighted median per
+axis; samples whose distance from that median exceeds both their own
+reported accuracy and a multiple of the burst's robust spread (MAD) are
+rejected as outliers, and the median is recomputed from the rest.
+"""
+import math
+import numpy as np
+
+METERS_PER_DEGREE_LAT = 111320
+MAX_SAMPLES = 10  # samples beyond this are ignored
+MIN_ACCURACY_M = 1.0  # floor on reported accuracy when weighting
+MIN_OUTLIER_DISTANCE_M = 3.0  # never reject samples closer than this
+OUTLIER_MADS = 3.0  # outlier cut-off in robust standard deviations
+MAD_TO_SIGMA = 1.4826  # MAD of a normal distribution -> standard deviation
+
+
+def _weighted_median(values, weights):
+    """Weighted median of a 1-D array (lower median on exact ties)"""
+    order = np.argsort(values, kind='stable')
+    cumulative = np.cumsum(weights[order])
+    index = np.searchsorted(cumulative, cumulative[-1] / 2)
+    return values[order][index]
+
+
+def parse_samples(samples, limit=MAX_SAMPLES):
+    """
+    Validate a list of {'latitude', 'longitude', 'accuracy'} dicts
+
+    Returns:
+        (latitudes, longitudes, accuracies) arrays for the valid fixes among
+        the first `limit` samples
+
+    Raises:
+        ValueError: If no sample has usable coordinates
+    """
+    if not isinstance(samples, (list, tuple)):
+        raise ValueError("samples must be a list")
+
+    rows = []
+    for sample in samples[:limit]:
+        if not isinstance(sample, dict):
+            continue
+        try:
+            lat = float(sample['latitude'])
+            lon = float(sample['longitude'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            continue
+        try:
+            accuracy = float(sample.get('accuracy'))
+        except (TypeError, ValueError):
+            accuracy = math.nan
+        rows.append((lat, lon, accuracy))
+
+    if not rows:
+        raise ValueError("No valid location samples")
+
+    lats, lons, accuracies = (np.asarray(column, dtype=np.float64) for column in zip(*rows))
+    return lats, lons, accuracies
+
+
+def fuse_samples(samples, default_accuracy=999):
+    """
+    Fuse a burst of samples into one position
+
+    Args:
+        samples: List of dicts with latitude, longitude and accuracy
+        default_accuracy: Accuracy assumed for samples that report none
+
+    Returns:
+        dict: {
+            'latitude', 'longitude': fused position,
+            'accuracy': fused accuracy radius (meters),
+            'sample_count': samples considered,
+            'used': samples kept,
+            'rejected': indexes of rejected samples,
+            'spread_m': robust spread of the kept samples (meters)
+        }
+
+    Raises:
+        ValueError: If no sample has usable coordinates
+    """
+    lats, lons, accuracies = parse_samples(samples)
+    accuracies = np.maximum(np.where(np.isnan(accuracies), default_accuracy, accuracies), MIN_ACCURACY_M)
+    weights = 1.0 / accuracies ** 2  # inverse variance
+
+    # Local metre frame around the first sample
+    m_per_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(lats[0]))
+    x = (lons - lons[0]) * m_per_lon
+    y = (lats - lats[0]) * METERS_PER_DEGREE_LAT
+
+    cx, cy = _weighted_median(x, weights), _weighted_median(y, weights)
+    residual = np.hypot(x - cx, y - cy)
+    spread = MAD_TO_SIGMA * np.median(residual)
+
+    cutoff = np.maximum(np.maximum(OUTLIER_MADS * spread, accuracies), MIN_OUTLIER_DISTANCE_M)
+    keep = residual <= cutoff
+    if keep.sum() < len(keep):
+        cx, cy = _weighted_median(x[keep], weights[keep]), _weighted_median(y[keep], weights[keep])
+        residual = np.hypot(x - cx, y - cy)
+        spread = MAD_TO_SIGMA * np.median(residual[keep])
+
+    # Burst samples share most of their error, so the combined accuracy is
+    # kept within sqrt(2) of the best sample and never below the burst's scatter
+    combined = math.sqrt(1.0 / weights[keep].sum())
+    accuracy = max(combined, float(accuracies[keep].min()) / math.sqrt(2), float(spread))
+
+    return {
+        'latitude': float(lats[0] + cy / METERS_PER_DEGREE_LAT),
+        'longitude': float(lons[0] + cx / m_per_lon),
+        'accuracy': round(accuracy, 1),
+        'sample_count': len(keep),
+        'used': int(keep.sum()),
+        'rejected': np.flatnonzero(~keep).tolist(),
+        'spread_m': round(float(spread), 1)
+    }
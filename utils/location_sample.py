@@ -0,0 +1,429 @@
+"""
+Location samples and metadata rule pipelines
+A LocationSample is the client's position metadata parsed and validated
+once per request: JSON decoding, numeric coercion and timestamp parsing all
+happen in LocationSample.parse, and the result is immutable. Scoring and
+spoofing checks are small rules run over the sample by a RulePipeline, which
+keeps per-rule call counts and timings.
+"""
+import json
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+_EMPTY = MappingProxyType({})
+
+
+def _number(value):
+    """Finite float for numeric-looking values, None otherwise (NaN and inf included)"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _parse_timestamp(value):
+    """
+    Parse a client timestamp: ISO 8601 (a trailing Z is UTC) or epoch
+    seconds/milliseconds as sent by Date.now()
+
+    Returns:
+        (datetime or None, valid) where valid is False for unparseable values
+    """
+    if value in (None, ''):
+        return None, True
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = value / 1000 if value > 1e11 else value
+        try:
+            return datetime.fromtimestamp(seconds, timezone.utc), True
+        except (OverflowError, OSError, ValueError):
+            return None, False
+
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')), True
+    except ValueError:
+        return None, False
+
+
+class LocationSample:
+    """Immutable, parsed view of one position report and its metadata"""
+
+    __slots__ = ('latitude', 'longitude', 'accuracy', 'altitude', 'speed',
+                 'user_agent', 'platform', 'timezone', 'timestamp', 'timestamp_valid',
+                 'age_seconds', 'fields', 'metadata', 'parse_error')
+
+    def __init__(self, latitude=None, longitude=None, metadata=None, parse_error=None, now=None):
+        metadata = metadata if isinstance(metadata, dict) else {}
+        timestamp, timestamp_valid = _parse_timestamp(metadata.get('timestamp'))
+
+        age_seconds = None
+        if timestamp is not None:
+            now = now or datetime.now()
+            age_seconds = now.timestamp() - timestamp.timestamp()
+
+        values = {
+            'latitude': _number(latitude),
+            'longitude': _number(longitude),
+            'accuracy': _number(metadata.get('accuracy')),
+            'altitude': _number(metadata.get('altitude')),
+            'speed': _number(metadata.get('speed')),
+            'user_agent': metadata.get('userAgent') or '',
+            'platform': metadata.get('platform') or '',
+            'timezone': metadata.get('timezone') or '',
+            'timestamp': timestamp,
+            'timestamp_valid': timestamp_valid,
+            'age_seconds': age_seconds,
+            'fields': frozenset(metadata),
+            'metadata': MappingProxyType(dict(metadata)) if metadata else _EMPTY,
+            'parse_error': parse_error,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LocationSample is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("LocationSample is immutable")
+
+    @classmethod
+    def parse(cls, metadata, latitude=None, longitude=None, now=None):
+        """
+        Build a sample from a metadata dict or JSON string
+
+        Coordinates default to the metadata's latitude/longitude. Passing an
+        existing LocationSample returns it unchanged, so helpers can accept
+        either form without parsing twice.
+        """
+        if isinstance(metadata, cls):
+            return metadata
+
+        parse_error = None
+        if isinstance(metadata, (str, bytes)):
+            try:
+                metadata = json.loads(metadata) if metadata else {}
+            except ValueError as e:
+                metadata, parse_error = {}, str(e)
+
+        if not isinstance(metadata, dict):
+            metadata = {}
+
+        if latitude is None:
+            latitude = metadata.get('latitude')
+        if longitude is None:
+            longitude = metadata.get('longitude')
+
+        return cls(latitude, longitude, metadata, parse_error, now)
+
+    @property
+    def has_metadata(self):
+        return bool(self.fields)
+
+    @property
+    def coordinates(self):
+        return self.latitude, self.longitude
+
+    def __repr__(self):
+        return (f'<LocationSample {self.latitude}, {self.longitude} '
+                f'±{self.accuracy}m at {self.timestamp}>')
+
+
+class Finding:
+    """Outcome of one rule: a score penalty plus issue codes or messages"""
+
+    __slots__ = ('penalty', 'issues', 'errors')
+
+    def __init__(self, penalty=0, issues=(), errors=()):
+        self.penalty = penalty
+        self.issues = tuple(issues)
+        self.errors = tuple(errors)
+
+
+class Rule:
+    """A named check over a LocationSample; check(sample) returns a Finding or None"""
+
+    __slots__ = ('name', 'check')
+
+    def __init__(self, name, check):
+        self.name = name
+        self.check = check
+
+
+def rule(name):
+    """Decorator turning a function into a Rule"""
+    return lambda check: Rule(name, check)
+
+
+class RulePipeline:
+    """Runs rules over a sample, summing penalties, with per-rule timing counters"""
+
+    def __init__(self, name, rules, base_score=100):
+        self.name = name
+        self.rules = tuple(rules)
+        self.base_score = base_score
+        self._lock = threading.Lock()
+        self._stats = {r.name: [0, 0.0] for r in self.rules}  # calls, seconds
+
+    def then(self, *rules):
+        """New pipeline with extra rules appended"""
+        return RulePipeline(self.name, self.rules + rules, self.base_score)
+
+    def run(self, sample):
+        """
+        Returns:
+            Dictionary with penalty (sum of rule penalties), score (base
+            minus penalty), and issues and errors in rule order
+        """
+        penalty = 0
+        issues = []
+        errors = []
+        timings = []
+
+        for r in self.rules:
+            started = time.perf_counter()
+            finding = r.check(sample)
+            timings.append((r.name, time.perf_counter() - started))
+
+            if finding is not None:
+                penalty += finding.penalty
+                issues.extend(finding.issues)
+                errors.extend(finding.errors)
+
+        with self._lock:
+            for name, elapsed in timings:
+                stats = self._stats[name]
+                stats[0] += 1
+                stats[1] += elapsed
+
+        return {'penalty': penalty, 'score': self.base_score - penalty,
+                'issues': issues, 'errors': errors}
+
+    def timings(self):
+        """Per-rule counters: {rule: {'calls', 'total_ms', 'avg_ms'}}"""
+        with self._lock:
+            return {
+                name: {
+                    'calls': calls,
+                    'total_ms': round(seconds * 1000, 3),
+                    'avg_ms': round(seconds * 1000 / calls, 4) if calls else 0.0
+                }
+                for name, (calls, seconds) in self._stats.items()
+            }
+
+    def reset_timings(self):
+        with self._lock:
+            for stats in self._stats.values():
+                stats[0], stats[1] = 0, 0.0
+
+
+# ---------------------------------------------------------------------------
+# Spoofing rules (detect_location_spoofing)
+# ---------------------------------------------------------------------------
+
+def _decimals(value):
+    text = str(value)
+    return len(text.split('.')[1]) if '.' in text else 0
+
+
+@rule('perfect_integer_coordinates')
+def _integer_coordinates(sample):
+    if sample.latitude == int(sample.latitude) and sample.longitude == int(sample.longitude):
+        return Finding(30, ['perfect_integer_coordinates'])
+
+
+@rule('excessive_precision')
+def _excessive_precision(sample):
+    if _decimals(sample.latitude) > 6:
+        return Finding(20, ['excessive_precision'])
+
+
+@rule('impossible_accuracy')
+def _impossible_accuracy(sample):
+    accuracy = sample.accuracy if sample.accuracy is not None else 999
+    if accuracy < 1:
+        return Finding(40, ['impossible_accuracy'])
+
+
+@rule('missing_fields')
+def _missing_fields(sample):
+    missing = [f for f in ('accuracy', 'timestamp', 'userAgent') if f not in sample.fields]
+    if missing:
+        return Finding(len(missing) * 10, [f"missing_fields: {', '.join(missing)}"])
+
+
+@rule('impossible_speed')
+def _impossible_speed(sample):
+    if sample.speed and sample.speed > 50:  # > 180 km/h
+        return Finding(35, ['impossible_speed'])
+
+
+SPOOFING_PIPELINE = RulePipeline('spoofing', [
+    _integer_coordinates, _excessive_precision, _impossible_accuracy,
+    _missing_fields, _impossible_speed,
+])
+
+
+# ---------------------------------------------------------------------------
+# Confirmation rules (LocationSecurityManager.analyze_location_metadata)
+# ---------------------------------------------------------------------------
+
+@rule('gps_accuracy')
+def _gps_accuracy(sample):
+    if sample.accuracy:
+        if sample.accuracy > 50:
+            return Finding(30, ['Poor GPS accuracy'])
+        if sample.accuracy > 20:
+            return Finding(15, ['Moderate GPS accuracy'])
+
+
+@rule('moving_device')
+def _moving_device(sample):
+    if sample.speed and sample.speed > 2:  # Moving faster than 2 m/s
+        return Finding(25, ['Device was moving during location capture'])
+
+
+@rule('altitude_missing')
+def _altitude_missing(sample):
+    if not sample.altitude:
+        return Finding(10, ['No altitude data (lower GPS quality)'])
+
+
+@rule('stale_timestamp')
+def _stale_timestamp(sample):
+    if not sample.timestamp_valid:
+        return Finding(15, ['Invalid timestamp format'])
+    if sample.age_seconds is not None and sample.age_seconds > 300:  # Older than 5 minutes
+        return Finding(20, ['Location data is stale'])
+
+
+CONFIRMATION_PIPELINE = RulePipeline('confirmation', [
+    _gps_accuracy, _moving_device, _altitude_missing, _stale_timestamp,
+])
+
+
+# ---------------------------------------------------------------------------
+# Metadata validation rules (validate_location_metadata)
+# ---------------------------------------------------------------------------
+
+@rule('required_fields')
+def _required_fields(sample):
+    missing = [f for f in ('latitude', 'longitude', 'accuracy', 'timestamp') if f not in sample.fields]
+    if missing:
+        return Finding(errors=[f"missing_required_field: {f}" for f in missing])
+
+
+@rule('accuracy_range')
+def _accuracy_range(sample):
+    if sample.accuracy is not None:
+        if sample.accuracy < 0:
+            return Finding(errors=['negative_accuracy'])
+        if sample.accuracy > 1000:
+            return Finding(issues=['very_poor_accuracy'])
+
+
+@rule('timestamp_format')
+def _timestamp_format(sample):
+    if not sample.timestamp_valid:
+        return Finding(errors=['invalid_timestamp_format'])
+    if sample.age_seconds is not None and abs(sample.age_seconds) > 3600:  # Older than 1 hour
+        return Finding(issues=['old_timestamp'])
+
+
+@rule('coordinate_range')
+def _coordinate_range(sample):
+    errors = []
+    if sample.latitude is not None and sample.longitude is not None:
+        if not (-90 <= sample.latitude <= 90):
+            errors.append('invalid_latitude_range')
+        if not (-180 <= sample.longitude <= 180):
+            errors.append('invalid_longitude_range')
+    if errors:
+        return Finding(errors=errors)
+
+
+VALIDATION_PIPELINE = RulePipeline('validation', [
+    _required_fields, _accuracy_range, _timestamp_format, _coordinate_range,
+])
+
+
+# ---------------------------------------------------------------------------
+# Accuracy warnings (analyze_location_accuracy)
+# ---------------------------------------------------------------------------
+
+def _moving_fast(sample):
+    return (sample.speed or 0) > 5  # Moving faster than 5 m/s (18 km/h)
+
+
+def _stale(sample):
+    return sample.age_seconds is not None and sample.age_seconds > 300  # Older than 5 minutes
+
+
+@rule('high_speed_detected')
+def _high_speed_warning(sample):
+    if _moving_fast(sample):
+        return Finding(issues=['high_speed_detected'])
+
+
+@rule('stale_location_data')
+def _stale_warning(sample):
+    if _stale(sample):
+        return Finding(issues=['stale_location_data'])
+
+
+# The last issue is the one reported, so stale data outranks high speed
+ACCURACY_PIPELINE = RulePipeline('accuracy', [_high_speed_warning, _stale_warning])
+
+
+# ---------------------------------------------------------------------------
+# Security score rules (get_location_security_score)
+# ---------------------------------------------------------------------------
+
+def _accuracy_or_worst(sample):
+    return sample.accuracy if sample.accuracy is not None else 999
+
+
+@rule('poor_student_accuracy')
+def _poor_student_accuracy(sample):
+    if _accuracy_or_worst(sample) > 50:
+        return Finding(30, ['poor_student_accuracy'])
+
+
+@rule('student_moving_fast')
+def _student_moving_fast(sample):
+    if (sample.speed or 0) * 3.6 > 10:  # km/h
+        return Finding(25, ['student_moving_fast'])
+
+
+@rule('location_warning')
+def _location_warning(sample):
+    if _stale(sample):
+        return Finding(15, ['stale_location'])
+    if _moving_fast(sample):
+        return Finding(20, ['high_speed'])
+
+
+@rule('poor_lecture_accuracy')
+def _poor_lecture_accuracy(sample):
+    if _accuracy_or_worst(sample) > 20:
+        return Finding(20, ['poor_lecture_accuracy'])
+
+
+STUDENT_SECURITY_PIPELINE = RulePipeline('student_security', [
+    _poor_student_accuracy, _student_moving_fast, _location_warning,
+])
+
+# Scored as a penalty on top of the student's pipeline, so its base is 0
+LECTURE_SECURITY_PIPELINE = RulePipeline('lecture_security', [_poor_lecture_accuracy], base_score=0)
+
+
+def pipeline_timings():
+    """Timing counters of the built-in pipelines, keyed by pipeline name"""
+    return {p.name: p.timings() for p in (SPOOFING_PIPELINE, CONFIRMATION_PIPELINE, VALIDATION_PIPELINE,
+                                          ACCURACY_PIPELINE, STUDENT_SECURITY_PIPELINE,
+                                          LECTURE_SECURITY_PIPELINE)}
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Tuple, Optional, List
 import math
 import secrets
+from utils.location_sample import LocationSample, CONFIRMATION_PIPELINE
 
 class LocationSecurityManager:
     """Manages secure location setting and validation"""
@@ -106,49 +107,16 @@ class LocationSecurityManager:
         return stored_hash == expected_hash
     
     @staticmethod
-    def analyze_location_metadata(metadata: Dict) -> Dict:
-        """Analyze location metadata for security issues"""
+    def analyze_location_metadata(metadata) -> Dict:
+        """Analyze location metadata (dict, JSON string or LocationSample) for security issues"""
+        result = CONFIRMATION_PIPELINE.run(LocationSample.parse(metadata))
         analysis = {
-            'security_score': 100,
-            'warnings': [],
+            'security_score': result['score'],
+            'warnings': result['issues'],
             'is_suspicious': False,
             'reliability': 'high'
         }
         
-        # Check accuracy
-        accuracy = metadata.get('accuracy')
-        if accuracy:
-            if accuracy > 50:
-                analysis['security_score'] -= 30
-                analysis['warnings'].append('Poor GPS accuracy')
-            elif accuracy > 20:
-                analysis['security_score'] -= 15
-                analysis['warnings'].append('Moderate GPS accuracy')
-        
-        # Check speed (movement during capture)
-        speed = metadata.get('speed', 0)
-        if speed and speed > 2:  # Moving faster than 2 m/s
-            analysis['security_score'] -= 25
-            analysis['warnings'].append('Device was moving during location capture')
-        
-        # Check altitude availability (indicates GPS quality)
-        if not metadata.get('altitude'):
-            analysis['security_score'] -= 10
-            analysis['warnings'].append('No altitude data (lower GPS quality)')
-        
-        # Check timestamp freshness
-        timestamp = metadata.get('timestamp')
-        if timestamp:
-            try:
-                ts = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                age_seconds = (datetime.now().timestamp() - ts.timestamp())
-                if age_seconds > 300:  # Older than 5 minutes
-                    analysis['security_score'] -= 20
-                    analysis['warnings'].append('Location data is stale')
-            except:
-                analysis['security_score'] -= 15
-                analysis['warnings'].append('Invalid timestamp format')
-        
         # Determine overall reliability
         if analysis['security_score'] >= 80:
             analysis['reliability'] = 'high'
@@ -160,6 +128,8 @@ class LocationSecurityManager:
         
         return analysis
 
+SESSION_LIFETIME = 600  # seconds (10 minutes) a confirmation session stays open
+
 class LocationConfirmationSession:
     """Manages location confirmation sessions for secure location setting"""
     
@@ -317,28 +287,106 @@ class LocationConfirmationSession:
     
     def is_expired(self) -> bool:
         """Check if session has expired"""
-        return (datetime.now() - self.created_at).total_seconds() > 600  # 10 minutes
+        return self.seconds_remaining() <= 0
+    
+    def seconds_remaining(self) -> float:
+        """Seconds until the session expires"""
+        return SESSION_LIFETIME - (datetime.now() - self.created_at).total_seconds()
+    
+    def to_dict(self) -> Dict:
+        """Serialize the session for a shared session store"""
+        return {
+            'lecture_id': self.lecture_id,
+            'teacher_id': self.teacher_id,
+            'session_id': self.session_id,
+            'created_at': self.created_at.isoformat(),
+            'is_complete': self.is_complete,
+            'final_location': self.final_location,
+            'confirmations': [
+                dict(c, timestamp=c['timestamp'].isoformat()) for c in self.confirmations
+            ]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LocationConfirmationSession':
+        """Rebuild a session read from a shared session store"""
+        session = cls(data['lecture_id'], data['teacher_id'])
+        session.session_id = data['session_id']
+        session.created_at = datetime.fromisoformat(data['created_at'])
+        session.is_complete = data['is_complete']
+        session.final_location = data['final_location']
+        session.confirmations = [
+            dict(c, timestamp=datetime.fromisoformat(c['timestamp'])) for c in data['confirmations']
+        ]
+        return session
+
+# Process-wide fallback when no application is configured
+_fallback_store = None
+
+def get_session_store():
+    """
+    Session store shared by all workers
+    
+    Configured with LOCATION_SESSION_STORE (see utils.session_store); the
+    default is a SQLite file in the instance folder, so confirmations survive
+    requests landing on different or recycled workers. When that file cannot
+    be created (e.g. a read-only serverless deployment) the default falls
+    back to a per-process memory store.
+    """
+    global _fallback_store
+    from flask import current_app, has_app_context
+    from utils.session_store import create_session_store, MemorySessionStore
+    
+    if not has_app_context():
+        if _fallback_store is None:
+            _fallback_store = MemorySessionStore()
+        return _fallback_store
+    
+    app = current_app._get_current_object()
+    store = app.extensions.get('location_session_store')
+    if store is None:
+        uri = app.config.get('LOCATION_SESSION_STORE')
+        if uri:
+            store = create_session_store(uri)
+        else:
+            import os
+            import sqlite3
+            try:
+                store = create_session_store(
+                    'sqlite:///' + os.path.join(app.instance_path, 'location_sessions.db'))
+            except (OSError, sqlite3.Error) as e:
+                app.logger.warning(f"Location session store: instance folder not writable ({e}); "
+                                   f"using a per-process memory store, set LOCATION_SESSION_STORE to share it")
+                store = MemorySessionStore()
+        app.extensions['location_session_store'] = store
+    return store
 
-# Global session storage (in production, use Redis or database)
-_active_sessions = {}
+def _session_key(lecture_id: int, teacher_id: int) -> str:
+    return f"location_confirmation:{lecture_id}_{teacher_id}"
 
 def get_or_create_confirmation_session(lecture_id: int, teacher_id: int) -> LocationConfirmationSession:
     """Get existing or create new confirmation session"""
-    session_key = f"{lecture_id}_{teacher_id}"
+    store = get_session_store()
+    session_key = _session_key(lecture_id, teacher_id)
     
-    # Clean up expired sessions
-    expired_keys = [k for k, v in _active_sessions.items() if v.is_expired()]
-    for key in expired_keys:
-        del _active_sessions[key]
+    # The store drops expired sessions itself
+    data = store.get(session_key)
+    if data is not None:
+        session = LocationConfirmationSession.from_dict(data)
+        if not session.is_expired():
+            return session
     
-    # Get or create session
-    if session_key not in _active_sessions or _active_sessions[session_key].is_expired():
-        _active_sessions[session_key] = LocationConfirmationSession(lecture_id, teacher_id)
-    
-    return _active_sessions[session_key]
+    session = LocationConfirmationSession(lecture_id, teacher_id)
+    save_confirmation_session(session)
+    return session
+
+def save_confirmation_session(session: LocationConfirmationSession):
+    """Persist a session after it changed (e.g. a confirmation was added)"""
+    remaining = session.seconds_remaining()
+    if remaining > 0:
+        get_session_store().set(_session_key(session.lecture_id, session.teacher_id),
+                                session.to_dict(), remaining)
 
 def clear_confirmation_session(lecture_id: int, teacher_id: int):
     """Clear confirmation session"""
-    session_key = f"{lecture_id}_{teacher_id}"
-    if session_key in _active_sessions:
-        del _active_sessions[session_key]
\ No newline at end of file
+    get_session_store().delete(_session_key(lecture_id, teacher_id))
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+Rotating QR check-in tokens
+The teacher's screen shows a QR code with a token that changes every
+QR_TOKEN_ROTATION_SECONDS. A token is an HMAC-SHA256 signature over the
+lecture, its course, a time slot and the lecture's centre and check-in
+radius, so a check-in can be validated with only the application secret
+and the clock - no lecture row, no stored token. Everything the relaxed GPS
+check needs travels inside the signed token.
+
+Token layout (URL-safe): v.lecture.course.slot.lat.lon.radius.signature
+with coordinates in 1e-5 degree units and the signature base64url-encoded.
+"""
+import base64
+import hashlib
+import hmac
+import math
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+
+TOKEN_VERSION = 1
+DEFAULT_ROTATION_SECONDS = 15
+GRACE_SLOTS = 1  # the previous slot's token is still accepted
+SIGNATURE_BYTES = 16  # truncated HMAC-SHA256, keeps the QR code small
+COORDINATE_SCALE = 1e5  # ~1.1 m resolution is plenty for the GPS check
+
+# The token proves the student saw the screen; GPS only has to rule out a
+# forwarded photo, so the check-in radius is the boundary plus this slack
+# and any accuracy up to QR_MAX_ACCURACY_M is credited to the student
+QR_GPS_SLACK_M = 50
+QR_MAX_ACCURACY_M = 150
+
+
+class QrTokenError(ValueError):
+    """Token is malformed, forged, expired or from the future"""
+
+
+@lru_cache(maxsize=4)
+def _signing_key(secret: str) -> bytes:
+    """Key derived from the application secret for this purpose only"""
+    return hmac.new(secret.encode(), b'qr-checkin-token', hashlib.sha256).digest()
+
+
+def _sign(secret: str, payload: str) -> str:
+    digest = hmac.new(_signing_key(secret), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:SIGNATURE_BYTES]).rstrip(b'=').decode()
+
+
+def current_slot(now: Optional[float] = None, rotation: int = DEFAULT_ROTATION_SECONDS) -> int:
+    """Time slot number for a Unix timestamp"""
+    return int((time.time() if now is None else now) // rotation)
+
+
+def checkin_radius(lecture) -> float:
+    """
+    Radius (meters) around the lecture centre that a QR check-in may come
+    from: half the rectangle's diagonal, or the geofence radius
+    """
+    boundary = lecture.get_boundary() if lecture.geofence_type == 'rectangular' else None
+    if boundary is not None:
+        from utils.boundary_probability import BoundaryFrame
+        frame = BoundaryFrame(boundary, lecture.boundary_tolerance_m or 2.0)
+        extent = math.hypot(max(-frame.west, frame.east), max(-frame.south, frame.north))
+    else:
+        extent = lecture.geofence_radius or 50
+    return extent + QR_GPS_SLACK_M
+
+
+def issue_token(secret: str, lecture, now: Optional[float] = None,
+                rotation: int = DEFAULT_ROTATION_SECONDS) -> Dict:
+    """
+    Token for the lecture's current slot
+
+    Args:
+        secret: Application secret (SECRET_KEY)
+        lecture: Lecture with a location set
+        now: Unix timestamp (defaults to the clock)
+        rotation: Slot length in seconds
+
+    Returns:
+        dict: {'token', 'slot', 'expires_in' (seconds until the next token)}
+    """
+    now = time.time() if now is None else now
+    slot = current_slot(now, rotation)
+    fields = (TOKEN_VERSION, lecture.id, lecture.course_id, slot,
+              round(lecture.latitude * COORDINATE_SCALE), round(lecture.longitude * COORDINATE_SCALE),
+              math.ceil(checkin_radius(lecture)))
+    payload = '.'.join(str(field) for field in fields)
+
+    return {
+        'token': f"{payload}.{_sign(secret, payload)}",
+        'slot': slot,
+        'expires_in': round((slot + 1) * rotation - now, 1)
+    }
+
+
+def verify_token(secret: str, token: str, now: Optional[float] = None,
+                 rotation: int = DEFAULT_ROTATION_SECONDS) -> Dict:
+    """
+    Check a token's signature and slot
+
+    Args:
+        secret: Application secret (SECRET_KEY)
+        token: Token string from the QR code
+        now: Unix timestamp (defaults to the clock)
+        rotation: Slot length in seconds
+
+    Returns:
+        dict: {'lecture_id', 'course_id', 'slot', 'latitude', 'longitude', 'radius_m'}
+
+    Raises:
+        QrTokenError: If the token is malformed, forged or outside the
+                      current and GRACE_SLOTS previous slots
+    """
+    if not isinstance(token, str):
+        raise QrTokenError("Invalid QR code")
+
+    payload, _, signature = token.rpartition('.')
+    if not hmac.compare_digest(_sign(secret, payload), signature):
+        raise QrTokenError("Invalid QR code")
+
+    try:
+        version, lecture_id, course_id, slot, lat, lon, radius = (int(field) for field in payload.split('.'))
+    except ValueError:
+        raise QrTokenError("Invalid QR code")
+    if version != TOKEN_VERSION:
+        raise QrTokenError("Invalid QR code")
+
+    age = current_slot(now, rotation) - slot
+    if age > GRACE_SLOTS:
+        raise QrTokenError("QR code has expired, scan the current one")
+    if age < 0:
+        raise QrTokenError("QR code is not valid yet")
+
+    return {
+        'lecture_id': lecture_id,
+        'course_id': course_id,
+        'slot': slot,
+        'latitude': lat / COORDINATE_SCALE,
+        'longitude': lon / COORDINATE_SCALE,
+        'radius_m': radius
+    }
+
+
+def check_location(claims: Dict, latitude: float, longitude: float, accuracy: Optional[float]) -> Dict:
+    """
+    Relaxed GPS check against the centre and radius signed into the token
+
+    The fix passes when it is within the radius once its accuracy (up to
+    QR_MAX_ACCURACY_M) is credited, so poor indoor GPS is enough. Missing,
+    non-finite or negative accuracies are rejected.
+
+    Returns:
+        dict: {'acceptable': bool, 'distance': float (meters), 'reason': str or None}
+    """
+    from utils.geolocation import calculate_distance
+
+    distance = calculate_distance(latitude, longitude, claims['latitude'], claims['longitude'])
+
+    if accuracy is None or not math.isfinite(accuracy) or accuracy < 0 or accuracy > QR_MAX_ACCURACY_M:
+        reason = f"GPS accuracy too low even for QR check-in (required: ≤{QR_MAX_ACCURACY_M}m)"
+    elif distance > claims['radius_m'] + accuracy:
+        reason = f"You are {distance:.0f}m from the lecture location"
+    else:
+        reason = None
+
+    return {'acceptable': reason is None, 'distance': distance, 'reason': reason}
@@ -0,0 +1,382 @@
+"""
+Background report jobs
+Durable report queue stored in the report_jobs table and worked by a small
+pool of background threads. Finished artifacts are kept on disk and keyed by
+(report type, filters, data version), where the data version is a stamp of
+the latest attendance and lecture modifications in the report's scope, so a
+repeated request returns the existing file until the underlying data changes.
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from importlib import import_module
+from importlib.util import find_spec
+from sqlalchemy import select, update, func, or_
+from extensions import db
+from models.attendance import Attendance
+from models.lecture import Lecture
+from models.report_job import ReportJob
+from utils.cache import TTLCache
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+DEFAULT_WORKERS = 2
+POLL_INTERVAL = 2.0  # seconds between queue polls when idle
+MAX_ATTEMPTS = 3
+STALE_JOB_TIMEOUT = timedelta(minutes=30)  # running jobs older than this are requeued
+JOB_RETENTION = timedelta(days=1)  # job rows and unreferenced artifacts are then removed
+
+# Filters that define a report's scope, in normalized form
+SCOPE_FILTERS = ('course_id', 'student_id', 'teacher_id', 'start_date', 'end_date')
+
+
+class ReportType:
+    """A report the queue knows how to build"""
+
+    def __init__(self, extension, mimetype, builder, requires=None):
+        self.extension = extension
+        self.mimetype = mimetype
+        self.builder = builder  # 'module:function', called as function(path, **filters)
+        self.requires = requires  # optional package the builder needs
+
+    def missing_dependency(self):
+        """Name of the required package when it is not installed, else None"""
+        if self.requires and find_spec(self.requires) is None:
+            return self.requires
+        return None
+
+    def build(self, path, params):
+        module_name, function_name = self.builder.split(':')
+        builder = getattr(import_module(module_name), function_name)
+        return builder(path, **_parse_filters(params))
+
+
+REPORT_TYPES = {
+    'attendance_pdf': ReportType('pdf', 'application/pdf', 'utils.reports:write_attendance_pdf'),
+    'attendance_csv': ReportType('csv', 'text/csv', 'utils.reports:write_attendance_csv'),
+    'attendance_parquet': ReportType('parquet', 'application/vnd.apache.parquet',
+                                     'utils.columnar_export:export_attendance_parquet', requires='pyarrow'),
+}
+
+
+def normalize_filters(filters):
+    """JSON-safe, canonical form of report filters (drops empty values)"""
+    params = {}
+    for name in SCOPE_FILTERS:
+        value = filters.get(name)
+        if value in (None, ''):
+            continue
+        if name.endswith('_date'):
+            params[name] = value.isoformat() if isinstance(value, datetime) else str(value)
+        else:
+            params[name] = int(value)
+    return params
+
+
+def _parse_filters(params):
+    filters = dict(params or {})
+    for name in ('start_date', 'end_date'):
+        if filters.get(name):
+            filters[name] = datetime.fromisoformat(filters[name])
+    return filters
+
+
+def data_version(params):
+    """
+    Stamp of the data a report covers: count and latest modification of the
+    lectures and attendance rows in scope. Any insert, update or delete in
+    scope changes it.
+    """
+    filters = _parse_filters(params)
+
+    attendance_join = Attendance.lecture_id == Lecture.id
+    if filters.get('student_id'):
+        attendance_join = attendance_join & (Attendance.student_id == filters['student_id'])
+
+    stmt = select(
+        func.count(func.distinct(Lecture.id)),
+        func.max(Lecture.updated_at),
+        func.count(Attendance.id),
+        func.max(Attendance.updated_at)
+    ).select_from(Lecture).outerjoin(Attendance, attendance_join)
+
+    if filters.get('course_id'):
+        stmt = stmt.where(Lecture.course_id == filters['course_id'])
+    if filters.get('teacher_id'):
+        stmt = stmt.where(Lecture.teacher_id == filters['teacher_id'])
+    if filters.get('start_date'):
+        stmt = stmt.where(Lecture.scheduled_start >= filters['start_date'])
+    if filters.get('end_date'):
+        stmt = stmt.where(Lecture.scheduled_start <= filters['end_date'])
+
+    lecture_count, lecture_modified, attendance_count, attendance_modified = \
+        db.session.execute(stmt).one()
+
+    return (f"l{lecture_count}:{lecture_modified.isoformat() if lecture_modified else '-'}"
+            f"|a{attendance_count}:{attendance_modified.isoformat() if attendance_modified else '-'}")
+
+
+def cache_key(report_type, params, version):
+    """Result cache key for a report request"""
+    payload = json.dumps([report_type, params, version], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# In-memory cache for small report results that are returned inline (JSON)
+_result_cache = TTLCache(ttl_seconds=3600, max_entries=500)
+
+
+def cached_report(report_type, filters, build, key_filters=None):
+    """
+    Return build() for these filters, reusing the previous result while the
+    data version of the report's scope is unchanged
+
+    Args:
+        report_type: Name distinguishing this report from others
+        filters: Scope filters (see SCOPE_FILTERS) plus any extra options
+        build: Zero-argument callable producing the result
+        key_filters: Coarser filters to key the result by (defaults to filters)
+    """
+    params = normalize_filters(filters)
+    key_filters = key_filters or filters
+    extra = {k: v for k, v in key_filters.items() if k not in SCOPE_FILTERS and v not in (None, '')}
+    key = cache_key(report_type, [normalize_filters(key_filters), extra], data_version(params))
+    return _result_cache.get_or_set(key, build)
+
+
+class ReportJobQueue:
+    """Queue front-end plus the worker pool that drains it"""
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = workers
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def submit(self, app, owner_id, report_type, filters, filename=None, key_filters=None):
+        """
+        Queue a report, or return a cached/pending job for the same request
+
+        Args:
+            app: Flask application (workers run inside its app context)
+            owner_id: User allowed to see and download the result
+            report_type: Key in REPORT_TYPES
+            filters: Scope filters (see SCOPE_FILTERS)
+            filename: Download filename (defaults to a timestamped name)
+            key_filters: Coarser filters to match cached and pending jobs by
+                         (defaults to filters)
+
+        Returns:
+            ReportJob (status 'completed' immediately on a cache hit)
+        """
+        if report_type not in REPORT_TYPES:
+            raise ValueError(f"Unknown report type: {report_type}")
+
+        report = REPORT_TYPES[report_type]
+        params = normalize_filters(filters)
+        version = data_version(params)
+        key = cache_key(report_type, normalize_filters(key_filters) if key_filters else params, version)
+        now = datetime.now(IST)
+
+        if filename is None:
+            filename = f"{report_type}_{now.strftime('%Y%m%d_%H%M%S')}.{report.extension}"
+
+        # Same request with unchanged data: hand back the stored artifact
+        cached = ReportJob.query.filter_by(cache_key=key, status='completed')\
+            .order_by(ReportJob.finished_at.desc()).first()
+        if cached and cached.result_path and os.path.exists(cached.result_path):
+            if cached.owner_id == owner_id:
+                return cached
+
+            job = ReportJob(
+                id=uuid.uuid4().hex, owner_id=owner_id, report_type=report_type,
+                params=params, cache_key=key, data_version=version, status='completed',
+                filename=filename, result_path=cached.result_path, row_count=cached.row_count,
+                cache_hit=True, started_at=now, finished_at=now
+            )
+            db.session.add(job)
+            db.session.commit()
+            return job
+
+        # Already queued or running for this user
+        pending = ReportJob.query.filter(
+            ReportJob.cache_key == key,
+            ReportJob.owner_id == owner_id,
+            ReportJob.status.in_(['queued', 'running'])
+        ).first()
+        if pending:
+            return pending
+
+        job = ReportJob(
+            id=uuid.uuid4().hex, owner_id=owner_id, report_type=report_type,
+            params=params, cache_key=key, data_version=version, status='queued',
+            filename=filename
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self.start(app)
+        self._wakeup.set()
+        return job
+
+    def get(self, job_id, owner_id=None):
+        """Get a job by ID, optionally restricted to its owner"""
+        job = db.session.get(ReportJob, job_id)
+        if job is None or (owner_id is not None and job.owner_id != owner_id):
+            return None
+        return job
+
+    def start(self, app):
+        """Start the worker pool once per process (recovering interrupted jobs first)"""
+        with self._lock:
+            if self._threads:
+                return
+
+            with app.app_context():
+                self.recover_stale_jobs()
+                self.cleanup(app)
+
+            workers = app.config.get('REPORT_JOB_WORKERS', self.workers)
+            for index in range(workers):
+                thread = threading.Thread(target=self._worker_loop, args=(app,),
+                                          name=f"report-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def recover_stale_jobs(self):
+        """Requeue jobs left 'running' by a crashed or restarted process"""
+        cutoff = datetime.now(IST) - STALE_JOB_TIMEOUT
+        stale = (ReportJob.status == 'running') & or_(
+            ReportJob.started_at == None, ReportJob.started_at < cutoff
+        )
+
+        db.session.execute(
+            update(ReportJob).where(stale, ReportJob.attempts < MAX_ATTEMPTS)
+            .values(status='queued', worker=None)
+        )
+        db.session.execute(
+            update(ReportJob).where(stale, ReportJob.attempts >= MAX_ATTEMPTS)
+            .values(status='failed', error='Worker stopped before the report finished',
+                    finished_at=datetime.now(IST))
+        )
+        db.session.commit()
+
+    def cleanup(self, app):
+        """Drop expired job rows and delete artifacts no remaining job references"""
+        cutoff = datetime.now(IST) - JOB_RETENTION
+        expired_paths = {path for (path,) in db.session.execute(
+            select(ReportJob.result_path).where(
+                ReportJob.created_at < cutoff,
+                ReportJob.status.in_(['completed', 'failed'])
+            )
+        ) if path}
+
+        db.session.execute(
+            ReportJob.__table__.delete().where(
+                ReportJob.created_at < cutoff,
+                ReportJob.status.in_(['completed', 'failed'])
+            )
+        )
+        db.session.commit()
+
+        if expired_paths:
+            still_used = {path for (path,) in db.session.execute(
+                select(ReportJob.result_path).where(ReportJob.result_path.in_(expired_paths))
+            )}
+            for path in expired_paths - still_used:
+                _remove_file(path)
+
+    def _worker_loop(self, app):
+        worker_name = threading.current_thread().name
+        while True:
+            with app.app_context():
+                try:
+                    job_id = self._claim(worker_name)
+                    if job_id:
+                        self._run(app, job_id)
+                except Exception:
+                    app.logger.exception("Report worker error")
+                    job_id = None
+                finally:
+                    db.session.remove()
+
+            if not job_id:
+                self._wakeup.wait(POLL_INTERVAL)
+                self._wakeup.clear()
+
+    def _claim(self, worker_name):
+        """Atomically move one queued job to 'running'; returns its ID or None"""
+        candidates = db.session.execute(
+            select(ReportJob.id).where(ReportJob.status == 'queued')
+            .order_by(ReportJob.created_at).limit(5)
+        ).scalars().all()
+
+        for job_id in candidates:
+            result = db.session.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id, ReportJob.status == 'queued')
+                .values(status='running', worker=worker_name,
+                        started_at=datetime.now(IST), attempts=ReportJob.attempts + 1)
+            )
+            db.session.commit()
+            if result.rowcount == 1:
+                return job_id
+
+        return None
+
+    def _run(self, app, job_id):
+        job = db.session.get(ReportJob, job_id)
+        report = REPORT_TYPES[job.report_type]
+
+        results_dir = app.config.get('REPORT_RESULTS_DIR') or os.path.join(app.instance_path, 'reports')
+        os.makedirs(results_dir, exist_ok=True)
+
+        # Artifacts are named by cache key; identical requests share one file
+        path = os.path.join(results_dir, f"{job.cache_key}.{report.extension}")
+        temp_path = f"{path}.{job.id}.tmp"
+
+        try:
+            row_count = report.build(temp_path, job.params)
+            os.replace(temp_path, path)
+
+            job.status = 'completed'
+            job.result_path = path
+            job.row_count = row_count
+            job.error = None
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception(f"Report job {job_id} failed")
+            _remove_file(temp_path)
+
+            job = db.session.get(ReportJob, job_id)
+            job.status = 'failed'
+            job.error = str(e)
+
+        job.finished_at = datetime.now(IST)
+        db.session.commit()
+
+
+def send_report_result(job):
+    """Flask response for downloading a job's artifact (409 until it is ready)"""
+    from flask import jsonify, send_file
+
+    if job.status != 'completed' or not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({'error': 'Report is not ready', 'status': job.status}), 409
+
+    return send_file(job.result_path, mimetype=REPORT_TYPES[job.report_type].mimetype,
+                     as_attachment=True, download_name=job.filename)
+
+
+def _remove_file(path):
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+report_jobs = ReportJobQueue()
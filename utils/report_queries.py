@@ -0,0 +1,159 @@
+"""
+Report queries
+Shared SQL for the report exporters, built as plain column projections so the
+callers can stream rows without materializing ORM objects
+"""
+from sqlalchemy import select
+
+
+def attendance_export_select(columns, course_id=None, student_id=None, teacher_id=None,
+                             start_date=None, end_date=None):
+    """
+    Build the attendance export SELECT over attendance, lecture, course and student
+
+    Args:
+        columns: Columns to project (any of Attendance, Lecture, Course, User)
+        course_id: Optional course filter
+        student_id: Optional student filter
+        teacher_id: Optional lecture teacher filter
+        start_date: Optional lower bound on Lecture.scheduled_start
+        end_date: Optional upper bound on Lecture.scheduled_start
+
+    Returns:
+        SQLAlchemy Select ordered by lecture start (newest first)
+    """
+    from models.attendance import Attendance
+    from models.lecture import Lecture
+    from models.course import Course
+    from models.user import User
+
+    stmt = select(*columns).select_from(Attendance)\
+        .join(Lecture, Attendance.lecture_id == Lecture.id)\
+        .join(Course, Lecture.course_id == Course.id)\
+        .join(User, Attendance.student_id == User.id)
+
+    # Apply filters
+    if course_id:
+        stmt = stmt.where(Course.id == course_id)
+
+    if student_id:
+        stmt = stmt.where(Attendance.student_id == student_id)
+
+    if teacher_id:
+        stmt = stmt.where(Lecture.teacher_id == teacher_id)
+
+    if start_date:
+        stmt = stmt.where(Lecture.scheduled_start >= start_date)
+
+    if end_date:
+        stmt = stmt.where(Lecture.scheduled_start <= end_date)
+
+    return stmt.order_by(Lecture.scheduled_start.desc(), Attendance.id)
+
+
+def lecture_attendance_aggregates(teacher_id=None, course_id=None, start_date=None, end_date=None):
+    """
+    Per-lecture attendance aggregates in a single GROUP BY
+
+    Counts each status over the lecture's attendance rows and joins the
+    course's active enrollment count from a grouped enrollments subquery, so
+    the cost does not depend on the number of lectures.
+
+    Returns:
+        Rows with lecture_id, title, scheduled_start, course_id, course_code,
+        course_name, present, late, absent, excused and enrolled, newest first
+    """
+    from extensions import db
+    from sqlalchemy import func, case
+    from models.attendance import Attendance
+    from models.lecture import Lecture
+    from models.course import Course
+    from models.enrollment import Enrollment
+
+    enrolled = select(
+        Enrollment.course_id.label('course_id'),
+        func.count(Enrollment.id).label('enrolled')
+    ).where(Enrollment.is_active == True)\
+        .group_by(Enrollment.course_id)\
+        .subquery()
+
+    def status_count(status):
+        return func.count(case((Attendance.status == status, Attendance.id))).label(status)
+
+    stmt = select(
+        Lecture.id.label('lecture_id'),
+        Lecture.title,
+        Lecture.scheduled_start,
+        Course.id.label('course_id'),
+        Course.code.label('course_code'),
+        Course.name.label('course_name'),
+        status_count('present'),
+        status_count('late'),
+        status_count('absent'),
+        status_count('excused'),
+        func.coalesce(enrolled.c.enrolled, 0).label('enrolled')
+    ).select_from(Lecture)\
+        .join(Course, Lecture.course_id == Course.id)\
+        .outerjoin(Attendance, Attendance.lecture_id == Lecture.id)\
+        .outerjoin(enrolled, enrolled.c.course_id == Course.id)
+
+    # Apply filters
+    if teacher_id:
+        stmt = stmt.where(Lecture.teacher_id == teacher_id)
+
+    if course_id:
+        stmt = stmt.where(Lecture.course_id == course_id)
+
+    if start_date:
+        stmt = stmt.where(Lecture.scheduled_start >= start_date)
+
+    if end_date:
+        stmt = stmt.where(Lecture.scheduled_start <= end_date)
+
+    stmt = stmt.group_by(
+        Lecture.id, Lecture.title, Lecture.scheduled_start,
+        Course.id, Course.code, Course.name, enrolled.c.enrolled
+    ).order_by(Lecture.scheduled_start.desc())
+
+    return db.session.execute(stmt).all()
+
+
+def attendance_rate(present, enrolled):
+    """Present percentage of enrolled students (0 when nobody is enrolled)"""
+    return round((present / enrolled * 100), 2) if enrolled > 0 else 0
+
+
+def course_attendance_aggregates(lecture_rows):
+    """
+    Fold per-lecture aggregate rows into per-course totals
+
+    Returns:
+        List of dicts with code, name, total_lectures, total_students,
+        present/late/absent totals and avg_attendance (mean lecture rate)
+    """
+    courses = {}
+    for row in lecture_rows:
+        course = courses.get(row.course_id)
+        if course is None:
+            course = courses[row.course_id] = {
+                'code': row.course_code,
+                'name': row.course_name,
+                'total_lectures': 0,
+                'total_attendance': 0,
+                'total_students': row.enrolled,
+                'present': 0,
+                'late': 0,
+                'absent': 0
+            }
+
+        course['total_lectures'] += 1
+        course['total_attendance'] += attendance_rate(row.present, row.enrolled)
+        course['present'] += row.present
+        course['late'] += row.late
+        course['absent'] += row.absent
+
+    for course in courses.values():
+        course['avg_attendance'] = round(course['total_attendance'] / course['total_lectures'], 1) \
+            if course['total_lectures'] > 0 else 0
+
+    return list(courses.values())
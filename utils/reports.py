@@ -2,12 +2,14 @@ import csv
 import io
 from datetime import datetime, timedelta
 from flask import current_app
+from sqlalchemy.orm import joinedload
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 import pandas as pd
+from utils.attendance_matrix import AttendanceMatrix, PRESENT, LATE, ABSENT
 
 def generate_attendance_report(course_id=None, student_id=None, start_date=None, end_date=None, format='dict'):
     """
@@ -18,6 +20,12 @@ def generate_attendance_report(course_id=None, student_id=None, start_date=None,
     from models.course import Course
     from models.user import User
     
+    if format == 'arrow':
+        # Columnar path for analytics: reads the cursor in chunks, no ORM objects
+        from utils.columnar_export import attendance_table
+        return attendance_table(course_id=course_id, student_id=student_id,
+                                start_date=start_date, end_date=end_date)
+    
     query = Attendance.query.join(Lecture).join(Course).join(User)
     
     # Apply filters
@@ -36,7 +44,8 @@ def generate_attendance_report(course_id=None, student_id=None, start_date=None,
     attendances = query.order_by(Lecture.scheduled_start.desc()).all()
     
     if format == 'dict':
-        return [attendance.to_dict() for attendance in attendances]
+        from utils.serializers import AttendanceSerializer
+        return AttendanceSerializer().serialize(attendances)
     elif format == 'dataframe':
         data = []
         for attendance in attendances:
@@ -79,17 +88,143 @@ def export_to_csv(data, filename=None):
     output.seek(0)
     return output.getvalue(), filename
 
-def export_to_pdf(data, title="Attendance Report", filename=None):
+# Column headers for the flat attendance export, in output order
+ATTENDANCE_EXPORT_HEADERS = [
+    'Student Name', 'Student ID', 'Course Code', 'Course Name', 'Lecture Title',
+    'Scheduled Date', 'Scheduled Time', 'Status', 'Marked At', 'Distance (m)', 'Auto Marked'
+]
+
+def iter_attendance_report_rows(course_id=None, student_id=None, start_date=None, end_date=None,
+                                teacher_id=None, chunk_size=1000):
     """
-    Export attendance data to PDF format
+    Stream attendance report rows as flat tuples, one chunk at a time
+
+    Selects plain columns rather than ORM objects and fetches through a
+    server-side cursor, so memory use does not grow with the report size.
+
+    Yields:
+        Lists of up to chunk_size rows ordered like ATTENDANCE_EXPORT_HEADERS
+    """
+    from extensions import db
+    from models.attendance import Attendance
+    from models.lecture import Lecture
+    from models.course import Course
+    from models.user import User
+    from utils.report_queries import attendance_export_select
+    
+    stmt = attendance_export_select(
+        [
+            User.first_name,
+            User.last_name,
+            User.student_id,
+            Course.code,
+            Course.name,
+            Lecture.title,
+            Lecture.scheduled_start,
+            Attendance.status,
+            Attendance.marked_at,
+            Attendance.distance_from_lecture,
+            Attendance.auto_marked
+        ],
+        course_id=course_id,
+        student_id=student_id,
+        teacher_id=teacher_id,
+        start_date=start_date,
+        end_date=end_date
+    )
+    
+    # yield_per implies stream_results (server-side cursor where the driver supports it)
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    
+    for partition in result.partitions():
+        yield [_format_export_row(row) for row in partition]
+
+def _format_export_row(row):
+    """Format one projected attendance row the same way as the dataframe report"""
+    (first_name, last_name, student_number, course_code, course_name, lecture_title,
+     scheduled_start, status, marked_at, distance, auto_marked) = row
+    
+    return (
+        f"{first_name} {last_name}",
+        student_number,
+        course_code,
+        course_name,
+        lecture_title,
+        scheduled_start.strftime('%Y-%m-%d') if scheduled_start else '',
+        scheduled_start.strftime('%H:%M') if scheduled_start else '',
+        status.title() if status else '',
+        marked_at.strftime('%Y-%m-%d %H:%M:%S') if marked_at else '',
+        distance,
+        'Yes' if auto_marked else 'No'
+    )
+
+def stream_attendance_csv(filename=None, chunk_size=1000, **filters):
+    """
+    Export attendance data as a stream of CSV text chunks
+    
+    Accepts the same filters as iter_attendance_report_rows. Wrap the
+    generator with flask.stream_with_context when returning it from a view.
+    
+    Returns:
+        Tuple of (generator of CSV strings, filename)
     """
     if filename is None:
-        filename = f"attendance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        filename = f"attendance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    def generate():
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        writer.writerow(ATTENDANCE_EXPORT_HEADERS)
+        yield output.getvalue()
+        
+        for rows in iter_attendance_report_rows(chunk_size=chunk_size, **filters):
+            output.seek(0)
+            output.truncate(0)
+            writer.writerows(rows)
+            yield output.getvalue()
+    
+    return generate(), filename
+
+def write_attendance_csv(destination, chunk_size=1000, **filters):
+    """
+    Write the streamed attendance CSV to a file path
     
-    # Styles
+    Returns:
+        Number of attendance rows written
+    """
+    row_count = 0
+    
+    with open(destination, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.writer(output)
+        writer.writerow(ATTENDANCE_EXPORT_HEADERS)
+        for rows in iter_attendance_report_rows(chunk_size=chunk_size, **filters):
+            writer.writerows(rows)
+            row_count += len(rows)
+    
+    return row_count
+
+# Rows per reportlab Table; each block is laid out on its own instead of
+# splitting one huge table across pages, which is quadratic in its row count
+PDF_ROWS_PER_TABLE = 40
+
+PDF_HEADERS = ['Student Name', 'Course', 'Lecture', 'Date', 'Status', 'Marked At']
+
+PDF_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+def _pdf_title_story(title):
+    """Title and generation info flowables shared by the PDF exports"""
     styles = getSampleStyleSheet()
     title_style = ParagraphStyle(
         'CustomTitle',
@@ -99,66 +234,155 @@ def export_to_pdf(data, title="Attendance Report", filename=None):
         alignment=1  # Center alignment
     )
     
-    # Build PDF content
-    story = []
+    info_text = f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    return [
+        Paragraph(title, title_style),
+        Spacer(1, 12),
+        Paragraph(info_text, styles['Normal']),
+        Spacer(1, 20)
+    ]
+
+def _pdf_tables(headers, rows, rows_per_table=PDF_ROWS_PER_TABLE):
+    """
+    Split rows into fixed-size Table blocks, each repeating the header row
+
+    Yields:
+        reportlab Table flowables
+    """
+    block = []
+    for row in rows:
+        block.append(row)
+        if len(block) >= rows_per_table:
+            yield _pdf_table(headers, block)
+            block = []
+    
+    if block:
+        yield _pdf_table(headers, block)
+
+def _pdf_table(headers, block):
+    table = Table([headers] + block, repeatRows=1)
+    table.setStyle(PDF_TABLE_STYLE)
+    return table
+
+class _StreamingStory(list):
+    """
+    Story that doc.build consumes from the front and that refills itself from
+    an iterator whenever it runs empty, so table blocks are created as layout
+    reaches them and released once drawn instead of all existing up front
+    """
     
-    # Title
-    story.append(Paragraph(title, title_style))
-    story.append(Spacer(1, 12))
+    def __init__(self, head, tail):
+        super().__init__(head)
+        self._tail = iter(tail)
     
-    # Generation info
-    info_text = f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-    story.append(Paragraph(info_text, styles['Normal']))
-    story.append(Spacer(1, 20))
+    def __len__(self):
+        if not list.__len__(self):
+            flowable = next(self._tail, None)
+            if flowable is not None:
+                self.append(flowable)
+        return list.__len__(self)
+
+def _pdf_story(title, headers, rows, rows_per_table=PDF_ROWS_PER_TABLE):
+    """Title flowables followed by table blocks generated lazily from rows"""
+    def tables():
+        empty = True
+        for table in _pdf_tables(headers, rows, rows_per_table):
+            empty = False
+            yield table
+        if empty:
+            yield _pdf_table(['No data available'], [])
+    
+    return _StreamingStory(_pdf_title_story(title), tables())
+
+def export_to_pdf(data, title="Attendance Report", filename=None, rows_per_table=PDF_ROWS_PER_TABLE):
+    """
+    Export attendance data to PDF format
+    """
+    if filename is None:
+        filename = f"attendance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
     
     if isinstance(data, pd.DataFrame):
         # Convert DataFrame to list of lists for table
-        table_data = [data.columns.tolist()] + data.values.tolist()
+        headers = data.columns.tolist()
+        rows = data.values.tolist()
     else:
         # Convert list of dicts to table format
-        if data:
-            headers = ['Student Name', 'Course', 'Lecture', 'Date', 'Status', 'Marked At']
-            table_data = [headers]
-            
-            for item in data:
-                row = [
-                    item.get('student_name', ''),
-                    f"{item.get('course_code', '')} - {item.get('course_name', '')}",
-                    item.get('lecture_title', ''),
-                    item.get('marked_at', '').split('T')[0] if item.get('marked_at') else '',
-                    item.get('status', '').title(),
-                    item.get('marked_at', '').split('T')[1][:8] if item.get('marked_at') else ''
-                ]
-                table_data.append(row)
-        else:
-            table_data = [['No data available']]
-    
-    # Create table
-    table = Table(table_data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(table)
+        headers = PDF_HEADERS
+        rows = []
+        
+        for item in data or []:
+            rows.append([
+                item.get('student_name', ''),
+                f"{item.get('course_code', '')} - {item.get('course_name', '')}",
+                item.get('lecture_title', ''),
+                item.get('marked_at', '').split('T')[0] if item.get('marked_at') else '',
+                item.get('status', '').title(),
+                item.get('marked_at', '').split('T')[1][:8] if item.get('marked_at') else ''
+            ])
     
     # Build PDF
-    doc.build(story)
+    doc.build(_pdf_story(title, headers, rows, rows_per_table))
     buffer.seek(0)
     
     return buffer.getvalue(), filename
 
+def write_attendance_pdf(destination, title="Attendance Report", rows_per_table=PDF_ROWS_PER_TABLE,
+                         chunk_size=1000, **filters):
+    """
+    Write an attendance report PDF straight from the streaming row query
+    
+    Intended for background jobs: rows come from iter_attendance_report_rows
+    (flat tuples, no ORM objects) and are laid out in fixed-size table blocks
+    that are only created as the layout reaches them, so neither the rows nor
+    the Table flowables are held for the whole report. The rendered pages are
+    still kept by reportlab until the file is written.
+    
+    Args:
+        destination: File path or writable binary file object
+        title: Report title
+        rows_per_table: Rows per table block
+        chunk_size: Rows fetched from the cursor at a time
+        **filters: course_id, student_id, teacher_id, start_date, end_date
+    
+    Returns:
+        Number of attendance rows written
+    """
+    doc = SimpleDocTemplate(destination, pagesize=A4)
+    row_count = 0
+    
+    def pdf_rows():
+        nonlocal row_count
+        for chunk in iter_attendance_report_rows(chunk_size=chunk_size, **filters):
+            for (student_name, _, course_code, course_name, lecture_title,
+                 _, _, status, marked_at, _, _) in chunk:
+                row_count += 1
+                date_part, _, time_part = marked_at.partition(' ')
+                yield [
+                    student_name,
+                    f"{course_code} - {course_name}",
+                    lecture_title,
+                    date_part,
+                    status,
+                    time_part
+                ]
+    
+    doc.build(_pdf_story(title, PDF_HEADERS, pdf_rows(), rows_per_table))
+    return row_count
+
 def generate_course_summary(course_id, start_date=None, end_date=None):
     """
     Generate course attendance summary
+    
+    Every figure is taken from the same roster x lectures matrix: actively
+    enrolled students and the course's active lectures within the date range.
+    Per-student present/late/absent counts therefore only cover the lectures
+    in the report (they used to count every lecture of the course while the
+    rate divided by the filtered number), and per-lecture counts and rates
+    only include currently enrolled students (the lecture counter columns
+    also count students who have since left the course).
     """
     from models.course import Course
     from models.enrollment import Enrollment
@@ -170,7 +394,9 @@ def generate_course_summary(course_id, start_date=None, end_date=None):
         return None
     
     # Get enrollments
-    enrollments = Enrollment.query.filter_by(course_id=course_id, is_active=True).all()
+    enrollments = Enrollment.query.options(joinedload(Enrollment.student))\
+        .filter_by(course_id=course_id, is_active=True)\
+        .order_by(Enrollment.student_id).all()
     
     # Get lectures in date range
     lecture_query = Lecture.query.filter_by(course_id=course_id, is_active=True)
@@ -179,43 +405,59 @@ def generate_course_summary(course_id, start_date=None, end_date=None):
     if end_date:
         lecture_query = lecture_query.filter(Lecture.scheduled_start <= end_date)
     
-    lectures = lecture_query.order_by(Lecture.scheduled_start).all()
+    lectures = lecture_query.options(joinedload(Lecture.course), joinedload(Lecture.teacher))\
+        .order_by(Lecture.scheduled_start).all()
+    
+    # One query for every (student, lecture, status) cell of the course
+    matrix = AttendanceMatrix.load([e.student_id for e in enrollments],
+                                   [l.id for l in lectures])
     
     summary = {
         'course': course.to_dict(),
         'total_students': len(enrollments),
         'total_lectures': len(lectures),
+        'attendance_trend': round(matrix.lecture_trend(), 2),
         'students': [],
         'lectures': []
     }
     
     # Student summaries
-    for enrollment in enrollments:
-        student_attendances = Attendance.query.join(Lecture).filter(
-            Attendance.student_id == enrollment.student_id,
-            Lecture.course_id == course_id
-        ).all()
-        
-        present_count = sum(1 for a in student_attendances if a.status == 'present')
-        late_count = sum(1 for a in student_attendances if a.status == 'late')
-        absent_count = sum(1 for a in student_attendances if a.status == 'absent')
-        
-        attendance_rate = (present_count + late_count) / len(lectures) * 100 if lectures else 0
-        
+    present = matrix.count(PRESENT, axis=1)
+    late = matrix.count(LATE, axis=1)
+    absent = matrix.count(ABSENT, axis=1)
+    rates = matrix.student_rates()
+    streaks = matrix.current_streaks()
+    absence_streaks = matrix.longest_absence_streaks()
+    trends = matrix.student_trends()
+    
+    for i, enrollment in enumerate(enrollments):
         summary['students'].append({
             'student': enrollment.student.to_dict(),
-            'present': present_count,
-            'late': late_count,
-            'absent': absent_count,
-            'attendance_rate': round(attendance_rate, 2)
+            'present': int(present[i]),
+            'late': int(late[i]),
+            'absent': int(absent[i]),
+            'attendance_rate': round(float(rates[i]), 2),
+            'current_streak': int(streaks[i]),
+            'longest_absence_streak': int(absence_streaks[i]),
+            'trend': round(float(trends[i]), 2)
         })
     
     # Lecture summaries
-    for lecture in lectures:
-        stats = lecture.get_attendance_stats()
+    lecture_present = matrix.count(PRESENT, axis=0)
+    lecture_late = matrix.count(LATE, axis=0)
+    lecture_absent = matrix.count(ABSENT, axis=0)
+    lecture_rates = matrix.lecture_rates()
+    
+    for j, lecture in enumerate(lectures):
         summary['lectures'].append({
             'lecture': lecture.to_dict(),
-            'stats': stats
+            'stats': {
+                'total_enrolled': len(enrollments),
+                'present': int(lecture_present[j]),
+                'absent': int(lecture_absent[j]),
+                'late': int(lecture_late[j]),
+                'attendance_rate': round(float(lecture_rates[j]), 2)
+            }
         })
     
-    return summary
\ No newline at end of file
+    return summary
@@ -0,0 +1,325 @@
+"""
+Projection-based serializers
+Serialize lists of models with only the requested fields. Relationships and
+aggregates needed by those fields are batch-loaded once for the whole list,
+so the number of queries does not grow with the number of rows.
+"""
+import json
+from extensions import db
+from sqlalchemy import func
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+class Serializer:
+    """
+    Base serializer
+
+    Subclasses declare FIELDS as {name: (loaders, getter)} where loaders is a
+    tuple of batch loader names the field depends on and getter is called as
+    getter(obj, ctx). Each loader is a method named _load_<name> that fills
+    ctx for the whole list with a single query.
+    """
+
+    FIELDS = {}
+    LOADER_ORDER = ()
+
+    def __init__(self, fields=None):
+        if fields is None:
+            fields = list(self.FIELDS)
+
+        unknown = [f for f in fields if f not in self.FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields for {type(self).__name__}: {', '.join(unknown)}")
+
+        self.fields = list(fields)
+
+    def _required_loaders(self):
+        required = set()
+        for field in self.fields:
+            required.update(self.FIELDS[field][0])
+        # Respect declared ordering so dependent loaders run after their inputs
+        return [name for name in self.LOADER_ORDER if name in required]
+
+    def serialize(self, objects):
+        """Serialize a list of model instances"""
+        objects = list(objects)
+        ctx = {}
+
+        if objects:
+            for loader in self._required_loaders():
+                getattr(self, f'_load_{loader}')(objects, ctx)
+
+        getters = [(field, self.FIELDS[field][1]) for field in self.fields]
+        return [{field: getter(obj, ctx) for field, getter in getters} for obj in objects]
+
+    def serialize_one(self, obj):
+        """Serialize a single instance"""
+        return self.serialize([obj])[0]
+
+    @staticmethod
+    def _load_by_id(model, ids):
+        ids = {i for i in ids if i is not None}
+        if not ids:
+            return {}
+        return {obj.id: obj for obj in model.query.filter(model.id.in_(ids)).all()}
+
+
+# ============================================================================
+# ATTENDANCE
+# ============================================================================
+
+def _attendance_lecture(a, ctx):
+    return ctx['lectures'].get(a.lecture_id)
+
+
+def _attendance_course(a, ctx):
+    lecture = _attendance_lecture(a, ctx)
+    return ctx['courses'].get(lecture.course_id) if lecture else None
+
+
+def _attendance_valid_location(a, ctx):
+    lecture = _attendance_lecture(a, ctx)
+    if not (a.student_latitude and a.student_longitude and lecture):
+        return False
+    return a.distance_from_lecture <= lecture.geofence_radius
+
+
+class AttendanceSerializer(Serializer):
+    """Serializer producing the same keys as Attendance.to_dict"""
+
+    LOADER_ORDER = ('students', 'lectures', 'courses')
+
+    FIELDS = {
+        'id': ((), lambda a, ctx: a.id),
+        'student_id': ((), lambda a, ctx: a.student_id),
+        'student_name': (('students',), lambda a, ctx: ctx['students'][a.student_id].full_name
+                         if a.student_id in ctx['students'] else None),
+        'student_username': (('students',), lambda a, ctx: ctx['students'][a.student_id].username
+                             if a.student_id in ctx['students'] else None),
+        'lecture_id': ((), lambda a, ctx: a.lecture_id),
+        'lecture_title': (('lectures',), lambda a, ctx: _attendance_lecture(a, ctx).title
+                          if _attendance_lecture(a, ctx) else None),
+        'course_name': (('lectures', 'courses'), lambda a, ctx: _attendance_course(a, ctx).name
+                        if _attendance_course(a, ctx) else None),
+        'course_code': (('lectures', 'courses'), lambda a, ctx: _attendance_course(a, ctx).code
+                        if _attendance_course(a, ctx) else None),
+        'status': ((), lambda a, ctx: a.status),
+        'status_color': ((), lambda a, ctx: a.get_status_color()),
+        'marked_latitude': ((), lambda a, ctx: a.student_latitude),
+        'marked_longitude': ((), lambda a, ctx: a.student_longitude),
+        'distance_from_lecture': ((), lambda a, ctx: a.distance_from_lecture),
+        'marked_at': ((), lambda a, ctx: _isoformat(a.marked_at)),
+        'auto_marked': ((), lambda a, ctx: a.auto_marked),
+        'notes': ((), lambda a, ctx: a.notes),
+        'is_valid_location': (('lectures',), _attendance_valid_location),
+        'created_at': ((), lambda a, ctx: _isoformat(a.created_at)),
+    }
+
+    def _load_students(self, attendances, ctx):
+        from models.user import User
+        ctx['students'] = self._load_by_id(User, (a.student_id for a in attendances))
+
+    def _load_lectures(self, attendances, ctx):
+        from models.lecture import Lecture
+        ctx['lectures'] = self._load_by_id(Lecture, (a.lecture_id for a in attendances))
+
+    def _load_courses(self, attendances, ctx):
+        from models.course import Course
+        ctx['courses'] = self._load_by_id(Course, (l.course_id for l in ctx['lectures'].values()))
+
+
+# ============================================================================
+# LECTURE
+# ============================================================================
+
+def _lecture_course(l, ctx):
+    return ctx['courses'].get(l.course_id)
+
+
+def _lecture_teacher(l, ctx):
+    return ctx['teachers'].get(l.teacher_id)
+
+
+def _lecture_stats(l, ctx):
+    course = _lecture_course(l, ctx)
+    total_enrolled = course.get_enrollment_count() if course else 0
+    present_count = l.present_count or 0
+    return {
+        'total_enrolled': total_enrolled,
+        'present': present_count,
+        'absent': l.absent_count or 0,
+        'late': l.late_count or 0,
+        'attendance_rate': round((present_count / total_enrolled * 100), 2) if total_enrolled > 0 else 0
+    }
+
+
+def _is_rectangular(l):
+    return l.geofence_type == 'rectangular' and bool(l.boundary_coordinates)
+
+
+def _lecture_boundary(l):
+    if not _is_rectangular(l):
+        return None
+    try:
+        return json.loads(l.boundary_coordinates)
+    except ValueError:
+        return None
+
+
+class LectureSerializer(Serializer):
+    """Serializer producing the same keys as Lecture.to_dict
+
+    Boundary fields are always present and None for non-rectangular lectures.
+    """
+
+    LOADER_ORDER = ('courses', 'teachers')
+
+    FIELDS = {
+        'id': ((), lambda l, ctx: l.id),
+        'course_id': ((), lambda l, ctx: l.course_id),
+        'course_name': (('courses',), lambda l, ctx: _lecture_course(l, ctx).name
+                        if _lecture_course(l, ctx) else None),
+        'course_code': (('courses',), lambda l, ctx: _lecture_course(l, ctx).code
+                        if _lecture_course(l, ctx) else None),
+        'teacher_id': ((), lambda l, ctx: l.teacher_id),
+        'teacher_name': (('teachers',), lambda l, ctx: _lecture_teacher(l, ctx).full_name
+                         if _lecture_teacher(l, ctx) else None),
+        'title': ((), lambda l, ctx: l.title),
+        'description': ((), lambda l, ctx: l.description),
+        'latitude': ((), lambda l, ctx: l.latitude),
+        'longitude': ((), lambda l, ctx: l.longitude),
+        'location_name': ((), lambda l, ctx: l.location_name),
+        'geofence_radius': ((), lambda l, ctx: l.geofence_radius),
+        'geofence_type': ((), lambda l, ctx: l.geofence_type),
+        'scheduled_start': ((), lambda l, ctx: _isoformat(l.scheduled_start)),
+        'scheduled_end': ((), lambda l, ctx: _isoformat(l.scheduled_end)),
+        'actual_start': ((), lambda l, ctx: _isoformat(l.actual_start)),
+        'actual_end': ((), lambda l, ctx: _isoformat(l.actual_end)),
+        'status': ((), lambda l, ctx: l.status),
+        'is_active': ((), lambda l, ctx: l.is_active),
+        'attendance_window_start': ((), lambda l, ctx: l.attendance_window_start),
+        'attendance_window_end': ((), lambda l, ctx: l.attendance_window_end),
+        'auto_mark_attendance': ((), lambda l, ctx: l.auto_mark_attendance),
+        'is_attendance_window_open': ((), lambda l, ctx: l.is_attendance_window_open()),
+        'attendance_stats': (('courses',), _lecture_stats),
+        'created_at': ((), lambda l, ctx: _isoformat(l.created_at)),
+        'boundary': ((), lambda l, ctx: _lecture_boundary(l)),
+        'boundary_area_sqm': ((), lambda l, ctx: l.boundary_area_sqm if _is_rectangular(l) else None),
+        'boundary_perimeter_m': ((), lambda l, ctx: l.boundary_perimeter_m if _is_rectangular(l) else None),
+        'gps_accuracy_threshold': ((), lambda l, ctx: l.gps_accuracy_threshold if _is_rectangular(l) else None),
+        'boundary_tolerance_m': ((), lambda l, ctx: l.boundary_tolerance_m if _is_rectangular(l) else None),
+        'acceptance_probability': ((), lambda l, ctx: l.acceptance_probability if _is_rectangular(l) else None),
+    }
+
+    def _load_courses(self, lectures, ctx):
+        from models.course import Course
+        ctx['courses'] = self._load_by_id(Course, (l.course_id for l in lectures))
+
+    def _load_teachers(self, lectures, ctx):
+        from models.user import User
+        ctx['teachers'] = self._load_by_id(User, (l.teacher_id for l in lectures))
+
+
+# ============================================================================
+# COURSE
+# ============================================================================
+
+class CourseSerializer(Serializer):
+    """Serializer producing the same keys as Course.to_dict"""
+
+    LOADER_ORDER = ('teachers', 'total_lectures')
+
+    FIELDS = {
+        'id': ((), lambda c, ctx: c.id),
+        'code': ((), lambda c, ctx: c.code),
+        'name': ((), lambda c, ctx: c.name),
+        'description': ((), lambda c, ctx: c.description),
+        'teacher_id': ((), lambda c, ctx: c.teacher_id),
+        'teacher_name': (('teachers',), lambda c, ctx: ctx['teachers'][c.teacher_id].full_name
+                         if c.teacher_id in ctx['teachers'] else None),
+        'credits': ((), lambda c, ctx: c.credits),
+        'semester': ((), lambda c, ctx: c.semester),
+        'academic_year': ((), lambda c, ctx: c.academic_year),
+        'is_active': ((), lambda c, ctx: c.is_active),
+        'enrollment_count': ((), lambda c, ctx: c.get_enrollment_count()),
+        'total_lectures': (('total_lectures',), lambda c, ctx: ctx['total_lectures'].get(c.id, 0)),
+        'created_at': ((), lambda c, ctx: _isoformat(c.created_at)),
+    }
+
+    def _load_teachers(self, courses, ctx):
+        from models.user import User
+        ctx['teachers'] = self._load_by_id(User, (c.teacher_id for c in courses))
+
+    def _load_total_lectures(self, courses, ctx):
+        from models.lecture import Lecture
+        rows = db.session.query(Lecture.course_id, func.count(Lecture.id))\
+            .filter(Lecture.course_id.in_({c.id for c in courses}),
+                    Lecture.is_active == True)\
+            .group_by(Lecture.course_id).all()
+        ctx['total_lectures'] = dict(rows)
+
+
+# ============================================================================
+# ENROLLMENT
+# ============================================================================
+
+def _enrollment_percentage(e, ctx):
+    total_lectures = ctx['lecture_totals'].get(e.course_id, 0)
+    if total_lectures == 0:
+        return 0
+    attended = ctx['present_totals'].get((e.student_id, e.course_id), 0)
+    return round((attended / total_lectures) * 100, 2)
+
+
+class EnrollmentSerializer(Serializer):
+    """Serializer producing the same keys as Enrollment.to_dict"""
+
+    LOADER_ORDER = ('students', 'courses', 'attendance_percentage')
+
+    FIELDS = {
+        'id': ((), lambda e, ctx: e.id),
+        'student_id': ((), lambda e, ctx: e.student_id),
+        'course_id': ((), lambda e, ctx: e.course_id),
+        'student_name': (('students',), lambda e, ctx: ctx['students'][e.student_id].full_name
+                         if e.student_id in ctx['students'] else None),
+        'course_name': (('courses',), lambda e, ctx: ctx['courses'][e.course_id].name
+                        if e.course_id in ctx['courses'] else None),
+        'course_code': (('courses',), lambda e, ctx: ctx['courses'][e.course_id].code
+                        if e.course_id in ctx['courses'] else None),
+        'enrollment_date': ((), lambda e, ctx: _isoformat(e.enrollment_date)),
+        'is_active': ((), lambda e, ctx: e.is_active),
+        'grade': ((), lambda e, ctx: e.grade),
+        'attendance_percentage': (('attendance_percentage',), _enrollment_percentage),
+    }
+
+    def _load_students(self, enrollments, ctx):
+        from models.user import User
+        ctx['students'] = self._load_by_id(User, (e.student_id for e in enrollments))
+
+    def _load_courses(self, enrollments, ctx):
+        from models.course import Course
+        ctx['courses'] = self._load_by_id(Course, (e.course_id for e in enrollments))
+
+    def _load_attendance_percentage(self, enrollments, ctx):
+        from models.lecture import Lecture
+        from models.attendance import Attendance
+
+        course_ids = {e.course_id for e in enrollments}
+        student_ids = {e.student_id for e in enrollments}
+
+        lecture_rows = db.session.query(Lecture.course_id, func.count(Lecture.id))\
+            .filter(Lecture.course_id.in_(course_ids), Lecture.is_active == True)\
+            .group_by(Lecture.course_id).all()
+        ctx['lecture_totals'] = dict(lecture_rows)
+
+        present_rows = db.session.query(
+            Attendance.student_id, Lecture.course_id, func.count(Attendance.id)
+        ).join(Lecture, Attendance.lecture_id == Lecture.id)\
+            .filter(Attendance.student_id.in_(student_ids),
+                    Lecture.course_id.in_(course_ids),
+                    Attendance.status == 'present')\
+            .group_by(Attendance.student_id, Lecture.course_id).all()
+        ctx['present_totals'] = {(s, c): n for s, c, n in present_rows}
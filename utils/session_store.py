@@ -0,0 +1,168 @@
+"""
+Shared session stores
+Small key/value stores with per-key expiry for state that must outlive a
+single request and be visible to every worker process (e.g. the teacher
+location confirmation sessions). Values are JSON-serializable dicts.
+
+Backends, chosen by URI:
+    memory://                  per-process dict (single worker / tests)
+    sqlite:///path/to/file.db  shared file, works across gunicorn workers
+    redis://host:port/db       any Redis-protocol server (needs the redis package)
+"""
+from abc import ABC, abstractmethod
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class SessionStore(ABC):
+    """Interface shared by the backends"""
+
+    @abstractmethod
+    def get(self, key):
+        """Return the stored dict, or None when missing or expired"""
+
+    @abstractmethod
+    def set(self, key, value, ttl_seconds):
+        """Store a dict under key for ttl_seconds"""
+
+    @abstractmethod
+    def delete(self, key):
+        """Remove key if present"""
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process store; expiry is tracked in a min-heap of (expires_at, key)
+    so each cleanup pops only the entries that are actually due
+    """
+
+    def __init__(self):
+        self._data = {}  # key -> (expires_at, value)
+        self._expiry = []  # heap of (expires_at, key); stale entries are skipped
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            self._purge(time.time())
+            entry = self._data.get(key)
+            return entry[1] if entry else None
+
+    def set(self, key, value, ttl_seconds):
+        expires_at = time.time() + ttl_seconds
+        with self._lock:
+            self._purge(time.time())
+            self._data[key] = (expires_at, value)
+            heapq.heappush(self._expiry, (expires_at, key))
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _purge(self, now):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._data.get(key)
+            # Only drop the key if this heap entry is its current expiry
+            if entry is not None and entry[0] == expires_at:
+                del self._data[key]
+
+    def __len__(self):
+        with self._lock:
+            self._purge(time.time())
+            return len(self._data)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    File-backed store shared by every process on the host; expiry uses an
+    index on expires_at, so cleanup is a range delete rather than a scan
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value FROM sessions WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl_seconds):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + ttl_seconds)
+            )
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+
+class RedisSessionStore(SessionStore):
+    """Store on a Redis-protocol server; the server expires keys itself"""
+
+    def __init__(self, url, prefix='geo_attendance:session:'):
+        if redis is None:
+            raise ImportError("The redis package is required for redis:// session stores")
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key, value, ttl_seconds):
+        self._client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl_seconds)))
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+
+def create_session_store(uri):
+    """
+    Build a store from a URI (see module docstring)
+
+    Raises:
+        ValueError: For unsupported schemes
+    """
+    if not uri or uri == 'memory://':
+        return MemorySessionStore()
+
+    if uri.startswith('sqlite:///'):
+        return SQLiteSessionStore(uri[len('sqlite:///'):])
+
+    if uri.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisSessionStore(uri)
+
+    raise ValueError(f"Unsupported session store: {uri}")
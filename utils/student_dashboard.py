@@ -0,0 +1,230 @@
+"""
+Student dashboard data provider
+Builds everything the student landing page shows from two queries (one row of
+aggregate counts and one UNION of recent attendance and upcoming lectures) and
+keeps the result in a short-lived per-student cache that is dropped whenever
+the student's attendance or enrollments change
+"""
+from datetime import datetime, time, timezone, timedelta
+from flask import current_app
+from sqlalchemy import event, select, func, literal, null, union_all, or_, and_
+from sqlalchemy.orm import Session, object_session
+from extensions import db
+from models.attendance import Attendance
+from models.enrollment import Enrollment
+from models.lecture import Lecture
+from models.course import Course
+from utils.cache import TTLCache
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+RECENT_ATTENDANCE_LIMIT = 10
+UPCOMING_LECTURE_LIMIT = 5
+DEFAULT_CACHE_TTL = 30  # seconds
+
+_dashboard_cache = TTLCache(ttl_seconds=DEFAULT_CACHE_TTL)
+
+# session.info key holding student ids whose cached dashboard must be dropped on commit
+_PENDING_KEY = 'student_dashboard_invalidations'
+
+
+def get_student_dashboard(student_id):
+    """
+    Get the dashboard data for a student, served from cache when fresh
+
+    Args:
+        student_id: Student user ID
+
+    Returns:
+        Dictionary with enrollment_count, active_lectures_count,
+        attendance_percentage, upcoming_lectures and recent_attendance
+    """
+    ttl = current_app.config.get('STUDENT_DASHBOARD_CACHE_TTL', DEFAULT_CACHE_TTL)
+    if not ttl:
+        return build_student_dashboard(student_id)
+
+    return _dashboard_cache.get_or_set(
+        student_id,
+        lambda: build_student_dashboard(student_id),
+        ttl_seconds=ttl
+    )
+
+
+def invalidate_student_dashboard(*student_ids):
+    """Drop cached dashboards, e.g. after bulk updates that bypass ORM events"""
+    if student_ids:
+        _dashboard_cache.invalidate_many(student_ids)
+    else:
+        _dashboard_cache.clear()
+
+
+def invalidate_student_dashboard_on_commit(session, student_ids):
+    """Drop these students' cached dashboards once the session commits"""
+    session.info.setdefault(_PENDING_KEY, set()).update(student_ids)
+
+
+def build_student_dashboard(student_id):
+    """Query the dashboard data for a student (always hits the database)"""
+    now = datetime.now(IST)
+
+    enrolled_course_ids = select(Enrollment.course_id).where(
+        Enrollment.student_id == student_id,
+        Enrollment.is_active == True
+    )
+
+    counts = _fetch_counts(student_id, enrolled_course_ids, now)
+    recent_attendance, upcoming_lectures = _fetch_rows(student_id, enrolled_course_ids, now)
+
+    total = counts.total_attendance or 0
+    present = counts.present_attendance or 0
+    attendance_percentage = (present / total * 100) if total > 0 else 0
+
+    return {
+        'enrollment_count': counts.enrollment_count or 0,
+        'active_lectures_count': counts.active_lectures_count or 0,
+        'attendance_percentage': round(attendance_percentage, 2),
+        'upcoming_lectures': upcoming_lectures,
+        'recent_attendance': recent_attendance,
+    }
+
+
+def _fetch_counts(student_id, enrolled_course_ids, now):
+    """One row of scalar subqueries for every counter on the dashboard"""
+    enrollment_count = select(func.count(Enrollment.id)).where(
+        Enrollment.student_id == student_id,
+        Enrollment.is_active == True
+    ).scalar_subquery()
+
+    active_lectures_count = select(func.count(Lecture.id)).where(
+        Lecture.course_id.in_(enrolled_course_ids),
+        Lecture.is_active == True,
+        or_(
+            Lecture.status == 'active',
+            and_(
+                Lecture.status == 'scheduled',
+                Lecture.scheduled_start >= datetime.combine(now.date(), time.min),
+                Lecture.scheduled_start < datetime.combine(now.date() + timedelta(days=1), time.min)
+            )
+        )
+    ).scalar_subquery()
+
+    total_attendance = select(func.count(Attendance.id)).where(
+        Attendance.student_id == student_id
+    ).scalar_subquery()
+
+    present_attendance = select(func.count(Attendance.id)).where(
+        Attendance.student_id == student_id,
+        Attendance.status == 'present'
+    ).scalar_subquery()
+
+    return db.session.execute(select(
+        enrollment_count.label('enrollment_count'),
+        active_lectures_count.label('active_lectures_count'),
+        total_attendance.label('total_attendance'),
+        present_attendance.label('present_attendance'),
+    )).one()
+
+
+def _fetch_rows(student_id, enrolled_course_ids, now):
+    """Recent attendance and upcoming lectures as one UNION ALL of flat rows"""
+    recent = select(
+        literal('attendance').label('kind'),
+        Lecture.id.label('lecture_id'),
+        Lecture.title.label('title'),
+        Lecture.scheduled_start.label('scheduled_start'),
+        Course.code.label('course_code'),
+        Course.name.label('course_name'),
+        Attendance.status.label('status'),
+        Attendance.marked_at.label('marked_at'),
+        Attendance.distance_from_lecture.label('distance_from_lecture'),
+    ).join_from(Attendance, Lecture, Attendance.lecture_id == Lecture.id)\
+        .join(Course, Lecture.course_id == Course.id)\
+        .where(Attendance.student_id == student_id)\
+        .order_by(Attendance.marked_at.desc())\
+        .limit(RECENT_ATTENDANCE_LIMIT)\
+        .subquery()
+
+    upcoming = select(
+        literal('lecture').label('kind'),
+        Lecture.id.label('lecture_id'),
+        Lecture.title.label('title'),
+        Lecture.scheduled_start.label('scheduled_start'),
+        Course.code.label('course_code'),
+        Course.name.label('course_name'),
+        null().label('status'),
+        null().label('marked_at'),
+        null().label('distance_from_lecture'),
+    ).join_from(Lecture, Course, Lecture.course_id == Course.id)\
+        .where(
+            Lecture.course_id.in_(enrolled_course_ids),
+            Lecture.scheduled_start > now,
+            Lecture.is_active == True
+        )\
+        .order_by(Lecture.scheduled_start)\
+        .limit(UPCOMING_LECTURE_LIMIT)\
+        .subquery()
+
+    # LIMIT inside a compound select needs the wrapping subqueries on SQLite
+    rows = db.session.execute(union_all(select(recent), select(upcoming))).all()
+
+    recent_attendance = []
+    upcoming_lectures = []
+
+    for row in rows:
+        lecture = {
+            'id': row.lecture_id,
+            'title': row.title,
+            'scheduled_start': row.scheduled_start,
+            'course': {'code': row.course_code, 'name': row.course_name},
+        }
+
+        if row.kind == 'attendance':
+            recent_attendance.append({
+                'lecture': lecture,
+                'status': row.status,
+                'marked_at': row.marked_at,
+                'distance_from_lecture': row.distance_from_lecture,
+            })
+        else:
+            upcoming_lectures.append(lecture)
+
+    # UNION ALL does not keep the per-branch ordering
+    recent_attendance.sort(key=lambda a: a['marked_at'] or datetime.min, reverse=True)
+    upcoming_lectures.sort(key=lambda l: l['scheduled_start'])
+
+    return recent_attendance, upcoming_lectures
+
+
+# ---------------------------------------------------------------------------
+# Cache invalidation: collect affected students during the flush and drop
+# their cached dashboards only once the transaction commits
+# ---------------------------------------------------------------------------
+
+def _queue_invalidation(target):
+    session = object_session(target)
+    if session is None or target.student_id is None:
+        return
+    session.info.setdefault(_PENDING_KEY, set()).add(target.student_id)
+
+
+def _on_change(mapper, connection, target):
+    _queue_invalidation(target)
+
+
+for _model in (Attendance, Enrollment):
+    event.listen(_model, 'after_insert', _on_change)
+    event.listen(_model, 'after_update', _on_change)
+    event.listen(_model, 'after_delete', _on_change)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    student_ids = session.info.pop(_PENDING_KEY, None)
+    if student_ids:
+        _dashboard_cache.invalidate_many(student_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
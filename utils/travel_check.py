@@ -0,0 +1,275 @@
+"""
+Impossible-travel detection
+Keeps a small ring buffer of each student's recent validated fixes in memory,
+backed by the indexed location_fixes table. A check-in is compared with the
+buffered fixes in constant time: covering too much ground for the time
+elapsed (velocity) or jumping far almost instantly (teleport) is reported.
+scan_travel_violations re-checks stored history in bulk with NumPy to find
+past violations.
+"""
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from extensions import db
+from models.location_fix import LocationFix
+from utils.geolocation import calculate_distance
+
+# IST timezone (UTC+5:30)
+IST = timezone(timedelta(hours=5, minutes=30))
+
+RING_SIZE = 8  # fixes kept per student
+MAX_BUFFERED_STUDENTS = 10000  # least recently used students are evicted
+TRAVEL_WINDOW = timedelta(hours=6)  # older fixes say nothing about a new one
+MIN_TRAVEL_DISTANCE_M = 200  # shorter hops are within GPS and indoor noise
+MAX_ACCURACY_SLACK_M = 100  # cap on how much reported accuracy may excuse
+MAX_TRAVEL_SPEED_MPS = 8.0  # ~29 km/h: fast cycling across a campus
+TELEPORT_SECONDS = 10  # any real move within this is a teleport
+
+# session.info key holding fixes to add to the ring buffers after commit
+_PENDING_KEY = 'travel_check_fixes'
+
+
+def _epoch(value):
+    """Seconds since the epoch; naive datetimes are stored in IST"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=IST)
+    return value.timestamp()
+
+
+def assess_travel(distance_m, seconds, accuracy_a=None, accuracy_b=None):
+    """
+    Classify the move between two fixes
+
+    Returns:
+        (violation, effective_distance_m, speed_mps) where violation is None,
+        'teleport' or 'velocity'
+    """
+    slack = min(accuracy_a or 0, MAX_ACCURACY_SLACK_M) + min(accuracy_b or 0, MAX_ACCURACY_SLACK_M)
+    effective = max(0.0, distance_m - slack)
+    seconds = max(seconds, 1.0)
+    speed = effective / seconds
+
+    if effective < MIN_TRAVEL_DISTANCE_M:
+        return None, effective, speed
+    if seconds <= TELEPORT_SECONDS:
+        return 'teleport', effective, speed
+    if speed > MAX_TRAVEL_SPEED_MPS:
+        return 'velocity', effective, speed
+    return None, effective, speed
+
+
+class RecentFixes:
+    """Per-student ring buffers of (latitude, longitude, epoch, accuracy)"""
+
+    def __init__(self, ring_size=RING_SIZE, max_students=MAX_BUFFERED_STUDENTS):
+        self.ring_size = ring_size
+        self.max_students = max_students
+        self._rings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, student_id, latitude, longitude, accuracy=None, at=None):
+        """
+        Compare a new fix with the student's recent fixes
+
+        Returns:
+            Dictionary with violation (None, 'teleport' or 'velocity'),
+            distance_m, seconds and speed_kmh for the worst recent fix
+        """
+        now = _epoch(at or datetime.now(IST))
+        ring = self._sync(student_id)
+        window = TRAVEL_WINDOW.total_seconds()
+
+        worst = {'violation': None, 'distance_m': 0.0, 'seconds': None, 'speed_kmh': 0.0}
+        for prev_lat, prev_lon, prev_at, prev_accuracy in ring:
+            seconds = now - prev_at
+            if seconds > window:
+                continue
+
+            distance = calculate_distance(prev_lat, prev_lon, latitude, longitude)
+            violation, effective, speed = assess_travel(distance, abs(seconds), accuracy, prev_accuracy)
+            if violation and speed * 3.6 > worst['speed_kmh']:
+                worst = {
+                    'violation': violation,
+                    'distance_m': round(effective, 1),
+                    'seconds': round(abs(seconds), 1),
+                    'speed_kmh': round(speed * 3.6, 1)
+                }
+
+        return worst
+
+    def record(self, student_id, latitude, longitude, accuracy=None, at=None,
+               lecture_id=None, attendance_id=None):
+        """
+        Store a validated fix; it joins the ring buffer once the session commits
+
+        The caller commits the session.
+        """
+        at = at or datetime.now(IST)
+        db.session.add(LocationFix(
+            student_id=student_id, lecture_id=lecture_id, attendance_id=attendance_id,
+            latitude=latitude, longitude=longitude, accuracy=accuracy, recorded_at=at
+        ))
+        db.session.info.setdefault(_PENDING_KEY, []).append(
+            (student_id, (latitude, longitude, _epoch(at), accuracy))
+        )
+
+    def forget(self, student_id=None):
+        """Drop buffered fixes (all students when student_id is None)"""
+        with self._lock:
+            if student_id is None:
+                self._rings.clear()
+            else:
+                self._rings.pop(student_id, None)
+
+    def _append(self, student_id, fix):
+        with self._lock:
+            ring = self._rings.get(student_id)
+            if ring is not None:
+                ring.append(fix)
+
+    def _sync(self, student_id):
+        """
+        Buffer for a student, topped up with fixes other workers stored since
+        the newest buffered one (one index range probe, usually empty)
+        """
+        with self._lock:
+            ring = self._rings.get(student_id)
+            if ring is not None:
+                self._rings.move_to_end(student_id)
+                newest = ring[-1][2] if ring else None
+            else:
+                newest = None
+
+        stmt = select(LocationFix.latitude, LocationFix.longitude,
+                      LocationFix.recorded_at, LocationFix.accuracy)\
+            .where(LocationFix.student_id == student_id)
+        if newest is not None:
+            stmt = stmt.where(LocationFix.recorded_at > datetime.fromtimestamp(newest, IST))
+        rows = db.session.execute(
+            stmt.order_by(LocationFix.recorded_at.desc()).limit(self.ring_size)
+        ).all()
+
+        with self._lock:
+            ring = self._rings.get(student_id)
+            if ring is None:
+                ring = self._rings[student_id] = deque(maxlen=self.ring_size)
+                while len(self._rings) > self.max_students:
+                    self._rings.popitem(last=False)
+
+            for lat, lon, recorded_at, accuracy in reversed(rows):
+                epoch = _epoch(recorded_at)
+                if not ring or epoch > ring[-1][2]:
+                    ring.append((lat, lon, epoch, accuracy))
+
+            return list(ring)
+
+
+recent_fixes = RecentFixes()
+
+
+@event.listens_for(Session, 'after_commit')
+def _buffer_committed_fixes(session):
+    for student_id, fix in session.info.pop(_PENDING_KEY, ()):
+        recent_fixes._append(student_id, fix)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def scan_travel_violations(student_ids=None, since=None, until=None):
+    """
+    Re-check stored fixes for impossible travel between consecutive fixes
+
+    Loads the fixes in one ordered query and evaluates every consecutive
+    pair with vectorized haversine distances.
+
+    Args:
+        student_ids: Optional students to limit the scan to
+        since: Optional lower bound on recorded_at
+        until: Optional upper bound on recorded_at
+
+    Returns:
+        List of dicts with student_id, violation, from/to fix and attendance
+        IDs, distance_m, seconds and speed_kmh
+    """
+    import numpy as np
+
+    stmt = select(LocationFix.id, LocationFix.student_id, LocationFix.attendance_id,
+                  LocationFix.latitude, LocationFix.longitude, LocationFix.accuracy,
+                  LocationFix.recorded_at)
+    if student_ids is not None:
+        stmt = stmt.where(LocationFix.student_id.in_(list(student_ids)))
+    if since is not None:
+        stmt = stmt.where(LocationFix.recorded_at >= since)
+    if until is not None:
+        stmt = stmt.where(LocationFix.recorded_at <= until)
+
+    rows = db.session.execute(stmt.order_by(LocationFix.student_id, LocationFix.recorded_at)).all()
+    if len(rows) < 2:
+        return []
+
+    ids, students, attendance_ids, lats, lons, accuracies, times = zip(*rows)
+    students = np.asarray(students, dtype=np.int64)
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    accuracy = np.minimum(np.nan_to_num(np.asarray(accuracies, dtype=np.float64)), MAX_ACCURACY_SLACK_M)
+    epochs = np.fromiter((_epoch(t) for t in times), dtype=np.float64, count=len(times))
+
+    # Consecutive pairs of the same student
+    same = students[1:] == students[:-1]
+    dlat = lat[1:] - lat[:-1]
+    dlon = lon[1:] - lon[:-1]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+    distance = 2 * 6371008.8 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    effective = np.maximum(0.0, distance - accuracy[1:] - accuracy[:-1])
+    seconds = np.maximum(epochs[1:] - epochs[:-1], 1.0)
+    speed = effective / seconds
+    window = seconds <= TRAVEL_WINDOW.total_seconds()
+
+    moved = same & window & (effective >= MIN_TRAVEL_DISTANCE_M)
+    teleport = moved & (seconds <= TELEPORT_SECONDS)
+    velocity = moved & ~teleport & (speed > MAX_TRAVEL_SPEED_MPS)
+
+    violations = []
+    for index in np.flatnonzero(teleport | velocity):
+        violations.append({
+            'student_id': int(students[index + 1]),
+            'violation': 'teleport' if teleport[index] else 'velocity',
+            'from_fix_id': ids[index],
+            'to_fix_id': ids[index + 1],
+            'attendance_id': attendance_ids[index + 1],
+            'distance_m': round(float(effective[index]), 1),
+            'seconds': round(float(seconds[index]), 1),
+            'speed_kmh': round(float(speed[index]) * 3.6, 1)
+        })
+
+    return violations
+
+
+def flag_travel_violations(violations):
+    """
+    Mark the attendance behind each violating fix as flagged (one UPDATE)
+
+    Returns:
+        Number of attendance rows changed
+
+    The caller commits the session.
+    """
+    from models.attendance import Attendance
+
+    attendance_ids = {v['attendance_id'] for v in violations if v['attendance_id']}
+    if not attendance_ids:
+        return 0
+
+    result = db.session.execute(
+        update(Attendance)
+        .where(Attendance.id.in_(attendance_ids), Attendance.verification_status != 'flagged')
+        .values(verification_status='flagged')
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount